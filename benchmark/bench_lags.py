@@ -0,0 +1,90 @@
+"""
+bench_lags.py
+
+Benchmark lag features: shifter, one insert per shifted column,
+vs lagger, one block for all columns
+
+usage: python benchmark/bench_lags.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+import tracemalloc
+import warnings
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from module.transformer import Transformer
+
+
+def indicators(ndays: int, ncolumns: int) -> pd.DataFrame:
+    """
+    Synthetic ticker frame, as returned by add_all_ta_features
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "ticker": "T0",
+            "timestamp": pd.date_range("2021-01-01", periods=ndays, freq="D"),
+            "currency": "USD",
+        }
+    )
+    features = pd.DataFrame(
+        rng.random((ndays, ncolumns)), columns=[f"f{i}" for i in range(ncolumns)]
+    )
+
+    return pd.concat([df, features], axis=1)
+
+
+def shift_loop(df: pd.DataFrame, lags: int) -> pd.DataFrame:
+    """
+    Historical lags: shifter called on each column
+    """
+    for column in df.columns[3:]:
+        df = Transformer.shifter(df, column, lags)
+
+    return df
+
+
+def shift_block(df: pd.DataFrame, lags: int) -> pd.DataFrame:
+    return Transformer.lagger(df, df.columns[3:], lags)
+
+
+def main():
+    # shifter triggers pandas fragmentation warnings
+    warnings.simplefilter("ignore")
+
+    ntickers = 50
+    print(f"{ntickers} tickers, 540 days")
+    print(f"{'columns':>7} {'lags':>4} {'loop ms/ticker':>15} {'block ms/ticker':>16} "
+          f"{'loop peak MB':>13} {'block peak MB':>14}")
+    for ncolumns, lags in ((20, 5), (90, 5), (90, 10)):
+        frames = [indicators(540, ncolumns) for _ in range(ntickers)]
+
+        timings, peaks = [], []
+        for lag in (shift_loop, shift_block):
+            tracemalloc.start()
+            start = perf_counter()
+            for df in frames:
+                out = lag(df.copy(), lags)
+            timings.append((perf_counter() - start) / ntickers * 1e3)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024 ** 2)
+            tracemalloc.stop()
+            assert out.shape[1] == 3 + ncolumns * lags
+
+        print(f"{ncolumns:>7} {lags:>4} {timings[0]:>15.2f} {timings[1]:>16.2f} "
+              f"{peaks[0]:>13.1f} {peaks[1]:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
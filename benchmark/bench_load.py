@@ -0,0 +1,159 @@
+"""
+bench_load.py
+
+Benchmark the full load path, offline: load.main crawls a local fake
+yahoo finance server and uploads to FakeS3, for N tickers x D days.
+Reports requests/sec, parse time, upload time and peak memory
+
+usage: python benchmark/bench_load.py [-h] [--ntickers NTICKERS] [--ndays NDAYS]
+                                      [--latency LATENCY] [--throttle-rate RATE]
+                                      [--error-rate RATE] [load.py arguments]
+
+ex: python benchmark/bench_load.py --ntickers 2000 --ndays 20 --engine async --stream
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import argparse
+import datetime as dt
+import functools
+import logging
+import os
+import sys
+import inspect
+import resource
+import threading
+from time import perf_counter
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+sys.path.append(f"{parentdir}/test")
+
+import load
+from module.chart_buffer import ChartBuffer
+from module.yahoo import Yahoo
+from fake_s3 import FakeS3
+from fake_yahoo import FakeYahooServer
+
+
+class Timer:
+    """
+    Cumulated duration of calls to wrapped functions, thread safe.
+    Overlapping calls, ie. from concurrent threads, are counted once
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.running = 0
+        self.since = 0
+        self.total = 0
+
+    def wrap(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.lock:
+                self.calls += 1
+                if not self.running:
+                    self.since = perf_counter()
+                self.running += 1
+
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    if not self.running:
+                        self.total += perf_counter() - self.since
+
+        return wrapper
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ntickers", default=500, type=int, help="Tickers to load")
+    parser.add_argument("--ndays", default=5, type=int, help="Days to load")
+    parser.add_argument(
+        "--latency", default=0.01, type=float, help="Server latency, seconds"
+    )
+    parser.add_argument(
+        "--throttle-rate", default=0, type=float, help="Share of requests answered 429"
+    )
+    parser.add_argument(
+        "--error-rate", default=0, type=float, help="Share of requests answered 500"
+    )
+
+    # any other argument is handed over to load.py
+    return parser.parse_known_args()
+
+
+def main():
+    args, load_args = parse_args()
+
+    # load logs a few lines per ticker
+    logging.disable(logging.INFO)
+
+    start = dt.datetime(2022, 3, 1)
+    end = start + dt.timedelta(days=args.ndays)
+    sys.argv = [
+        "load.py",
+        "--start",
+        start.strftime("%y%m%d"),
+        "--end",
+        end.strftime("%y%m%d"),
+        # no throttling unless injected
+        "--rate",
+        "200",
+    ] + load_args
+
+    # bucket and ticker universe stand-ins
+    s3 = FakeS3()
+    tickers = [f"T{i}" for i in range(args.ntickers)]
+    load.Aws = lambda: type("Aws", (), {"get_account_id": lambda self: "bench"})()
+    load.S3 = lambda bucket: s3
+    load.get_yahoo_tickers = lambda *args: tickers
+
+    # timed phases
+    crawl, parse, upload = Timer(), Timer(), Timer()
+    Yahoo.load_data = crawl.wrap(Yahoo.load_data)
+    ChartBuffer.add_result = parse.wrap(ChartBuffer.add_result)
+    ChartBuffer.to_frame = parse.wrap(ChartBuffer.to_frame)
+    load.upload = upload.wrap(load.upload)
+    load.flush = upload.wrap(load.flush)
+
+    with FakeYahooServer(
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+    ) as server:
+        load.Yahoo = functools.partial(
+            Yahoo, api_url=server.api_url, spark_url=server.spark_url
+        )
+
+        run_start = perf_counter()
+        load.main()
+        total = perf_counter() - run_start
+
+    partitions = [key for key in s3.objects if key.startswith("raw_data/")]
+    if len(partitions) != args.ndays:
+        raise RuntimeError(f"{len(partitions)} partitions uploaded, {args.ndays} expected")
+
+    # peak memory, kilobytes on linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"tickers x days    {args.ntickers} x {args.ndays}")
+    print(f"load args         {' '.join(load_args) or '-'}")
+    print(f"requests          {server.requests} {dict(sorted(server.statuses.items()))}")
+    print(f"requests/sec      {server.requests / crawl.total:.1f}")
+    print(f"crawl sec         {crawl.total:.2f}")
+    print(f"parse sec         {parse.total:.2f}")
+    print(f"upload sec        {upload.total:.2f} ({len(partitions)} partitions)")
+    print(f"total sec         {total:.2f}")
+    print(f"peak RSS MB       {peak_rss:.1f}")
+
+
+if __name__ == "__main__":
+    main()
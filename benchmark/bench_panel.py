@@ -0,0 +1,92 @@
+"""
+bench_panel.py
+
+Benchmark indicators computation: ta ticker by ticker vs panel engine,
+all tickers at once, vs panel engine resumed from state for the last week
+
+usage: python benchmark/bench_panel.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+import warnings
+from time import perf_counter
+
+import pandas as pd
+import ta
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from transform import ticker_slices
+from module.panel_indicators import PanelIndicators
+from bench_transform import universe
+
+
+def ticker_indicators(df):
+    """
+    Same indicators as PanelIndicators, ta classes, one ticker at a time
+    """
+    for _, tmp in ticker_slices(df):
+        high, low, close, volume = tmp.high, tmp.low, tmp.close, tmp.volume
+        macd = ta.trend.MACD(close, fillna=True)
+        bollinger = ta.volatility.BollingerBands(close, fillna=True)
+
+        ta.momentum.RSIIndicator(close, fillna=True).rsi()
+        ta.momentum.ROCIndicator(close, fillna=True).roc()
+        ta.trend.SMAIndicator(close, 12, fillna=True).sma_indicator()
+        ta.trend.SMAIndicator(close, 26, fillna=True).sma_indicator()
+        ta.trend.EMAIndicator(close, 12, fillna=True).ema_indicator()
+        ta.trend.EMAIndicator(close, 26, fillna=True).ema_indicator()
+        macd.macd(), macd.macd_signal(), macd.macd_diff()
+        bollinger.bollinger_mavg(), bollinger.bollinger_hband()
+        bollinger.bollinger_lband(), bollinger.bollinger_wband()
+        bollinger.bollinger_pband(), bollinger.bollinger_hband_indicator()
+        bollinger.bollinger_lband_indicator()
+        ta.volatility.AverageTrueRange(high, low, close, 10, fillna=True).average_true_range()
+        ta.volume.OnBalanceVolumeIndicator(close, volume, fillna=True).on_balance_volume()
+
+
+def panel_indicators(df):
+    PanelIndicators(df).compute()
+
+
+def incremental_indicators(df, state):
+    PanelIndicators(PanelIndicators.new_bars(df, state), state).compute()
+
+
+def main():
+    # ta warns on divisions by zero
+    warnings.simplefilter("ignore")
+
+    print(f"{'ntickers':>8} {'rows':>9} {'ta sec':>7} {'panel sec':>10} {'incr sec':>9}")
+    for ntickers in (100, 200, 400, 800):
+        df = universe(ndays=250, ntickers=ntickers)
+
+        timings = []
+        for compute in (ticker_indicators, panel_indicators):
+            start = perf_counter()
+            compute(df)
+            timings.append(perf_counter() - start)
+
+        # state of all but the last week, see transform --incremental
+        last_week = df.timestamp.max() - pd.Timedelta(days=6)
+        panel = PanelIndicators(df[df.timestamp < last_week])
+        panel.transform(lags=5)
+        start = perf_counter()
+        incremental_indicators(df, panel.state)
+        timings.append(perf_counter() - start)
+
+        print(
+            f"{ntickers:>8} {df.shape[0]:>9} {timings[0]:>7.2f} {timings[1]:>10.2f}"
+            f" {timings[2]:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+bench_parse_yahoo.py
+
+Benchmark yahoo responses parsing: per ticker frame append vs ChartBuffer
+
+usage: python benchmark/bench_parse_yahoo.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+from time import perf_counter
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+sys.path.append(f"{parentdir}/test")
+
+from module.chart_buffer import ChartBuffer
+from fake_yahoo import chart_response
+
+
+def parse_append(responses: list) -> pd.DataFrame:
+    """
+    Historical parser: one frame per response, appended to the output frame
+    """
+    df = pd.DataFrame()
+    for response in responses:
+        result = response["chart"]["result"][0]
+        df_tmp = pd.DataFrame.from_dict(result["indicators"]["quote"][0])
+        df_tmp["ticker"] = result["meta"]["symbol"]
+        df_tmp["timestamp"] = [
+            ts + result["meta"]["gmtoffset"] for ts in result["timestamp"]
+        ]
+        df_tmp["timestamp"] = pd.to_datetime(df_tmp["timestamp"], unit="s")
+        df_tmp["currency"] = result["meta"]["currency"]
+        df_tmp["exchange"] = result["meta"]["exchangeName"]
+        df_tmp["date"] = df_tmp.timestamp.dt.date
+        df_tmp.drop_duplicates(subset=["date"], inplace=True)
+        df_tmp["timestamp"] = pd.to_datetime(df_tmp["date"])
+        df_tmp.drop(columns=["date"], inplace=True)
+        # DataFrame.append equivalent, copies the accumulated frame
+        df = pd.concat([df, df_tmp])
+
+    return df
+
+
+def parse_buffer(responses: list) -> pd.DataFrame:
+    """
+    Columnar parser
+    """
+    buffer = ChartBuffer(capacity=len(responses) * 7)
+    for response in responses:
+        buffer.add(response)
+
+    return buffer.to_frame()
+
+
+def main():
+    print(f"{'ntickers':>8} {'append us/ticker':>17} {'buffer us/ticker':>17}")
+    for ntickers in (250, 500, 1000, 2000, 4000):
+        responses = [chart_response(f"T{i}", ndays=5) for i in range(ntickers)]
+
+        timings = []
+        for parser in (parse_append, parse_buffer):
+            start = perf_counter()
+            df = parser(responses)
+            timings.append((perf_counter() - start) / ntickers * 1e6)
+            assert df.shape[0] == ntickers * 5
+
+        print(f"{ntickers:>8} {timings[0]:>17.1f} {timings[1]:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+bench_partitions.py
+
+Benchmark splitting a backfill into days - partitions -
+per day boolean mask vs single pass groupby
+
+usage: python benchmark/bench_partitions.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from load import partitions
+
+
+def backfill(ndays: int, ntickers: int) -> pd.DataFrame:
+    """
+    Synthetic backfill, one row per ticker and day
+    """
+    days = pd.date_range("2020-01-01", periods=ndays, freq="D")
+    rng = np.random.default_rng(0)
+
+    return pd.DataFrame(
+        {
+            "close": rng.random(ndays * ntickers, dtype="float32"),
+            "ticker": np.tile([f"T{i}" for i in range(ntickers)], ndays),
+            "timestamp": np.repeat(days, ntickers),
+        }
+    )
+
+
+def partitions_mask(df: pd.DataFrame) -> list:
+    """
+    Historical split: one full frame scan per day
+    """
+    return [(day, df[df["timestamp"] == day]) for day in df.timestamp.unique()]
+
+
+def main():
+    ntickers = 2000
+    print(f"{'ndays':>6} {'rows':>9} {'mask sec':>9} {'groupby sec':>12}")
+    for ndays in (50, 100, 250, 500):
+        df = backfill(ndays, ntickers)
+
+        timings = []
+        for split in (partitions_mask, partitions):
+            start = perf_counter()
+            tasks = split(df)
+            timings.append(perf_counter() - start)
+            assert len(tasks) == ndays
+
+        print(f"{ndays:>6} {df.shape[0]:>9} {timings[0]:>9.3f} {timings[1]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_ticker_corrections.py
+
+Benchmark ticker corrections: per correction scan and append vs single pass
+
+usage: python benchmark/bench_ticker_corrections.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+from time import perf_counter
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from util.get_tickers import apply_corrections
+
+
+def apply_loop(ticker_map: pd.DataFrame, corrections: dict) -> pd.DataFrame:
+    """
+    Historical corrections: one scan per correction, one copy per new row
+    """
+    for old, new in corrections.items():
+        if old in ticker_map["bloomberg_ticker"].values:
+            ticker_map.loc[ticker_map["bloomberg_ticker"] == old, "yahoo"] = new
+
+        else:
+            _row = {"ticker": old, "bloomberg_ticker": old, "yahoo": new}
+            # DataFrame.append equivalent, copies the whole frame
+            ticker_map = pd.concat(
+                [ticker_map, pd.DataFrame([_row])], ignore_index=True
+            )
+
+    return ticker_map
+
+
+def main():
+    nrows = 20000
+    ticker_map = pd.DataFrame(
+        {
+            "ticker": [f"T{i}" for i in range(nrows)],
+            "bloomberg_ticker": [f"T{i} US" for i in range(nrows)],
+            "yahoo": [f"T{i}" for i in range(nrows)],
+        }
+    )
+
+    print(f"{'ncorrections':>12} {'loop sec':>9} {'vectorized sec':>15}")
+    for ncorrections in (100, 500, 1000, 2000):
+        # half of them update existing rows, half of them are new rows
+        corrections = {f"T{i} US": f"T{i}.X" for i in range(0, ncorrections, 2)}
+        corrections.update({f"N{i} LN": f"N{i}.L" for i in range(1, ncorrections, 2)})
+
+        timings = []
+        results = []
+        for apply in (apply_loop, apply_corrections):
+            start = perf_counter()
+            results.append(apply(ticker_map.copy(), corrections))
+            timings.append(perf_counter() - start)
+
+        assert results[0].yahoo.tolist() == results[1].yahoo.tolist()
+        print(f"{ncorrections:>12} {timings[0]:>9.3f} {timings[1]:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+bench_ticker_slices.py
+
+Benchmark splitting raw data into tickers:
+per ticker boolean mask and sort vs sort once and group offsets
+
+usage: python benchmark/bench_ticker_slices.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+import sys
+import inspect
+from time import perf_counter
+
+import numpy as np
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from transform import ticker_slices
+from bench_transform import universe
+
+
+def mask_slices(df):
+    """
+    Historical split: one full scan and one sort per ticker
+    """
+    for ticker in np.sort(df.ticker.unique()):
+        yield ticker, df[df["ticker"] == ticker].sort_values(by=["timestamp"])
+
+
+def main():
+    print(f"{'ntickers':>8} {'rows':>9} {'mask sec':>9} {'offsets sec':>12}")
+    for ntickers in (100, 200, 400, 800):
+        df = universe(ndays=250, ntickers=ntickers)
+
+        timings = []
+        for split in (mask_slices, ticker_slices):
+            start = perf_counter()
+            nrows = sum(tmp.shape[0] for _, tmp in split(df))
+            timings.append(perf_counter() - start)
+            assert nrows == df.shape[0]
+
+        print(f"{ntickers:>8} {df.shape[0]:>9} {timings[0]:>9.2f} {timings[1]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
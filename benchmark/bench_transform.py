@@ -0,0 +1,69 @@
+"""
+bench_transform.py
+
+Benchmark features computation: thread vs process executor backends
+
+usage: python benchmark/bench_transform.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import logging
+import os
+import sys
+import inspect
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+
+from transform import ticker_slices, transform
+from module.multi_thread import MultiThread
+
+
+def universe(ndays: int, ntickers: int) -> pd.DataFrame:
+    """
+    Synthetic raw data, one row per ticker and day, shuffled as read from athena
+    """
+    days = pd.date_range("2021-01-01", periods=ndays, freq="D")
+    rng = np.random.default_rng(0)
+    nrows = ndays * ntickers
+
+    df = pd.DataFrame(
+        {
+            "ticker": np.repeat([f"T{i}" for i in range(ntickers)], ndays),
+            "timestamp": np.tile(days, ntickers),
+        }
+    )
+    for column in ("open", "high", "low", "close", "adj_close"):
+        df[column] = 10 + rng.random(nrows)
+    df["volume"] = rng.integers(1000, 100000, nrows).astype("float64")
+
+    return df.sample(frac=1, random_state=0, ignore_index=True)
+
+
+def main():
+    # transform logs two lines per ticker
+    logging.disable(logging.INFO)
+
+    df = universe(ndays=540, ntickers=40)
+
+    print(f"{os.cpu_count()} processors")
+    print(f"{'backend':>8} {'workers':>8} {'sec':>7}")
+    for backend in ("thread", "process"):
+        for workers in sorted({1, os.cpu_count()}):
+            start = perf_counter()
+            mt = MultiThread(backend, workers)
+            mt.execute(ticker_slices(df), transform, {"cmd": "volume", "lags": 5})
+            assert mt.parse_transform().ticker.nunique() == 40
+
+            print(f"{backend:>8} {workers:>8} {perf_counter() - start:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
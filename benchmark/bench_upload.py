@@ -0,0 +1,69 @@
+"""
+bench_upload.py
+
+Benchmark partitions upload: local temp file vs in memory buffer.
+Uploads go to FakeS3, so only serialization and local I/O are measured
+
+usage: python benchmark/bench_upload.py
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import logging
+import os
+import sys
+import inspect
+from time import perf_counter
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f"{parentdir}/src/numerai_signals")
+sys.path.append(f"{parentdir}/test")
+
+from load import partitions, upload
+from fake_s3 import FakeS3
+from bench_partitions import backfill
+
+
+def upload_file(params: dict) -> int:
+    """
+    Historical upload: write partition to disk, upload file, remove it
+
+    ::return number of bytes written to local disk
+    """
+    day, tmp = params["task"]
+    s3 = params["params"]["s3"]
+
+    source_path = f"data/raw_data/yahoo_data_{day.strftime('%y%m%d')}.parquet"
+    tmp.to_parquet(source_path, index=False)
+    size = os.path.getsize(source_path)
+    s3.upload_file(f"bench/{os.path.basename(source_path)}", source_path)
+    os.remove(source_path)
+
+    return size
+
+
+def main():
+    # upload logs one line per partition
+    logging.disable(logging.INFO)
+
+    tasks = partitions(backfill(ndays=100, ntickers=5000))
+
+    print(f"{'method':>8} {'sec':>7} {'MB/s':>7} {'disk MB':>8}")
+    for name, function in (("file", upload_file), ("memory", upload)):
+        s3 = FakeS3()
+        disk = 0
+
+        start = perf_counter()
+        for task in tasks:
+            size = function({"task": task, "params": {"s3": s3}})
+            disk += size if isinstance(size, int) else 0
+        elapsed = perf_counter() - start
+
+        uploaded = sum(len(body) for body in s3.objects.values()) / 1024 ** 2
+        print(f"{name:>8} {elapsed:>7.3f} {uploaded / elapsed:>7.1f} {disk / 1024 ** 2:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
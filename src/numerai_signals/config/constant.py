@@ -18,6 +18,96 @@ LOG_FOLDER = os.path.join(DATA_FOLDER, 'log')
 LOG_FILENAME = f'log_{datetime.datetime.isoformat(datetime.datetime.today())}'
 LOG_FILEPATH = os.path.join(LOG_FOLDER, LOG_FILENAME)
 
+# per ticker last loaded date, see module.watermark
+# kept outside of raw_data so that glue crawler ignores it
+WATERMARK_KEY = "manifest/yahoo_watermarks.json.gz"
+
+# load run checkpoints, see --resume
+RUN_MANIFEST_KEY = "manifest/runs/{run_id}.json.gz"
+RUN_CHECKPOINT_FOLDER = "checkpoint/{run_id}"
+
+# numerai ticker universe snapshot, see module.ticker_cache
+# local copy and bucket copy, ttl in seconds
+TICKER_MAP_URL = (
+    "https://numerai-signals-public-data.s3-us-west-2.amazonaws.com/"
+    "signals_ticker_map_w_bbg.csv"
+)
+TICKER_CACHE_FOLDER = os.path.join(DATA_FOLDER, "cache", "tickers")
+TICKER_CACHE_KEY = "manifest/ticker_snapshot.json.gz"
+TICKER_CACHE_TTL = 24 * 3600
+
+# yahoo finance API responses cache, see module.response_cache
+# ttl in seconds, max size in bytes
+CACHE_FOLDER = os.path.join(DATA_FOLDER, "cache", "yahoo")
+CACHE_TTL = 12 * 3600
+CACHE_MAX_SIZE = 512 * 1024 ** 2
+
+# streaming load, see module.partition_writer
+# partitions are spilled locally, tickers are crawled batch by batch
+STREAM_FOLDER = os.path.join(DATA_FOLDER, "raw_data", "stream")
+STREAM_BATCH_SIZE = 500
+
+# s3 multipart transfers, see module.aws.s3
+# local files larger than a part are transferred in parts, in parallel
+# in memory content is uploaded with a single put
+S3_PART_SIZE = 16 * 1024 ** 2
+S3_MAX_CONCURRENCY = 10
+# delete_objects upper boundary
+S3_DELETE_BATCH_SIZE = 1000
+
+# partition content hash, stored in s3 object metadata
+CONTENT_HASH_KEY = "content-sha256"
+
+# yahoo finance API
+# daily bars are floored to local midnight
+SECONDS_PER_DAY = 86400
+YAHOO_API_URL = "https://query2.finance.yahoo.com/v8/finance/chart"
+# multi symbols endpoint, at most YAHOO_SPARK_BATCH symbols per request
+YAHOO_SPARK_URL = "https://query1.finance.yahoo.com/v7/finance/spark"
+YAHOO_SPARK_BATCH = 20
+
+# crawler engines, see module.yahoo
+# maximum number of requests in flight for the async engine
+CRAWLER_ENGINES = ["thread", "async"]
+CRAWLER_CONCURRENCY = 50
+
+# http sessions
+# connections kept alive per host, connect and read timeouts in seconds
+HTTP_POOL_SIZE = 10
+HTTP_CONNECT_TIMEOUT = 3.05
+HTTP_READ_TIMEOUT = 10
+
+# yahoo rate limiter, in requests/sec, see module.rate_limiter
+RATE_LIMIT_START = 20
+RATE_LIMIT_MIN = 1
+RATE_LIMIT_MAX = 200
+RATE_LIMIT_INCREASE = 1
+RATE_LIMIT_DECREASE = 0.5
+
+# proxy pool, see module.proxy_pool
+# throttled proxies cool down, base delay in seconds, doubled on each failure
+# identities of throttled proxies are renewed in background, period in seconds
+PROXY_STRATEGIES = ["round_robin", "health"]
+PROXY_COOLDOWN = 30
+PROXY_MAX_COOLDOWN = 600
+PROXY_ROTATE_INTERVAL = 10
+
+# transform features, number of lags including the unshifted one
+# panel indicators state, see transform --incremental
+TRANSFORM_LAGS = 5
+TRANSFORM_STATE_KEY = "transform_data/indicator_state.parquet"
+
+# executor backends, see module.multi_thread
+# tasks sent to a worker process at once
+EXECUTOR_BACKENDS = ["thread", "process"]
+EXECUTOR_CHUNK_SIZE = 16
+
+# throttled - 429 - or failed - 5xx, timeout - requests are retried
+# with exponential backoff, delays in seconds
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 60
+
 # user agents for the yahoo finance API usage
 USER_AGENTS = [
     (
@@ -8,8 +8,12 @@ __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
 import datetime as dt
+from itertools import chain
 from time import time
+import io
 import os
+import re
+import resource
 
 import pandas as pd
 
@@ -20,9 +24,126 @@ from module.multi_thread import MultiThread
 from module.exception import OperationalException
 from module.aws.aws import Aws
 from module.aws.s3 import S3
-from util.get_tickers import get_yahoo_tickers
+from module.watermark import Watermark
+from module.run_manifest import RunManifest
+from module.partition_writer import PartitionWriter
+from module.ticker_cache import TickerCache
+from module.tor import Tor
+from util.get_tickers import get_yahoo_tickers, shard_tickers
 from util.parse_args import parse_args_load
+from util.curl_url import session_pool, rate_limiter, response_cache, proxy_pool
 from util.optimise_frame import optimise_frame
+from util.hash_frame import hash_frame
+from config.constant import CONTENT_HASH_KEY, STREAM_FOLDER, WATERMARK_KEY
+
+
+def partition_folder(day) -> str:
+    """
+    Bucket folder of a given day - partition
+
+    ::param day: partition day
+
+    ::return folder path, considering bucket as root
+    """
+    # we determine bucket folder using day datetime
+    _date = pd.to_datetime(day)
+    return f"raw_data/yahoo/{_date.year}/{_date.month}/{_date.day}"
+
+
+def shard_suffix(shard: tuple = None) -> str:
+    """
+    Suffix of files written by a given shard
+
+    ::param shard: (shard, nshards) tuple, None if not sharded
+
+    ::return suffix, ex: _1of4. empty if not sharded
+    """
+    return f"_{shard[0]}of{shard[1]}" if shard else ""
+
+
+def partition_file(day, shard: tuple = None) -> str:
+    """
+    Bucket file of a given day - partition.
+    Each shard writes its own file within the partition
+
+    ::param day: partition day
+    ::param shard: (shard, nshards) tuple, None if not sharded
+
+    ::return file path, considering bucket as root
+    """
+    # filename format yahoo_data_YYMMDD[_XofN]
+    _date = pd.to_datetime(day)
+    return (
+        f"{partition_folder(day)}/"
+        f"yahoo_data_{_date.strftime('%y%m%d')}{shard_suffix(shard)}.parquet"
+    )
+
+
+def list_partitions(s3: S3, days: list) -> dict:
+    """
+    Files of days - partitions - in bulk, see S3.list_folders.
+    Listed once per run, then shared by tasks
+
+    ::param s3: bucket holding the partitions
+    ::param days: partition days
+
+    ::return dict partition folder, with trailing slash: parquet files
+    """
+    listing = s3.list_folders([f"{partition_folder(day)}/" for day in days])
+
+    return {
+        folder: [file for file in files if file.endswith(".parquet")]
+        for folder, files in listing.items()
+    }
+
+
+def partition_files(params: dict, day) -> list:
+    """
+    Files of a given day - partition, from the listing shared by tasks.
+    Listed on its own if not listed yet
+
+    ::param params:
+        - s3: bucket holding the partition
+        - listing: optional, see list_partitions
+    ::param day: partition day
+
+    ::return file paths, considering bucket as root
+    """
+    listing = params.get("listing")
+    if listing is None:
+        listing = list_partitions(params["s3"], [day])
+
+    return listing.get(f"{partition_folder(day)}/", [])
+
+
+def stale_files(files: list, day, shard: tuple = None) -> list:
+    """
+    Files of a given day - partition - written with another layout,
+    ie. unsharded, or sharded with another number of shards
+
+    ::param files: partition files, see partition_files
+    ::param day: partition day
+    ::param shard: (shard, nshards) tuple, None if not sharded
+
+    ::return file paths, considering bucket as root
+    """
+    # every shard of the same layout is current, other shards may run concurrently
+    if shard:
+        layout = re.compile(rf"_\d+of{shard[1]}\.parquet$")
+        return [file for file in files if not layout.search(file)]
+
+    return [file for file in files if file != partition_file(day)]
+
+
+def partitions(df: pd.DataFrame) -> list:
+    """
+    Split data into days - partitions - in a single pass
+
+    ::param df: data to split
+
+    ::return list of (day, df) tuples
+    """
+    return list(df.groupby("timestamp", sort=False))
 
 
 def upload(params: dict) -> dict:
@@ -30,88 +151,323 @@ def upload(params: dict) -> dict:
     Upload data to signals-data for a given day - partition.
 
     ::param params:
-        - task: day
+        - task: (day, df) tuple, see partitions
         - params
-            - df: data to upload
             - s3: bucket to upload to
+            - shard: optional (shard, nshards) tuple
+            - manifest: optional RunManifest, upload is recorded
+            - listing: optional, see list_partitions
 
     ::return response: s3.upload_file response
     """
     logger = Logger().logger
 
     # parse parameters dict
-    df = params["params"]["df"]  # original df
-    day = params["task"]  # day to filter df with
+    # only that day portion of the data is handed over
+    # because we want to upload it to target partition folder
+    day, tmp = params["task"]
     s3 = params["params"]["s3"]  # target s3
 
-    # filtering df on given day
-    # because we want to upload to target partition folder
-    # only that portion of the data
-    tmp = df[df["timestamp"] == day]
+    # serializing in memory, no local file
+    buffer = io.BytesIO()
+    tmp.to_parquet(buffer, index=False)
 
-    day_datetime = pd.to_datetime(day)
-    day_str = day_datetime.strftime("%y%m%d")
+    target_path = partition_file(day, params["params"].get("shard"))
 
-    # filename format yahoo_data_YYMMDD
-    filename = f"yahoo_data_{day_str}"
+    # upload it to s3 target folder, replacing the previous file in place
+    # content hash is kept along, see unchanged
+    logger.info(f"{tmp.shape[0]} entries to upload to {target_path}")
+    buffer.seek(0)
+    response = s3.upload_file(
+        target_path, buffer, metadata={CONTENT_HASH_KEY: hash_frame(tmp)}
+    )
 
-    # saving file locally first
-    source_path = f"data/raw_data/{filename}.parquet"
-    tmp.to_parquet(source_path, index=False)
+    # files of other layouts are removed once the new file is there
+    # a run dying in between leaves the partition readable, never empty
+    purge([day], s3, params["params"].get("shard"), params["params"].get("listing"))
+    record_upload(params["params"].get("manifest"), target_path, response)
 
-    # we determine bucket folder using day_datetime
-    _year = day_datetime.year
-    _month = day_datetime.month
-    _day = day_datetime.day
-    target_folder = f"raw_data/yahoo/{_year}/{_month}/{_day}"
-    target_path = f"{target_folder}/{filename}.parquet"
+    return response
 
-    # upload it to s3 target folder
-    logger.info(f"{tmp.shape[0]} entries to upload to {target_path}")
-    response = s3.upload_file(target_path, source_path)
 
-    # remove local file
-    os.remove(source_path)
+def record_upload(manifest: RunManifest, target_path: str, response: dict) -> None:
+    """
+    Record a successful partition upload in run manifest
 
-    return response
+    ::param manifest: RunManifest, None if not checkpointed
+    ::param target_path: partition file uploaded
+    ::param response: s3.upload_file response
+    """
+    if manifest is not None and response["ResponseMetadata"]["HTTPStatusCode"] == 200:
+        manifest.mark_uploaded(target_path)
+
+
+def unchanged(params: dict):
+    """
+    Compare a day - partition - with its last upload, using content hashes
+
+    ::param params:
+        - task: (day, df) tuple, see partitions
+        - params
+            - s3: bucket holding the partition
+            - shard: optional (shard, nshards) tuple
+            - listing: optional, see list_partitions
+
+    ::return day if partition is unchanged, None otherwise.
+        Partitions holding files of another layout are never unchanged
+    """
+    day, tmp = params["task"]
+    s3 = params["params"]["s3"]
+    shard = params["params"].get("shard")
+
+    metadata = s3.get_metadata(partition_file(day, shard)) or {}
+    if metadata.get(CONTENT_HASH_KEY) == hash_frame(tmp):
+        if not stale_files(partition_files(params["params"], day), day, shard):
+            return day
+
+    return None
+
+
+def purge(days: list, s3: S3, shard: tuple = None, listing: dict = None) -> None:
+    """
+    Delete old data from signals-data once new data is uploaded.
+    Partition files are replaced in place by uploads, only files of
+    other layouts are left to delete, see stale_files
+
+    ::param days: days - partitions - to clean
+    ::param s3: bucket to clean
+    ::param shard: optional (shard, nshards) tuple.
+        Files of other shards of the same layout are kept,
+        other shards may run concurrently
+    ::param listing: optional, see list_partitions. Listed at once if not given
+    """
+    logger = Logger().logger
+
+    params = {"s3": s3, "listing": listing or list_partitions(s3, days)}
+    files = [
+        file
+        for day in days
+        for file in stale_files(partition_files(params, day), day, shard)
+    ]
+    logger.info(f"Deleting {len(files)} stale files from {len(days)} partitions")
+    failed = s3.delete_files(files) if files else []
+
+    # checking if stale files are actually deleted
+    # raise OperationalException if not. this prevents from double inserting
+    if failed:
+        logger.error(
+            f'{OperationalException(f"Stale files deletion failed for {failed}. Exiting.")}',
+            exc_info=True,
+        )
 
 
 def delete(params) -> None:
     """
-    Delete old data from signals-data before uploading new data
+    Delete old data from signals-data for a given day - partition
 
     ::param params:
         - task: day
         - params
             - s3: bucket to upload to
+            - shard: optional (shard, nshards) tuple
+            - listing: optional, see list_partitions
     """
-    logger = Logger().logger
+    purge(
+        [params["task"]],
+        params["params"]["s3"],
+        params["params"].get("shard"),
+        params["params"].get("listing"),
+    )
+
+
+def read(params) -> pd.DataFrame:
+    """
+    Read data already loaded in signals-data for a given day - partition
 
+    ::param params:
+        - task: day
+        - params
+            - s3: bucket to read from
+            - shard: optional (shard, nshards) tuple, only its file is read
+            - listing: optional, see list_partitions
+
+    ::return df: partition content, None if empty
+    """
     # parse parameters dict
     day = params["task"]
     s3 = params["params"]["s3"]
+    shard = params["params"].get("shard")
 
-    # we determine bucket folder using day_datetime
-    _date = pd.to_datetime(day)
-    _year = _date.year
-    _month = _date.month
-    _day = _date.day
-    target_folder = f"raw_data/yahoo/{_year}/{_month}/{_day}"
-
-    # delete/empty file from s3
-    logger.info(f"Emptying {target_folder}")
-    files = s3.list_folder(target_folder)
+    if shard:
+        files = [partition_file(day, shard)]
+    else:
+        files = partition_files(params["params"], day)
+
+    frames = []
     for file in files:
-        s3.delete_file(file)
+        content = s3.read_file(file)
+        if content is not None:
+            frames.append(pd.read_parquet(io.BytesIO(content)))
+
+    return pd.concat(frames) if frames else None
 
-    # checking if folder is actually empty
-    # raise OperationalException if not. this prevents from double inserting
-    files = s3.list_folder(target_folder)
-    if files:
-        logger.error(
-            f'{OperationalException("Empty folder operation failed. Exiting.")}',
-            exc_info=True,
-        )
+
+def flush(params) -> dict:
+    """
+    Replace a day - partition - in signals-data with its spilled file
+
+    ::param params:
+        - task: day
+        - params
+            - writer: PartitionWriter holding the spilled file
+            - s3: bucket to upload to
+            - merge: keep rows already loaded for other tickers
+            - shard: optional (shard, nshards) tuple
+            - manifest: optional RunManifest, upload is recorded
+            - listing: optional, see list_partitions
+
+    ::return response: s3.upload_file response
+    """
+    logger = Logger().logger
+
+    # parse parameters dict
+    day = params["task"]
+    writer = params["params"]["writer"]
+    s3 = params["params"]["s3"]
+    source_path = writer.paths[day]
+
+    # append rows already loaded to the spilled file,
+    # new rows replace existing ones for the same ticker
+    if params["params"]["merge"]:
+        existing = read(params)
+        if existing is not None:
+            existing = existing[~existing["ticker"].isin(writer.tickers[day])]
+            existing.to_parquet(
+                source_path, engine="fastparquet", index=False, append=True
+            )
+
+    target_path = partition_file(day, params["params"].get("shard"))
+
+    # skip partitions identical to their last upload
+    digest = hash_frame(pd.read_parquet(source_path))
+    metadata = s3.get_metadata(target_path) or {}
+    stale = stale_files(
+        partition_files(params["params"], day), day, params["params"].get("shard")
+    )
+    if metadata.get(CONTENT_HASH_KEY) == digest and not stale:
+        logger.info(f"{target_path} unchanged, skipping")
+        os.remove(source_path)
+        return None
+
+    # upload it to s3 target folder, replacing the previous file in place
+    logger.info(f"{writer.rows[day]} new entries to upload to {target_path}")
+    response = s3.upload_file(
+        target_path, source_path, metadata={CONTENT_HASH_KEY: digest}
+    )
+
+    # then remove files of other layouts, the partition is never empty
+    delete(params)
+    record_upload(params["params"].get("manifest"), target_path, response)
+
+    # remove local file
+    os.remove(source_path)
+
+    return response
+
+
+def merge(
+    df: pd.DataFrame, s3: S3, shard: tuple = None, listing: dict = None
+) -> pd.DataFrame:
+    """
+    Merge new data with data already loaded in the same partitions.
+    New rows replace existing ones for the same ticker and day
+
+    ::param df: new data
+    ::param s3: bucket to read from
+    ::param shard: optional (shard, nshards) tuple, only its files are read
+    ::param listing: optional, see list_partitions
+
+    ::return df: partitions content, updated
+    """
+    # call multi thread to read partitions
+    # one process per partition touched by new data
+    mtr = MultiThread()
+    mtr.execute(
+        df.timestamp.unique(), read, {"s3": s3, "shard": shard, "listing": listing}
+    )
+    existing = mtr.parse_transform()
+
+    if existing.empty:
+        return df
+
+    keys = ["ticker", "timestamp"]
+    replaced = existing.set_index(keys).index.isin(df.set_index(keys).index)
+
+    return pd.concat([existing[~replaced], df], ignore_index=True)
+
+
+def crawl(ranges: dict, start_date, end_date, args, manifest: RunManifest = None):
+    """
+    Run yahoo finance API crawler, range by range, batch by batch
+
+    ::param ranges: {start date: [tickers]}
+    ::param start_date: load start date, inclusive
+    ::param end_date: load end date, exclusive
+    ::param args: parsed CLI arguments
+    ::param manifest: optional RunManifest, each batch is checkpointed
+
+    ::yield df: crawled data, filtered and optimized
+    """
+    logger = Logger().logger
+
+    # somehow tzinfo is not utc so we replace it first
+    # and then convert to timestamp
+    end_ts = end_date.replace(tzinfo=dt.timezone.utc).timestamp()
+
+    try:
+        for range_start, range_tickers in sorted(ranges.items()):
+            range_start_ts = range_start.replace(tzinfo=dt.timezone.utc).timestamp()
+            for i in range(0, len(range_tickers), args.batch_size):
+                batch = range_tickers[i:i + args.batch_size]
+                logger.info(
+                    f"Crawling {len(batch)} tickers from "
+                    f'{range_start.strftime("%y%m%d")}'
+                )
+
+                try:
+                    df = Yahoo(
+                        batch,
+                        range_start_ts,
+                        end_ts,
+                        engine=args.engine,
+                        concurrency=args.concurrency,
+                        max_attempts=args.max_attempts,
+                        spark_batch=args.spark_batch,
+                    ).load_data()
+
+                # no new data for these tickers, eg. weekend or delisted
+                except AssertionError:
+                    logger.info(f"No data from {range_start.strftime('%y%m%d')}")
+                    if manifest is not None:
+                        manifest.checkpoint(batch)
+                    continue
+
+                # limit curled data to [start_date, end_date[
+                # it is not clear why the API returns data outside of boundaries
+                df = df[(df["timestamp"] >= start_date) & (df["timestamp"] < end_date)]
+
+                # optimize frame
+                df = optimise_frame(df)
+
+                # crawled data is kept in bucket until the run is over
+                if manifest is not None:
+                    manifest.checkpoint(batch, df)
+
+                yield df
+
+    # keep-alive connections are reused across batches, released once crawled
+    finally:
+        session_pool.close()
 
 
 def main():
@@ -129,6 +485,28 @@ def main():
         # set environment context
         App.set("local", args.local)
 
+        # http sessions settings, shared by crawler workers
+        session_pool.configure(
+            args.pool_size, args.connect_timeout, args.read_timeout
+        )
+        rate_limiter.configure(args.rate)
+        # requests spread across proxies, throttled tor instances
+        # get new identities in background
+        if args.proxies:
+            ports = dict(zip(args.proxies, args.tor_control_ports or []))
+
+            def rotate(proxy):
+                Tor.renew(ports[proxy])
+
+            proxy_pool.configure(
+                args.proxies, args.proxy_strategy, rotate=rotate if ports else None
+            )
+
+        if args.cache:
+            response_cache.configure(
+                ttl=args.cache_ttl, max_size=args.cache_size * 1024 ** 2
+            )
+
         # convert crawler boundaries, args.start and args.end
         # to datetime first
         start_date = dt.datetime.strptime(args.start, "%y%m%d")
@@ -137,44 +515,197 @@ def main():
             f'Crawler date range: [{start_date.strftime("%y%m%d")}, '
             f'{end_date.strftime("%y%m%d")}['
         )
-        # then to timestamp
-        # somehow tzinfo is not utc so we replace it first
-        # and then convert to timestamp
-        start_ts = start_date.replace(tzinfo=dt.timezone.utc).timestamp()
-        end_ts = end_date.replace(tzinfo=dt.timezone.utc).timestamp()
+        # get aws acount_id and initialize s3 resource
+        aws_account_id = Aws().get_account_id()
+        s3 = S3(f"{aws_account_id}-signals-data")
+
+        # run manifest checkpoints crawled tickers, partitions and uploads
+        # a run that died halfway is continued with --resume run_id
+        # only kept in memory unless checkpointed
+        manifest = RunManifest(
+            s3,
+            args.resume,
+            dict(
+                start=args.start,
+                end=args.end,
+                ticker=args.ticker,
+                ntickers=args.ntickers,
+                incremental=args.incremental,
+                stream=args.stream,
+                shard=args.shard,
+                nshards=args.nshards,
+            ),
+            persist=args.checkpoint or bool(args.resume),
+        )
+        if args.resume:
+            manifest.load()
+            if manifest.complete:
+                logger.info(f"Run {manifest.run_id} is already complete")
+                return
+        if manifest.persist:
+            logger.info(f"Run id: {manifest.run_id}")
 
         # download tickers list from numerai
         logger.info(f"Collecting tickers")
-        tickers = get_yahoo_tickers(args.ticker, args.ntickers)
+        # universe snapshot is cached locally and in bucket
+        tickers = get_yahoo_tickers(
+            args.ticker, args.ntickers, TickerCache(s3), args.offline
+        )
+
+        # shard mode: this task only loads its share of tickers
+        # and only writes its own file within each partition
+        shard = (args.shard, args.nshards) if args.nshards > 1 else None
+        if shard:
+            tickers = shard_tickers(tickers, args.shard, args.nshards)
+            logger.info(f"Shard {args.shard} of {args.nshards}")
         logger.info(f"Crawler coverage: {len(tickers)} tickers")
 
+        # resumed run: tickers crawled by the previous attempt are skipped
+        if manifest.crawled:
+            tickers = [ticker for ticker in tickers if ticker not in manifest.crawled]
+            logger.info(f"{len(tickers)} tickers left to crawl")
+
+        # incremental mode: crawl each ticker from its last loaded date
+        # tickers sharing the same start date are crawled together
+        if args.incremental:
+            watermark = Watermark(
+                s3, WATERMARK_KEY.replace(".json.gz", f"{shard_suffix(shard)}.json.gz")
+            ).load()
+            ranges = watermark.ranges(tickers, start_date, end_date)
+        else:
+            ranges = {start_date: tickers}
+
         # run yahoo finance API crawler
         logger.info(f"Crawling API")
-        df = Yahoo(tickers, start_ts, end_ts).load_data()
-
-        # limit curled data to [start_date, end_date[
-        # it is not clear why the API returns data outside of boundaries
-        df = df[(df["timestamp"] >= start_date) & (df["timestamp"] < end_date)]
-
-        # optimize frame
-        df = optimise_frame(df)
-
-        # get aws acount_id and initialize s3 resource
-        aws_account_id = Aws().get_account_id()
-        s3 = S3(f"{aws_account_id}-signals-data")
-
-        # call multi thread to empty partition folders
-        mtd = MultiThread()
-        days = df.timestamp.unique()
-        # one process per bucket partition to empty
-        mtd.execute(days, delete, {"s3": s3})
-
-        # call multi thread to upload files
-        mtu = MultiThread()
-        days = df.timestamp.unique()
-        # one process per day (bucket partition) to upload
-        mtu.execute(days, upload, {"df": df, "s3": s3})
-        logger.info(f"Nfiles uploaded: {mtu.parse_upload()}")
+        # batches crawled by the previous attempt first, if resumed
+        batches = chain(
+            manifest.frames(), crawl(ranges, start_date, end_date, args, manifest)
+        )
+        if args.incremental:
+            batches = (watermark.filter(df) for df in batches)
+
+        # stream mode: batches are spilled to local partition files
+        # as they are crawled, then each partition is flushed to s3
+        if args.stream:
+            writer = PartitionWriter(f"{STREAM_FOLDER}{shard_suffix(shard)}")
+            for df in batches:
+                writer.append(df)
+                del df
+
+            if not writer.paths:
+                logger.info("Nothing to load")
+                manifest.finish()
+                return
+
+            logger.info(
+                f"{sum(writer.rows.values())} new entries, "
+                f"{len(writer.paths)} partitions to rewrite"
+            )
+
+            # partitions uploaded by the previous attempt are not rewritten
+            manifest.mark_partitions(writer.days())
+            days = [
+                day
+                for day in writer.days()
+                if partition_file(day, shard) not in manifest.uploaded
+            ]
+
+            # partitions listed at once, for merges and stale files
+            listing = list_partitions(s3, days)
+
+            # call multi thread to flush partitions
+            # one process per day (bucket partition)
+            mtu = MultiThread()
+            mtu.execute(
+                days,
+                flush,
+                {
+                    "writer": writer,
+                    "s3": s3,
+                    "merge": args.incremental,
+                    "shard": shard,
+                    "manifest": manifest,
+                    "listing": listing,
+                },
+            )
+            logger.info(f"Nfiles uploaded: {mtu.parse_upload()}")
+
+            # loaded tickers and days, for watermarks
+            df_new = pd.DataFrame(
+                [
+                    [ticker, day]
+                    for day, tickers in writer.tickers.items()
+                    for ticker in tickers
+                ],
+                columns=["ticker", "timestamp"],
+            )
+
+        else:
+            frames = list(batches)
+            if not frames:
+                logger.info("Nothing to load")
+                manifest.finish()
+                return
+
+            df = pd.concat(frames, ignore_index=True)
+            df_new = df
+
+            # partitions listed at once, for merges and stale files
+            listing = list_partitions(s3, df.timestamp.unique())
+
+            # incremental mode: partitions new rows touch are read back
+            # and merged, rewriting a partition with new rows only
+            # would lose the others
+            if args.incremental:
+                df = merge(df, s3, shard, listing)
+                logger.info(
+                    f"{df_new.shape[0]} new entries, "
+                    f"{df.timestamp.nunique()} partitions to rewrite"
+                )
+
+            # split data into partitions once
+            # partitions uploaded by the previous attempt are not rewritten
+            tasks = partitions(df)
+            manifest.mark_partitions([day for day, _ in tasks])
+            tasks = [
+                (day, tmp)
+                for day, tmp in tasks
+                if partition_file(day, shard) not in manifest.uploaded
+            ]
+
+            # call multi thread to compare partitions with their last upload
+            # unchanged ones are not uploaded
+            mth = MultiThread()
+            mth.execute(
+                tasks, unchanged, {"s3": s3, "shard": shard, "listing": listing}
+            )
+            skipped = set(mth.parse_results())
+            tasks = [(day, tmp) for day, tmp in tasks if day not in skipped]
+            logger.info(f"{len(skipped)} partitions unchanged, skipping")
+
+            # call multi thread to upload files
+            mtu = MultiThread()
+            # one process per day (bucket partition) to upload
+            mtu.execute(
+                tasks,
+                upload,
+                {"s3": s3, "shard": shard, "manifest": manifest, "listing": listing},
+            )
+            logger.info(f"Nfiles uploaded: {mtu.parse_upload()}")
+
+        # move watermarks forward once data is uploaded
+        if args.incremental:
+            watermark.update(df_new)
+            watermark.save()
+
+        # checkpoints are no longer needed
+        manifest.finish()
+
+        proxy_pool.stop()
+
+        # peak memory, kilobytes on linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info(f"Peak RSS: {round(peak_rss / 1024, 2)}MB")
 
         # logging run time
         _time = round(time() - run_start_time, 2)
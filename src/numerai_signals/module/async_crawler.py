@@ -0,0 +1,178 @@
+"""
+async_crawler.py
+
+Implements AsyncCrawler
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import asyncio
+import random
+from time import monotonic
+
+import aiohttp
+
+from config.constant import (
+    USER_AGENTS,
+    CRAWLER_CONCURRENCY,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+)
+from module.logger.logger import Logger
+from module.chart_buffer import ChartBuffer
+from module.rate_limiter import RateLimiter
+from module.response_cache import ResponseCache
+from module.proxy_pool import ProxyPool
+from util.curl_url import is_retryable
+
+logger = Logger().logger
+
+
+class AsyncCrawler:
+    """
+    Asyncio alternative to MultiThread for curling urls.
+    All requests share one HTTP connection pool,
+    the number of requests in flight is bounded by concurrency.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CRAWLER_CONCURRENCY,
+        timeout: tuple = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        rate_limiter: RateLimiter = None,
+        response_cache: ResponseCache = None,
+        proxy_pool: ProxyPool = None,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param concurrency: maximum number of requests in flight
+        ::param timeout: (connect, read) timeouts in seconds
+        ::param rate_limiter: shared rate limiter, a new one if not given
+        ::param response_cache: responses cache, disabled if not given
+        ::param proxy_pool: proxies to spread requests across, direct if not given
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.response_cache = response_cache or ResponseCache()
+        self.proxy_pool = proxy_pool or ProxyPool()
+        self.responses = []
+
+    def execute(self, urls: list, params: dict = None) -> None:
+        """
+        Curl every url, blocking until all of them are completed
+
+        ::param urls: list of urls to curl
+        ::param params: request parameters, shared by all urls
+        """
+        self.responses = asyncio.run(self._crawl(urls, params))
+
+    async def _crawl(self, urls: list, params: dict) -> list:
+        """
+        Open the shared session and schedule one coroutine per url
+
+        ::param urls: list of urls to curl
+        ::param params: request parameters
+
+        ::return list of [url, data, status]
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.timeout[0], sock_read=self.timeout[1]
+        )
+
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            return await asyncio.gather(
+                *[self._curl(session, semaphore, url, params) for url in urls]
+            )
+
+    async def _curl(self, session, semaphore, url: str, params: dict) -> list:
+        """
+        Curl URL, asyncio counterpart of util.curl_url
+
+        ::param session: shared aiohttp.ClientSession
+        ::param semaphore: bounds requests in flight
+        ::param url: requested URL
+        ::param params: request parameters
+
+        ::return [url, data, status]
+            - data: response data, None if failed
+            - status: HTTP status code, None if no response
+        """
+        # serve from cache if possible
+        data = self.response_cache.get(url, params)
+        if data is not None:
+            return [url, data, 200]
+
+        async with semaphore:
+            # wait for our turn
+            await asyncio.sleep(self.rate_limiter.reserve())
+
+            # assign a proxy, if any
+            proxy = self.proxy_pool.acquire()
+            start = monotonic()
+
+            try:
+                logger.info(f"Crawling {url}")
+                async with session.get(
+                    url,
+                    params=params,
+                    headers={"User-Agent": random.choice(USER_AGENTS)},
+                    proxy=proxy,
+                ) as response:
+                    status = response.status
+                    self.proxy_pool.report(
+                        proxy, is_retryable(status), monotonic() - start
+                    )
+
+                    # slow down if throttled, speed up otherwise
+                    if is_retryable(status):
+                        self.rate_limiter.on_throttle()
+                        logger.info(f"Throttled {url}: HTTP {status}")
+                        return [url, None, status]
+
+                    self.rate_limiter.on_success()
+                    data = await response.json(content_type=None)
+
+                    if status == 200:
+                        self.response_cache.put(url, params, data)
+
+                    return [url, data, status]
+
+            except Exception as e:
+                # return none if exception
+                self.rate_limiter.on_throttle()
+                self.proxy_pool.report(proxy, True)
+                logger.info(f"Exception {url}: {e}")
+                return [url, None, None]
+
+    def parse_yahoo(self, buffer: ChartBuffer) -> list:
+        """
+        Parse responses into given buffer
+
+        ::param buffer: ChartBuffer to write into
+
+        ::return urls to retry, ie. throttled or failed
+        """
+        retry = []
+
+        # parse responses into column buffers
+        for url, response, status in self.responses:
+            if is_retryable(status):
+                retry.append(url)
+                continue
+
+            try:
+                buffer.add(response)
+
+            except Exception as e:
+                # pass if could not parse response
+                logger.info(f"Exception {url}: {e}")
+                pass
+
+        return retry
@@ -8,7 +8,13 @@ __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
 import io
+import os
+from time import time
 
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from config.constant import S3_PART_SIZE, S3_MAX_CONCURRENCY, S3_DELETE_BATCH_SIZE
 from module.logger.logger import Logger
 from module.aws.aws import Aws
 
@@ -21,12 +27,20 @@ class S3:
     various function to interact with a S3 bucket
     """
 
-    def __init__(self, bucket: str, region: str = "eu-west-1"):
+    def __init__(
+        self,
+        bucket: str,
+        region: str = "eu-west-1",
+        part_size: int = S3_PART_SIZE,
+        max_concurrency: int = S3_MAX_CONCURRENCY,
+    ):
         """
         Class constructor
 
         :param bucket: bucket name
         :param region: bucket region
+        :param part_size: multipart transfers part size, bytes
+        :param max_concurrency: parts transferred in parallel
 
         ex: S3('bucket')
         """
@@ -35,6 +49,32 @@ class S3:
         self.session = Aws.session()
         self.resource = self.session.resource("s3", region_name=region)
 
+        # files larger than a part are uploaded with multipart uploads
+        # and downloaded with ranged gets, streamed to and from disk
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+
+    @staticmethod
+    def log_throughput(action: str, s3_file_path: str, size: int, start: float) -> None:
+        """
+        Log transfer size and throughput
+
+        ::param action: transfer direction, ex: Uploaded
+        ::param s3_file_path: transferred file
+        ::param size: transferred bytes
+        ::param start: transfer start time
+        """
+        elapsed = max(time() - start, 1e-6)
+        size_mb = size / 1024 ** 2
+        logger.info(
+            f"{action} {s3_file_path}: {round(size_mb, 2)}MB "
+            f"in {round(elapsed, 2)}sec ({round(size_mb / elapsed, 2)}MB/s)"
+        )
+
     def list_folder(self, folder_path: str) -> list:
         """
         List files within given folder
@@ -45,21 +85,41 @@ class S3:
         elements = self.resource.Bucket(self.bucket).objects.filter(Prefix=folder_path)
         return [element.key for element in elements]
 
-    def upload_file(self, s3_file_path, local_file_path) -> dict:
+    def upload_file(self, s3_file_path, local_file_path, metadata: dict = None) -> dict:
         """
         Upload file at desired location
 
         ::param s3_file_path: absolute path to file, considering bucket as root
-        ::param local_file_path: relative path to local file, starting at folder root
+        ::param local_file_path: relative path to local file, starting at folder root.
+            In memory content is uploaded as is: bytes or binary buffer
+        ::param metadata: user defined object metadata
 
         ::return response: request response
         """
         logger.info(f"Uploading file {s3_file_path}")
-        response = self.resource.Object(self.bucket, s3_file_path).put(
-            Body=open(local_file_path, "rb")
+        metadata = metadata or {}
+
+        # in memory content
+        if isinstance(local_file_path, (bytes, bytearray, io.IOBase)):
+            return self.resource.Object(self.bucket, s3_file_path).put(
+                Body=local_file_path, Metadata=metadata
+            )
+
+        # managed transfer, raises S3UploadFailedError on failure
+        start = time()
+        self.resource.meta.client.upload_file(
+            local_file_path,
+            self.bucket,
+            s3_file_path,
+            ExtraArgs={"Metadata": metadata},
+            Config=self.transfer_config,
+        )
+        self.log_throughput(
+            "Uploaded", s3_file_path, os.path.getsize(local_file_path), start
         )
 
-        return response
+        # upload_file returns nothing, mimic put response for callers
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
 
     def download_file(self, s3_file_path: str, local_file_path: str) -> None:
         """
@@ -68,14 +128,53 @@ class S3:
         ::param s3_file_path: where to find file in s3 bucket
         ::param local_file_path: where to save file
         """
-        # download file
-        response = self.resource.Bucket(self.bucket).Object(key=s3_file_path).get()
+        logger.info(f"Downloading file {s3_file_path}")
+
+        # ranged gets written straight to disk, nothing held in memory
+        start = time()
+        self.resource.meta.client.download_file(
+            self.bucket, s3_file_path, local_file_path, Config=self.transfer_config
+        )
+        self.log_throughput(
+            "Downloaded", s3_file_path, os.path.getsize(local_file_path), start
+        )
+
+    def read_file(self, s3_file_path: str) -> bytes:
+        """
+        Read file content from self.bucket
+
+        ::param s3_file_path: where to find file in s3 bucket
+
+        ::return file content, None if file does not exist
+        """
+        try:
+            response = self.resource.Object(self.bucket, s3_file_path).get()
 
-        # convert response into readable file and save
-        io_bytes = io.BytesIO(response["Body"].read())
-        io_text = io.TextIOWrapper(io_bytes, encoding="utf-8")
-        with open(local_file_path, "w") as f:
-            f.write(io_text.read())
+        except self.resource.meta.client.exceptions.NoSuchKey:
+            return None
+
+        return response["Body"].read()
+
+    def get_metadata(self, s3_file_path: str) -> dict:
+        """
+        Read user defined metadata of a file, without downloading it
+
+        ::param s3_file_path: where to find file in s3 bucket
+
+        ::return metadata, None if file does not exist
+        """
+        try:
+            response = self.resource.meta.client.head_object(
+                Bucket=self.bucket, Key=s3_file_path
+            )
+
+        # head requests have no body, hence no NoSuchKey error code
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise e
+
+        return response["Metadata"]
 
     def delete_file(self, file_path) -> None:
         """
@@ -87,3 +186,60 @@ class S3:
 
         if response["ResponseMetadata"]["HTTPStatusCode"] != 204:
             logger.info(response)
+
+    def list_folders(self, folders: list) -> dict:
+        """
+        List files within given folders, in bulk.
+        Folders sharing a parent, ie. days of a month, are listed at once
+        under their common prefix
+
+        ::param folders: absolute paths to folders, with trailing slash
+
+        ::return dict folder: files within it, considering bucket as root
+        """
+        listing = {folder: [] for folder in folders}
+
+        # one listing per parent folder, a year boundary does not
+        # widen the prefix to the whole history
+        groups = {}
+        for folder in listing:
+            parent = folder[: folder.rstrip("/").rfind("/") + 1]
+            groups.setdefault(parent, []).append(folder)
+
+        client = self.resource.meta.client
+        for group in groups.values():
+            prefix = os.path.commonprefix(group)
+            prefix = prefix[: prefix.rfind("/") + 1]
+            for page in client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=prefix
+            ):
+                for element in page.get("Contents", []):
+                    key = element["Key"]
+                    # common prefix may also cover other folders
+                    folder = key[: key.rfind("/") + 1]
+                    if folder in listing:
+                        listing[folder].append(key)
+
+        return listing
+
+    def delete_files(self, keys: list) -> list:
+        """
+        Delete files from self.bucket, by batches of S3_DELETE_BATCH_SIZE.
+        Missing files are not an error
+
+        ::param keys: where to find files in s3 bucket
+
+        ::return files that could not be deleted
+        """
+        # quiet mode: only failed deletions are returned
+        # which verifies the deletion without listing again
+        failed = []
+        for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+            response = self.resource.meta.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            failed += [error["Key"] for error in response.get("Errors", [])]
+
+        return failed
@@ -0,0 +1,211 @@
+"""
+chart_buffer.py
+
+Implements ChartBuffer
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import numpy as np
+import pandas as pd
+
+from config.constant import SECONDS_PER_DAY
+
+
+class ChartBuffer:
+    """
+    Purpose of this class:
+        - collect yahoo finance chart responses into numpy column buffers
+        - materialise a single frame once every response is collected
+
+    Appending one small frame per response copies the whole accumulated
+    frame each time, which is quadratic in the number of tickers.
+    Here rows are written into preallocated arrays instead,
+    growing them geometrically when needed.
+    """
+
+    # price columns, as found in response["indicators"]["quote"][0]
+    QUOTE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+    # metadata columns, one value per response
+    META_COLUMNS = {
+        "ticker": "symbol",
+        "currency": "currency",
+        "exchange": "exchangeName",
+    }
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Class constructor
+
+        ::param capacity: initial number of rows to preallocate
+
+        ex: ChartBuffer(5000 * 5)
+        """
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+
+        # one float64 buffer per price column
+        self.quotes = {
+            column: np.empty(self.capacity, dtype=np.float64)
+            for column in ChartBuffer.QUOTE_COLUMNS
+        }
+
+        # local unix timestamp, in seconds
+        self.timestamp = np.empty(self.capacity, dtype=np.int64)
+
+        # index of the response each row comes from
+        # used to broadcast metadata once, at materialisation time
+        self.response = np.empty(self.capacity, dtype=np.int64)
+        self.meta = {column: [] for column in ChartBuffer.META_COLUMNS}
+
+    def _grow(self, nrows: int) -> None:
+        """
+        Make room for nrows additional rows, doubling capacity as needed
+
+        ::param nrows: number of rows about to be written
+        """
+        required = self.size + nrows
+        if required <= self.capacity:
+            return
+
+        capacity = self.capacity
+        while capacity < required:
+            capacity *= 2
+
+        for column, buffer in self.quotes.items():
+            self.quotes[column] = np.resize(buffer, capacity)
+        self.timestamp = np.resize(self.timestamp, capacity)
+        self.response = np.resize(self.response, capacity)
+        self.capacity = capacity
+
+    def add(self, response: dict) -> int:
+        """
+        Write yahoo finance chart response into buffers
+
+        ::param response: curl_url response data, parsed json
+
+        ::return number of rows written
+        """
+        return self.add_result(response["chart"]["result"][0])
+
+    def add_spark(self, response: dict) -> set:
+        """
+        Write yahoo finance spark response - several symbols - into buffers.
+        Symbols missing or incomplete, ie. without every quote column, are skipped
+
+        ::param response: curl_url response data, parsed json
+
+        ::return symbols written
+        """
+        symbols = set()
+        for item in response["spark"]["result"] or []:
+            try:
+                self.add_result(item["response"][0])
+                symbols.add(item["symbol"])
+
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass
+
+        return symbols
+
+    def add_result(self, result: dict) -> int:
+        """
+        Write one symbol chart result into buffers
+
+        ::param result: chart result, with meta, timestamp and indicators
+
+        ::return number of rows written
+        """
+        meta = result["meta"]
+
+        # timestamp
+        # we combine utc timestamp with gmtoffset
+        # in order to get local timestamp
+        # this avoids getting timestamp outside of [start, end[
+        # in particular for those ticker in gmt+X timezones
+        timestamp = np.asarray(result["timestamp"], dtype=np.int64)
+        timestamp += int(meta["gmtoffset"])
+
+        # indicators
+        # open, high, low, close, volume
+        # None values, ie. missing quotes, are converted to nan
+        quote = result["indicators"]["quote"][0]
+        values = {
+            column: np.asarray(quote[column], dtype=np.float64)
+            for column in ChartBuffer.QUOTE_COLUMNS
+        }
+
+        nrows = timestamp.shape[0]
+        for column, value in values.items():
+            if value.shape[0] != nrows:
+                raise ValueError(f"{column} length does not match timestamp")
+
+        # metadata are only validated once all arrays are parsed
+        # so that a faulty response leaves the buffers untouched
+        meta_values = {
+            column: meta[key] for column, key in ChartBuffer.META_COLUMNS.items()
+        }
+
+        self._grow(nrows)
+        start, end = self.size, self.size + nrows
+        for column, value in values.items():
+            self.quotes[column][start:end] = value
+        self.timestamp[start:end] = timestamp
+        self.response[start:end] = len(self.meta["ticker"])
+
+        for column, value in meta_values.items():
+            self.meta[column].append(value)
+
+        self.size = end
+
+        return nrows
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Materialise buffers into a single frame
+
+        ::return df: one row per ticker and day, earliest entry of the day
+        """
+        if not self.size:
+            return pd.DataFrame()
+
+        # ticker code of each row, tickers may span several responses
+        codes, _ = pd.factorize(np.asarray(self.meta["ticker"], dtype=object))
+        ticker = codes[self.response[: self.size]]
+
+        # using local timestamp, floored to day
+        # intraday is not considered for now
+        timestamp = self.timestamp[: self.size]
+        day = timestamp - timestamp % SECONDS_PER_DAY
+
+        # limit to one result per day = earliest time
+        # its is not clear what the other entries are meant for
+        # rows sorted by ticker, day then time, first of each (ticker, day) kept
+        order = np.lexsort((timestamp, day, ticker))
+        ticker, day = ticker[order], day[order]
+        first = np.ones(order.shape[0], dtype=bool)
+        first[1:] = (ticker[1:] != ticker[:-1]) | (day[1:] != day[:-1])
+        rows = order[first]
+
+        df = pd.DataFrame(
+            {column: buffer[rows] for column, buffer in self.quotes.items()}
+        )
+
+        # broadcast metadata from response level to row level
+        response = self.response[rows]
+        for column, values in self.meta.items():
+            df[column] = np.asarray(values, dtype=object)[response]
+
+        # replace timestamp with date
+        # in nanoseconds, whatever the pandas version: second based
+        # datetimes do not round trip through fastparquet appends
+        df["timestamp"] = pd.to_datetime(day[first] * 10 ** 9)
+
+        # fixed column order, whatever the response key order
+        df = df[
+            ChartBuffer.QUOTE_COLUMNS + ["ticker", "timestamp", "currency", "exchange"]
+        ]
+
+        return df
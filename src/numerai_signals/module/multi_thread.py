@@ -7,127 +7,154 @@ Implements MultiThread
 __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from itertools import islice
 
 import pandas as pd
 
+from config.constant import EXECUTOR_CHUNK_SIZE
 from module.logger.logger import Logger
+from module.chart_buffer import ChartBuffer
+from util.curl_url import is_retryable
 
 logger = Logger().logger
 
 
+def execute_chunk(function, chunk: list) -> list:
+    """
+    Apply function to a chunk of tasks, within a worker process
+
+    ::param function: function to apply to each task, picklable
+    ::param chunk: list of {"task": task, "params": params}
+
+    ::return list of results
+    """
+    return [function(proc_params) for proc_params in chunk]
+
+
 class MultiThread:
     """
-    Enabling multi threading
+    Enabling multi threading, or multi processing for CPU bound work.
+
+    With the process backend, tasks are pickled to worker processes
+    chunksize at a time, so tasks should only carry the data they need
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        backend: str = "thread",
+        workers: int = None,
+        chunksize: int = EXECUTOR_CHUNK_SIZE,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param backend: thread, for I/O bound work, or process, for CPU bound work
+        ::param workers: number of workers, executor default if not given
+        ::param chunksize: tasks sent to a worker process at once, process backend only
+        """
+        self.backend = backend
+        self.workers = workers
+        self.chunksize = chunksize
         self.processes = []
 
     def execute(self, tasks, function, params=None) -> None:
         """
-        Our thread pool executor. Basically excecutes processes in parallel.
+        Our pool executor. Basically excecutes processes in parallel.
 
         ::param: tasks: list of tasks. can be day, urls, etc.
         ::param function: function to apply to each task
         ::param params: function parameters
         """
+        if self.backend == "process":
+            # if max_workers is None or not given, it will default
+            # to the number of processors on the machine
+            # function, tasks and params must be picklable
+            with ProcessPoolExecutor(self.workers) as executor:
+                tasks = iter(tasks)
+                while True:
+                    chunk = [
+                        {"task": task, "params": params}
+                        for task in islice(tasks, self.chunksize)
+                    ]
+                    if not chunk:
+                        break
+                    self.processes.append(
+                        executor.submit(execute_chunk, function, chunk)
+                    )
+            return
+
         # if max_workers is None or not giveng, it will default to the number of processors
         # on the machine, multiplied by 5
         # assuming that ThreadPoolExecutor is often used to overlap I/O
         # instead of CPU work and the number of workers should be higher
         # than the number of workers for ProcessPoolExecutor.
-        with ThreadPoolExecutor() as executor:
+        with ThreadPoolExecutor(self.workers) as executor:
             for task in tasks:
                 # send jobs to pool
                 # logger.info(f"Executing {task}")
                 proc_params = {"task": task, "params": params}
                 self.processes.append(executor.submit(function, proc_params))
 
-    def parse_yahoo(self):
-        """
-        Parse curl_url responses and put result into dataframe
+    def results(self):
         """
-        # init df
-        df = pd.DataFrame()
+        Tasks results, as they complete
 
-        # parse responses into tuple and append to final frame
+        ::yield task result, whatever the backend
+        """
         for task in as_completed(self.processes):
-            response = task.result()[1]
+            if self.backend == "process":
+                yield from task.result()
+            else:
+                yield task.result()
+
+    def parse_yahoo(self, buffer: ChartBuffer) -> list:
+        """
+        Parse curl_url responses into given buffer
+
+        Responses are collected into column buffers
+        and the output frame is materialised only once, see ChartBuffer
+
+        ::param buffer: ChartBuffer to write into
+
+        ::return urls to retry, ie. throttled or failed
+        """
+        retry = []
+
+        # parse responses into column buffers
+        for url, response, status in self.results():
+            if is_retryable(status):
+                retry.append(url)
+                continue
+
             try:
-                # indicators
-                # open, high, low, close, volume
-                quote = response["chart"]["result"][0]["indicators"]["quote"][0]
-                # creating frame from this indicator dict
-                df_tmp = pd.DataFrame.from_dict(quote)
-
-                # adding metadata
-                # ticker
-                df_tmp["ticker"] = response["chart"]["result"][0]["meta"]["symbol"]
-
-                # timestamp
-                # we combine utc timestamp with gmtoffset
-                # in order to get local timestamp
-                # this avoids getting timestamp outside of [start, end[
-                # in particular for those ticker in gmt+X timezones
-                utc_timestamp = response["chart"]["result"][0]["timestamp"]
-                gmt_offset = response["chart"]["result"][0]["meta"]["gmtoffset"]
-                local_timestamp = []
-                for ts in utc_timestamp:
-                    local_timestamp.append(ts + gmt_offset)
-
-                # using local timestamp
-                df_tmp["timestamp"] = local_timestamp
-                df_tmp["timestamp"] = pd.to_datetime(df_tmp["timestamp"], unit="s")
-
-                # currency
-                df_tmp["currency"] = response["chart"]["result"][0]["meta"]["currency"]
-                # exchange
-                df_tmp["exchange"] = response["chart"]["result"][0]["meta"][
-                    "exchangeName"
-                ]
-
-                # limit to one result per day = earliest time
-                # its is not clear what the other entries are meant for
-                df_tmp.sort_values(by=["timestamp"])
-                df_tmp["date"] = df_tmp.timestamp.dt.date
-                df_tmp.drop_duplicates(subset=["date"], inplace=True)
-
-                # replace timestamp with date
-                # intraday is not considered for now
-                df_tmp["timestamp"] = pd.to_datetime(df_tmp["date"])
-                df_tmp.drop(columns=["date"], inplace=True)
-
-                df = df.append(df_tmp)
+                buffer.add(response)
 
             except Exception as e:
                 # pass if could not parse response
-                logger.info(f"Exception {task.result()[0]}: {e}")
+                logger.info(f"Exception {url}: {e}")
                 pass
 
-        return df
+        return retry
 
     def parse_transform(self):
-        df = pd.DataFrame()
+        frames = []
 
-        # parse responses into tuple and append to final frame
-        for task in as_completed(self.processes):
-            response = task.result()
-            try:
-                df = df.append(response)
+        # collect responses, failed tasks returned None
+        for response in self.results():
+            if response is not None:
+                frames.append(response)
 
-            except Exception as e:
-                # pass if could not parse response
-                logger.info(f"Exception: {e}")
-                pass
+        # concatenate once, appending frame by frame copies the whole frame
+        if not frames:
+            return pd.DataFrame()
 
-        return df
+        return pd.concat(frames)
 
     def parse_square(self):
         res = []
         # parse responses into tuple and append to final frame
-        for task in as_completed(self.processes):
-            response = task.result()
+        for response in self.results():
             try:
                 res.append(response)
 
@@ -138,11 +165,25 @@ class MultiThread:
 
         return sorted(res)
 
+    def parse_results(self) -> list:
+        """
+        ::return tasks results, None results excluded
+        """
+        res = []
+        for response in self.results():
+            if response is not None:
+                res.append(response)
+
+        return res
+
     def parse_upload(self):
         res = 0
         # parse responses into tuple and append to final frame
-        for task in as_completed(self.processes):
-            response = task.result()
+        for response in self.results():
+            # skipped upload
+            if response is None:
+                continue
+
             try:
                 if response["ResponseMetadata"]["HTTPStatusCode"] == 200:
                     res += 1
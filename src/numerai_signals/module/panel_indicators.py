@@ -0,0 +1,704 @@
+"""
+panel_indicators.py
+
+Implements PanelIndicators
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import numpy as np
+import pandas as pd
+
+from module.exception import OperationalException
+
+# accumulators of rolling_mean and rolling_std
+ROLLING_FIELDS = {
+    "mean": ["nobs", "sum", "add", "remove", "neg", "same", "last"],
+    "var": ["nobs", "mean", "ssq", "add", "remove"],
+}
+
+
+def ewm(x: np.ndarray, alpha: float, start: tuple = None, nbars=None) -> tuple:
+    """
+    Exponential moving average along bars, all tickers at once.
+    Same recursion as pandas ewm(alpha=alpha, adjust=False).mean():
+    missing values are skipped but still decay older values
+
+    ::param x: (bars, tickers) panel
+    ::param alpha: smoothing factor
+    ::param start: (weighted, old_wt) accumulators after previous bars, None if none
+    ::param nbars: bars per ticker, padding after them is ignored
+
+    ::return (bars, tickers) panel, (weighted, old_wt) accumulators after last bar
+    """
+    if start is None:
+        start = (np.full(x.shape[1], np.nan), np.ones(x.shape[1]))
+    weighted, old_wt = start
+    live = np.full(x.shape[1], x.shape[0]) if nbars is None else nbars
+    out = np.empty_like(x)
+
+    for t in range(x.shape[0]):
+        cur = x[t]
+        observed = ~np.isnan(cur) & (t < live)
+        started = ~np.isnan(weighted) & (t < live)
+
+        # decay, then weighted average of old value and new observation
+        old_wt = np.where(started, old_wt * (1 - alpha), old_wt)
+        update = started & observed
+        weighted = np.where(
+            update, (old_wt * weighted + alpha * cur) / (old_wt + alpha), weighted
+        )
+        old_wt = np.where(update, 1.0, old_wt)
+
+        # first observation
+        weighted = np.where(~started & observed, cur, weighted)
+        out[t] = weighted
+
+    return out, (weighted, old_wt)
+
+
+def rolling_mean(
+    x: np.ndarray,
+    window: int,
+    before: np.ndarray = None,
+    start: dict = None,
+    nbars=None,
+) -> tuple:
+    """
+    Rolling mean along bars, all tickers at once.
+    Same algorithm as pandas rolling(window, min_periods=0).mean(), results
+    included: compensated sum, values added and removed as the window moves,
+    windows of a single repeated value are exact
+
+    ::param x: (bars, tickers) panel
+    ::param window: number of bars
+    ::param before: (window, tickers) bars before the first one, nan if none
+    ::param start: accumulators after previous bars, None if none
+    ::param nbars: bars per ticker, padding after them is ignored
+
+    ::return (bars, tickers) panel, accumulators after last bar
+    """
+    acc = dict(start) if start is not None else rolling_start("mean", x.shape[1])
+    before = np.full((window, x.shape[1]), np.nan) if before is None else before
+    values = np.concatenate([before, x])
+    live = np.full(x.shape[1], x.shape[0]) if nbars is None else nbars
+    out = np.empty_like(x)
+
+    for t in range(x.shape[0]):
+        # value leaving the window, then value entering it
+        old, cur = values[t], values[t + window]
+        remove = ~np.isnan(old) & (t < live)
+        y = -old - acc["remove"]
+        total = acc["sum"] + y
+        acc["remove"] = np.where(remove, total - acc["sum"] - y, acc["remove"])
+        acc["sum"] = np.where(remove, total, acc["sum"])
+        acc["nobs"] = acc["nobs"] - remove
+        acc["neg"] = acc["neg"] - (remove & np.signbit(old))
+
+        add = ~np.isnan(cur) & (t < live)
+        y = cur - acc["add"]
+        total = acc["sum"] + y
+        acc["add"] = np.where(add, total - acc["sum"] - y, acc["add"])
+        acc["sum"] = np.where(add, total, acc["sum"])
+        acc["nobs"] = acc["nobs"] + add
+        acc["neg"] = acc["neg"] + (add & np.signbit(cur))
+        acc["same"] = np.where(
+            add, np.where(cur == acc["last"], acc["same"] + 1, 1), acc["same"]
+        )
+        acc["last"] = np.where(add, cur, acc["last"])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = acc["sum"] / acc["nobs"]
+        mean = np.where(acc["same"] >= acc["nobs"], acc["last"], mean)
+        mean = np.where((acc["neg"] == 0) & (mean < 0), 0.0, mean)
+        mean = np.where((acc["neg"] == acc["nobs"]) & (mean > 0), 0.0, mean)
+        out[t] = np.where(acc["nobs"] > 0, mean, np.nan)
+
+    return out, acc
+
+
+def rolling_std(
+    x: np.ndarray,
+    window: int,
+    before: np.ndarray = None,
+    start: dict = None,
+    nbars=None,
+) -> tuple:
+    """
+    Rolling population std along bars, all tickers at once.
+    Same algorithm as pandas rolling(window, min_periods=0).std(ddof=0),
+    results included: Welford updates, values added and removed as the window
+    moves. Windows of a single repeated value keep the residue pandas keeps
+
+    ::param x: (bars, tickers) panel
+    ::param window: number of bars
+    ::param before: (window, tickers) bars before the first one, nan if none
+    ::param start: accumulators after previous bars, None if none
+    ::param nbars: bars per ticker, padding after them is ignored
+
+    ::return (bars, tickers) panel, accumulators after last bar
+    """
+    acc = dict(start) if start is not None else rolling_start("var", x.shape[1])
+    before = np.full((window, x.shape[1]), np.nan) if before is None else before
+    values = np.concatenate([before, x])
+    live = np.full(x.shape[1], x.shape[0]) if nbars is None else nbars
+    out = np.empty_like(x)
+
+    for t in range(x.shape[0]):
+        # value leaving the window, window emptied if it was the last one
+        old, cur = values[t], values[t + window]
+        remove = ~np.isnan(old) & (t < live)
+        nobs = acc["nobs"] - remove
+        previous = acc["mean"] - acc["remove"]
+        y = old - acc["remove"]
+        delta = y - acc["mean"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(nobs > 0, acc["mean"] - delta / nobs, 0.0)
+        ssq = np.where(nobs > 0, acc["ssq"] - (old - previous) * (old - mean), 0.0)
+        acc["remove"] = np.where(
+            remove & (nobs > 0), delta + acc["mean"] - y, acc["remove"]
+        )
+        acc["mean"] = np.where(remove, mean, acc["mean"])
+        acc["ssq"] = np.where(remove, ssq, acc["ssq"])
+        acc["nobs"] = nobs
+
+        # value entering the window
+        add = ~np.isnan(cur) & (t < live)
+        nobs = acc["nobs"] + add
+        previous = acc["mean"] - acc["add"]
+        y = cur - acc["add"]
+        delta = y - acc["mean"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = acc["mean"] + delta / nobs
+        acc["add"] = np.where(add, delta + acc["mean"] - y, acc["add"])
+        acc["ssq"] = np.where(
+            add, acc["ssq"] + (cur - previous) * (cur - mean), acc["ssq"]
+        )
+        acc["mean"] = np.where(add, mean, acc["mean"])
+        acc["nobs"] = nobs
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = np.where(
+                acc["nobs"] == 1, 0.0, np.maximum(acc["ssq"] / acc["nobs"], 0)
+            )
+        out[t] = np.where(acc["nobs"] > 0, np.sqrt(var), np.nan)
+
+    return out, acc
+
+
+def rolling_start(kind: str, ntickers: int) -> dict:
+    """
+    Accumulators of rolling_mean or rolling_std before the first bar
+
+    ::param kind: mean or var
+    ::param ntickers: number of tickers
+
+    ::return {accumulator: (tickers,) array}
+    """
+    fields = ROLLING_FIELDS[kind]
+    acc = {field: np.zeros(ntickers) for field in fields}
+    if kind == "mean":
+        acc["last"] = np.full(ntickers, np.nan)
+
+    return acc
+
+
+def shift(x: np.ndarray, periods: int) -> np.ndarray:
+    """
+    Shift along bars, all tickers at once
+
+    ::param x: (bars, tickers) panel
+    ::param periods: number of bars
+
+    ::return (bars, tickers) panel, first periods bars missing
+    """
+    out = np.full_like(x, np.nan)
+    out[periods:] = x[: x.shape[0] - periods]
+
+    return out
+
+
+def fill(x: np.ndarray, value: float = None, last: np.ndarray = None) -> np.ndarray:
+    """
+    ta fillna: infinite values dropped, forward fill,
+    then leading gaps set to value, or backward filled if value is None
+
+    ::param x: (bars, tickers) panel
+    ::param value: leading gaps value
+    ::param last: filled values before the first bar, forward filled too
+
+    ::return (bars, tickers) panel
+    """
+    if last is not None:
+        x = np.concatenate([last[None, :], x])
+    x = np.where(np.isinf(x), np.nan, x)
+    bars = np.arange(x.shape[0])[:, None]
+
+    # forward fill: index of the last observed bar
+    last_bar = np.maximum.accumulate(np.where(np.isnan(x), -1, bars), axis=0)
+    out = np.take_along_axis(x, np.maximum(last_bar, 0), axis=0)
+    out[last_bar < 0] = np.nan
+
+    if value is None:
+        # backward fill leading gaps with the first observed bar
+        first = np.argmax(~np.isnan(out), axis=0)
+        out = np.where(np.isnan(out), out[first, np.arange(x.shape[1])], out)
+    else:
+        out[np.isnan(out)] = value
+
+    return out if last is None else out[1:]
+
+
+def at_last_bar(x: np.ndarray, nbars: np.ndarray, default: np.ndarray) -> np.ndarray:
+    """
+    Value of each ticker at its last bar
+
+    ::param x: (bars, tickers) panel
+    ::param nbars: bars per ticker
+    ::param default: value of tickers without bars
+
+    ::return (tickers,) array
+    """
+    if x.shape[0] == 0:
+        return default
+
+    return np.where(
+        nbars > 0, x[np.maximum(nbars - 1, 0), np.arange(x.shape[1])], default
+    )
+
+
+class PanelIndicators:
+    """
+    Purpose of this class:
+        - pivot close, high, low and volume into (bar x ticker) panels
+        - compute indicators for all tickers at once, see ta
+        - resume computation from the state of a previous run, new bars only
+
+    Bar i of a ticker is its i-th row by timestamp, so that each ticker
+    keeps its own calendar, as when calling ta ticker by ticker.
+    Tickers with fewer bars are padded with missing values at the end.
+
+    Indicators match ta add_*_ta features with fillna=True, names included.
+
+    State is a frame, one row per ticker, index ticker:
+        - nbars: bars seen so far
+        - last_timestamp: timestamp of the last bar seen
+        - ewm_{name}_weighted, ewm_{name}_old_wt: EMA accumulators
+        - atr: last average true range
+        - obv: on balance volume running sum
+        - mean{window}_{field}, var{window}_{field}: rolling mean and std accumulators
+        - fill_{indicator}: last filled value, carried into missing values
+        - tail_{column}_shift{i}: raw column or indicator i bars before the last bar,
+          for rolling windows and lags
+    """
+
+    # indicators computed, as named by ta add_*_ta
+    INDICATORS = [
+        "momentum_rsi",
+        "momentum_roc",
+        "trend_sma_fast",
+        "trend_sma_slow",
+        "trend_ema_fast",
+        "trend_ema_slow",
+        "trend_macd",
+        "trend_macd_signal",
+        "trend_macd_diff",
+        "volatility_bbm",
+        "volatility_bbh",
+        "volatility_bbl",
+        "volatility_bbw",
+        "volatility_bbp",
+        "volatility_bbhi",
+        "volatility_bbli",
+        "volatility_atr",
+        "volume_obv",
+    ]
+
+    # bars before the first new one needed by indicators, longest window is 26
+    # the bar leaving a window is needed too
+    TAIL = 26
+
+    # rolling windows: sma fast, sma slow, bollinger bands
+    MEANS = [12, 26, 20]
+    STDS = [20]
+
+    # state accumulators and their value before the first bar
+    EWMS = ["up", "down", "fast", "slow", "signal"]
+    STATE = {
+        "nbars": 0,
+        "last_timestamp": pd.NaT,
+        **{f"ewm_{name}_weighted": np.nan for name in EWMS},
+        **{f"ewm_{name}_old_wt": 1.0 for name in EWMS},
+        "atr": 0.0,
+        "obv": 0.0,
+        **{
+            f"mean{window}_{field}": np.nan if field == "last" else 0.0
+            for window in MEANS
+            for field in ROLLING_FIELDS["mean"]
+        },
+        **{
+            f"var{window}_{field}": 0.0
+            for window in STDS
+            for field in ROLLING_FIELDS["var"]
+        },
+        **{f"fill_{name}": np.nan for name in INDICATORS},
+    }
+
+    def __init__(self, df: pd.DataFrame, state: pd.DataFrame = None) -> None:
+        """
+        Class constructor
+
+        ::param df: raw data, one row per ticker and day, any order
+        ::param state: state of a previous run, df holding bars after it only.
+            See new_bars. None to compute from the first bar
+
+        ex: PanelIndicators(df).compute()
+        """
+        # tickers sorted, rows sorted by ticker then timestamp
+        codes, self.tickers = pd.factorize(df["ticker"], sort=True)
+        self.order = np.lexsort((df["timestamp"].to_numpy(), codes))
+        self.df = df.iloc[self.order].reset_index(drop=True)
+
+        # (bar, ticker) position of each sorted row
+        self.code = codes[self.order]
+        self.nbars = np.bincount(self.code, minlength=len(self.tickers))
+        starts = np.concatenate([[0], np.cumsum(self.nbars)[:-1]])
+        self.bar = np.arange(len(self.code)) - starts[self.code]
+        self.shape = (
+            int(self.nbars.max()) if len(self.nbars) else 0,
+            len(self.tickers),
+        )
+
+        # previous state of tickers, first bar state if unknown
+        # stored missing values are kept, ie. atr after a missing close
+        self.resumed = state is not None
+        index = pd.Index(self.tickers, name="ticker")
+        self.previous = (state if self.resumed else pd.DataFrame()).reindex(index)
+        unknown = ~index.isin(state.index) if self.resumed else np.ones(len(index), bool)
+        for column, default in PanelIndicators.STATE.items():
+            if column in self.previous:
+                self.previous.loc[unknown, column] = default
+            else:
+                self.previous[column] = default
+
+        # state after this run, see compute and transform
+        self.accumulators = {}
+        self.state = None
+
+    @staticmethod
+    def new_bars(df: pd.DataFrame, state: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rows after the last bar of each ticker in state
+
+        ::param df: raw data
+        ::param state: state of a previous run
+
+        ::return df: rows not seen yet, tickers not in state included
+        """
+        last = df["ticker"].map(state["last_timestamp"])
+
+        return df[last.isna() | (df["timestamp"] > last)]
+
+    @staticmethod
+    def merge_state(previous: pd.DataFrame, state: pd.DataFrame) -> pd.DataFrame:
+        """
+        Update previous state with tickers of a new run
+
+        ::param previous: state of a previous run, None if none
+        ::param state: state of the new run
+
+        ::return state, tickers sorted
+        """
+        if previous is None:
+            return state
+
+        return pd.concat(
+            [previous.drop(state.index, errors="ignore"), state]
+        ).sort_index()
+
+    def panel(self, column: str) -> np.ndarray:
+        """
+        Pivot a column into a (bar x ticker) panel
+
+        ::param column: raw data column
+
+        ::return (bars, tickers) panel, missing values as nan
+        """
+        out = np.full(self.shape, np.nan)
+        out[self.bar, self.code] = self.df[column].to_numpy(dtype=np.float64)
+
+        return out
+
+    def tail(self, column: str, depth: int) -> np.ndarray:
+        """
+        Last bars of a column before this run, from previous state
+
+        ::param column: raw data column or indicator
+        ::param depth: number of bars
+
+        ::return (depth, tickers) panel, oldest first, nan before the first bar
+        """
+        names = [f"tail_{column}_shift{i}" for i in reversed(range(depth))]
+        missing = [name for name in names if name not in self.previous]
+        if self.resumed and missing:
+            raise OperationalException(
+                f"State holds less than {depth} bars of {column}, run a full transform"
+            )
+
+        return self.previous.reindex(columns=names).to_numpy(dtype=np.float64).T
+
+    def history(self, column: str, depth: int) -> np.ndarray:
+        """
+        Pivot a column into a (bar x ticker) panel, previous bars first
+
+        ::param column: raw data column
+        ::param depth: number of previous bars
+
+        ::return (depth + bars, tickers) panel, new bars start at row depth
+        """
+        return np.concatenate([self.tail(column, depth), self.panel(column)])
+
+    def compute(self) -> dict:
+        """
+        Compute indicators of new bars, same windows as ta add_*_ta.
+        Accumulators after the last bar are kept for the next run
+
+        ::return {indicator: (bars, tickers) panel}
+        """
+        close = self.history("close", PanelIndicators.TAIL)
+        high = self.history("high", PanelIndicators.TAIL)
+        low = self.history("low", PanelIndicators.TAIL)
+        volume = self.panel("volume")
+        close_1 = shift(close, 1)
+        new = slice(PanelIndicators.TAIL, None)
+        out = {}
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # momentum
+            diff = (close - close_1)[new]
+            up = np.where(diff > 0, diff, 0.0)
+            down = np.where(diff < 0, -diff, 0.0)
+            emaup, emadn = self.ewm(up, 1 / 14, "up"), self.ewm(down, 1 / 14, "down")
+            out["momentum_rsi"] = self.fill(
+                np.where(emadn == 0, 100, 100 - 100 / (1 + emaup / emadn)),
+                "momentum_rsi",
+                50,
+            )
+
+            close_12 = shift(close, 12)[new]
+            out["momentum_roc"] = self.fill(
+                (close[new] - close_12) / close_12 * 100, "momentum_roc", 0
+            )
+
+            # trend
+            out["trend_sma_fast"] = self.rolling(close, 12, "mean")
+            out["trend_sma_slow"] = self.rolling(close, 26, "mean")
+            out["trend_ema_fast"] = self.ewm(close[new], 2 / (12 + 1), "fast")
+            out["trend_ema_slow"] = self.ewm(close[new], 2 / (26 + 1), "slow")
+
+            macd = out["trend_ema_fast"] - out["trend_ema_slow"]
+            signal = self.ewm(macd, 2 / (9 + 1), "signal")
+            out["trend_macd"] = self.fill(macd, "trend_macd", 0)
+            out["trend_macd_signal"] = self.fill(signal, "trend_macd_signal", 0)
+            out["trend_macd_diff"] = self.fill(macd - signal, "trend_macd_diff", 0)
+
+            # volatility
+            mavg = self.rolling(close, 20, "mean")
+            mstd = self.rolling(close, 20, "var")
+            hband, lband = mavg + 2 * mstd, mavg - 2 * mstd
+            out["volatility_bbm"] = self.fill(mavg, "volatility_bbm")
+            out["volatility_bbh"] = self.fill(hband, "volatility_bbh")
+            out["volatility_bbl"] = self.fill(lband, "volatility_bbl")
+            out["volatility_bbw"] = self.fill(
+                (hband - lband) / mavg * 100, "volatility_bbw", 0
+            )
+            out["volatility_bbp"] = self.fill(
+                (close[new] - lband) / np.where(hband != lband, hband - lband, np.nan),
+                "volatility_bbp",
+                0,
+            )
+            out["volatility_bbhi"] = self.fill(
+                np.where(close[new] > hband, 1.0, 0.0), "volatility_bbhi", 0
+            )
+            out["volatility_bbli"] = self.fill(
+                np.where(close[new] < lband, 1.0, 0.0), "volatility_bbli", 0
+            )
+            out["volatility_atr"] = self.fill(
+                self.atr(high, low, close, 10), "volatility_atr", 0
+            )
+
+            # volume
+            signed = np.where(close[new] < close_1[new], -volume, volume)
+            obv = self.previous["obv"].to_numpy() + np.cumsum(
+                np.nan_to_num(signed), axis=0
+            )
+            self.accumulators["obv"] = at_last_bar(
+                obv, self.nbars, self.previous["obv"].to_numpy()
+            )
+            out["volume_obv"] = self.fill(
+                np.where(np.isnan(signed), np.nan, obv), "volume_obv", 0
+            )
+
+        return out
+
+    def ewm(self, x: np.ndarray, alpha: float, name: str) -> np.ndarray:
+        """
+        Exponential moving average, resumed from previous state
+
+        ::param x: (bars, tickers) panel
+        ::param alpha: smoothing factor
+        ::param name: accumulators name in state
+
+        ::return (bars, tickers) panel
+        """
+        start = (
+            self.previous[f"ewm_{name}_weighted"].to_numpy(dtype=np.float64),
+            self.previous[f"ewm_{name}_old_wt"].to_numpy(dtype=np.float64),
+        )
+        out, (weighted, old_wt) = ewm(x, alpha, start, self.nbars)
+        self.accumulators[f"ewm_{name}_weighted"] = weighted
+        self.accumulators[f"ewm_{name}_old_wt"] = old_wt
+
+        return out
+
+    def rolling(self, x: np.ndarray, window: int, kind: str) -> np.ndarray:
+        """
+        Rolling mean or std of new bars, resumed from previous state
+
+        ::param x: (TAIL + bars, tickers) panel, see history
+        ::param window: number of bars
+        ::param kind: mean or var, std is returned for var
+
+        ::return (bars, tickers) panel
+        """
+        names = {field: f"{kind}{window}_{field}" for field in ROLLING_FIELDS[kind]}
+        start = {
+            field: self.previous[name].to_numpy(dtype=np.float64)
+            for field, name in names.items()
+        }
+        function = rolling_mean if kind == "mean" else rolling_std
+        # bars before the first new one, then new bars
+        first, tail = PanelIndicators.TAIL - window, PanelIndicators.TAIL
+        out, acc = function(x[tail:], window, x[first:tail], start, self.nbars)
+        for field, name in names.items():
+            self.accumulators[name] = acc[field]
+
+        return out
+
+    def fill(self, x: np.ndarray, name: str, value: float = None) -> np.ndarray:
+        """
+        ta fillna, resumed from previous state
+
+        ::param x: (bars, tickers) panel
+        ::param name: indicator
+        ::param value: leading gaps value
+
+        ::return (bars, tickers) panel
+        """
+        last = self.previous[f"fill_{name}"].to_numpy(dtype=np.float64)
+        out = fill(x, value, last)
+        self.accumulators[f"fill_{name}"] = at_last_bar(out, self.nbars, last)
+
+        return out
+
+    def atr(self, high, low, close, window: int) -> np.ndarray:
+        """
+        Average true range, Wilder smoothing, as ta AverageTrueRange
+
+        ::param high, low, close: (TAIL + bars, tickers) panels, see history
+
+        ::return (bars, tickers) panel, zero before window bars
+        """
+        close_1 = shift(close, 1)
+        true_range = np.fmax(
+            np.fmax(high - low, np.abs(high - close_1)), np.abs(low - close_1)
+        )
+
+        # bar of each row since the first bar of the ticker
+        bar = self.previous["nbars"].to_numpy(dtype=np.int64) - PanelIndicators.TAIL
+        bar = bar + np.arange(true_range.shape[0])[:, None]
+
+        # first value: mean of the first window true ranges
+        seeding = (bar >= 0) & (bar < window) & ~np.isnan(true_range)
+        seed = np.where(seeding, true_range, 0).sum(axis=0) / seeding.sum(axis=0)
+
+        atr = self.previous["atr"].to_numpy(dtype=np.float64)
+        out = np.empty(
+            (true_range.shape[0] - PanelIndicators.TAIL, true_range.shape[1])
+        )
+        for t in range(out.shape[0]):
+            row = t + PanelIndicators.TAIL
+            atr = np.where(
+                bar[row] < window - 1,
+                0.0,
+                np.where(
+                    bar[row] == window - 1,
+                    seed,
+                    (atr * (window - 1) + true_range[row]) / window,
+                ),
+            )
+            out[t] = atr
+
+        self.accumulators["atr"] = at_last_bar(
+            out, self.nbars, self.previous["atr"].to_numpy()
+        )
+
+        return out
+
+    def transform(self, lags: int, weekday: int = 4) -> pd.DataFrame:
+        """
+        Same output as transform.transform, all tickers at once:
+        raw columns and indicators, lagged, for a given weekday only.
+        New bars only if resumed, state after the last bar kept in self.state
+
+        ::param lags: number of lags, shift0 included
+        ::param weekday: rows kept, friday by default
+
+        ::return df: ticker, timestamp, currency, then FEATURE_{column}_shift0
+            of every column, then FEATURE_{column}_shift{x}, x > 0, column by column,
+            as Transformer.lagger
+        """
+        lags = max(int(lags), 1)
+        depth = max(PanelIndicators.TAIL, lags - 1)
+
+        # previous bars first, new bars start at row depth
+        panels = {
+            column: self.history(column, depth)
+            for column in self.df.columns[3:]
+            if column not in PanelIndicators.INDICATORS
+        }
+        for column, panel in self.compute().items():
+            panels[column] = np.concatenate([self.tail(column, depth), panel])
+
+        # lagged values are read straight from panels, for kept rows only
+        rows = np.flatnonzero(self.df["timestamp"].dt.weekday.to_numpy() == weekday)
+        bar, code = self.bar[rows] + depth, self.code[rows]
+
+        # shift0 of every column first, as Transformer.lagger
+        shifts = [(column, 0) for column in panels]
+        shifts += [(column, x) for column in panels for x in range(1, lags)]
+        features = {}
+        for column, x in shifts:
+            # rounded and downcast, as optimise_frame
+            features[f"FEATURE_{column}_shift{x}"] = np.round(
+                panels[column][bar - x, code], 4
+            ).astype(np.float32)
+
+        # state after the last bar of each ticker
+        last = np.cumsum(self.nbars) - 1
+        state = {
+            "nbars": self.previous["nbars"].to_numpy(dtype=np.int64) + self.nbars,
+            "last_timestamp": self.df["timestamp"].to_numpy()[last],
+            **self.accumulators,
+        }
+        for column, panel in panels.items():
+            for i in range(depth):
+                state[f"tail_{column}_shift{i}"] = panel[
+                    depth + self.nbars - 1 - i, np.arange(len(self.tickers))
+                ]
+        self.state = pd.DataFrame(state, index=pd.Index(self.tickers, name="ticker"))
+
+        df = self.df.iloc[rows, :3].reset_index(drop=True)
+
+        return pd.concat([df, pd.DataFrame(features)], axis=1)
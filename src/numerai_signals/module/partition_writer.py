@@ -0,0 +1,70 @@
+"""
+partition_writer.py
+
+Implements PartitionWriter
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import os
+
+import pandas as pd
+
+from config.constant import STREAM_FOLDER
+
+
+class PartitionWriter:
+    """
+    Purpose of this class:
+        - spill crawled rows to one local parquet file per day - partition
+        - as they arrive, one row group per append
+
+    Memory is then bounded by the size of a crawled batch,
+    not by the size of the whole universe.
+    """
+
+    def __init__(self, folder: str = STREAM_FOLDER) -> None:
+        """
+        Class constructor. Leftovers of a previous run are removed
+
+        ::param folder: local folder to spill partitions into
+        """
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        for file in os.listdir(folder):
+            if file.endswith(".parquet"):
+                os.remove(os.path.join(folder, file))
+
+        # day: local file path
+        self.paths = {}
+        # day: tickers written
+        self.tickers = {}
+        # day: number of rows written
+        self.rows = {}
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        Append rows to their partition file
+
+        ::param df: crawled data, any number of days
+        """
+        for day, tmp in df.groupby("timestamp", sort=False):
+            day = pd.to_datetime(day)
+
+            # filename format yahoo_data_YYMMDD
+            path = os.path.join(self.folder, f"yahoo_data_{day.strftime('%y%m%d')}.parquet")
+
+            tmp.to_parquet(
+                path, engine="fastparquet", index=False, append=day in self.paths
+            )
+
+            self.paths[day] = path
+            self.tickers.setdefault(day, set()).update(tmp["ticker"].unique())
+            self.rows[day] = self.rows.get(day, 0) + tmp.shape[0]
+
+    def days(self) -> list:
+        """
+        ::return days written, sorted
+        """
+        return sorted(self.paths)
@@ -0,0 +1,231 @@
+"""
+proxy_pool.py
+
+Implements ProxyPool
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import threading
+from time import monotonic
+
+from config.constant import (
+    PROXY_COOLDOWN,
+    PROXY_MAX_COOLDOWN,
+    PROXY_ROTATE_INTERVAL,
+)
+from module.logger.logger import Logger
+
+logger = Logger().logger
+
+
+class ProxyPool:
+    """
+    Local proxy endpoints shared by all crawler workers, thread safe.
+
+    Each request is assigned a proxy:
+        - round_robin: next proxy not cooling down
+        - health: proxy with the lowest failure rate, then latency
+    A throttled proxy cools down, delay doubling with consecutive failures,
+    and requests go through the other ones meanwhile. A background thread
+    renews identities of throttled proxies, crawler workers never wait for it.
+
+    An empty pool assigns no proxy, ie. direct connections.
+    """
+
+    def __init__(
+        self,
+        proxies: list = None,
+        strategy: str = "round_robin",
+        cooldown: float = PROXY_COOLDOWN,
+        rotate=None,
+        rotate_interval: float = PROXY_ROTATE_INTERVAL,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param proxies: proxy urls, ex: http://127.0.0.1:8118
+        ::param strategy: round_robin or health
+        ::param cooldown: first cool down delay of a throttled proxy, seconds
+        ::param rotate: function renewing the identity of a given proxy url
+        ::param rotate_interval: seconds between two background rotations
+
+        ex: ProxyPool(["http://127.0.0.1:8118", "http://127.0.0.1:8119"])
+        """
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.configure(proxies, strategy, cooldown, rotate, rotate_interval)
+
+    def configure(
+        self,
+        proxies: list = None,
+        strategy: str = "round_robin",
+        cooldown: float = PROXY_COOLDOWN,
+        rotate=None,
+        rotate_interval: float = PROXY_ROTATE_INTERVAL,
+    ) -> None:
+        """
+        Update settings, reset proxies health and restart rotation
+        See constructor for parameters
+        """
+        self.stop()
+
+        with self.lock:
+            self.proxies = list(proxies or [])
+            self.strategy = strategy
+            self.cooldown = cooldown
+            self.rotate = rotate
+            self.rotate_interval = rotate_interval
+            self.cursor = 0
+
+            self.health = {
+                proxy: {
+                    "requests": 0,
+                    "failures": 0,
+                    # consecutive failures
+                    "streak": 0,
+                    # moving average, seconds
+                    "latency": 0,
+                    # cooling down until
+                    "until": 0,
+                    "rotations": 0,
+                }
+                for proxy in self.proxies
+            }
+
+        if self.proxies and rotate is not None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._rotate_loop, daemon=True)
+            self.thread.start()
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def acquire(self) -> str:
+        """
+        Assign a proxy to a request. Never blocks:
+        if all proxies cool down, the one back first is assigned
+
+        ::return proxy url, None if pool is empty
+        """
+        if not self.proxies:
+            return None
+
+        with self.lock:
+            now = monotonic()
+            ready = [p for p in self.proxies if self.health[p]["until"] <= now]
+
+            if not ready:
+                proxy = min(self.proxies, key=lambda p: self.health[p]["until"])
+
+            elif self.strategy == "health":
+                proxy = min(ready, key=self._score)
+
+            else:
+                # next ready proxy, starting at cursor
+                ready = set(ready)
+                for i in range(len(self.proxies)):
+                    proxy = self.proxies[(self.cursor + i) % len(self.proxies)]
+                    if proxy in ready:
+                        self.cursor = (self.cursor + i + 1) % len(self.proxies)
+                        break
+
+            self.health[proxy]["requests"] += 1
+
+            return proxy
+
+    def _score(self, proxy: str) -> tuple:
+        """
+        Health score, lower is better. Caller must hold the lock
+
+        ::param proxy: proxy url
+
+        ::return (failure rate, latency, requests)
+        """
+        health = self.health[proxy]
+        return (
+            health["failures"] / max(health["requests"], 1),
+            health["latency"],
+            health["requests"],
+        )
+
+    def report(self, proxy: str, throttled: bool, latency: float = None) -> None:
+        """
+        Account for a request outcome
+
+        ::param proxy: proxy url the request went through, None if direct
+        ::param throttled: True if throttled or failed, see curl_url.is_retryable
+        ::param latency: request duration, seconds
+        """
+        if proxy is None or proxy not in self.health:
+            return
+
+        with self.lock:
+            health = self.health[proxy]
+
+            if throttled:
+                health["failures"] += 1
+                health["streak"] += 1
+                delay = min(
+                    PROXY_MAX_COOLDOWN, self.cooldown * 2 ** (health["streak"] - 1)
+                )
+                health["until"] = max(health["until"], monotonic() + delay)
+
+            else:
+                health["streak"] = 0
+
+            if latency is not None:
+                health["latency"] = 0.8 * health["latency"] + 0.2 * latency
+
+    def _rotate_loop(self) -> None:
+        """
+        Renew identities of throttled proxies, until stopped
+        """
+        while not self.stopped.wait(self.rotate_interval):
+            with self.lock:
+                throttled = [p for p in self.proxies if self.health[p]["streak"]]
+
+            for proxy in throttled:
+                try:
+                    self.rotate(proxy)
+
+                except Exception as e:
+                    logger.info(f"Could not rotate {proxy}: {e}")
+                    continue
+
+                # new identity, new chance
+                with self.lock:
+                    health = self.health[proxy]
+                    health["streak"] = 0
+                    health["until"] = 0
+                    health["rotations"] += 1
+
+                logger.info(f"Rotated {proxy}")
+
+    def stop(self) -> None:
+        """
+        Stop background rotation
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def stats(self) -> dict:
+        """
+        ::return {proxy: dict}
+            - requests: number of requests assigned
+            - failures: number of throttled or failed requests
+            - rotations: number of identities renewed
+        """
+        with self.lock:
+            return {
+                proxy: {
+                    "requests": health["requests"],
+                    "failures": health["failures"],
+                    "rotations": health["rotations"],
+                }
+                for proxy, health in self.health.items()
+            }
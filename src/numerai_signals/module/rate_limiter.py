@@ -0,0 +1,143 @@
+"""
+rate_limiter.py
+
+Implements RateLimiter
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import threading
+from time import monotonic, sleep
+
+from config.constant import (
+    RATE_LIMIT_START,
+    RATE_LIMIT_MIN,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_INCREASE,
+    RATE_LIMIT_DECREASE,
+)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all crawler workers, thread safe.
+
+    The refill rate tunes itself, AIMD style:
+        - additive increase: +increase requests/sec per second of successful requests
+        - multiplicative decrease: rate * decrease when throttled, at most once per second
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_START,
+        min_rate: float = RATE_LIMIT_MIN,
+        max_rate: float = RATE_LIMIT_MAX,
+        increase: float = RATE_LIMIT_INCREASE,
+        decrease: float = RATE_LIMIT_DECREASE,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param rate: initial rate, requests/sec
+        ::param min_rate: rate lower boundary
+        ::param max_rate: rate upper boundary
+        ::param increase: additive increase, requests/sec
+        ::param decrease: multiplicative decrease factor, within ]0, 1[
+
+        ex: RateLimiter(20)
+        """
+        self.lock = threading.Lock()
+        self.configure(rate, min_rate, max_rate, increase, decrease)
+
+    def configure(
+        self,
+        rate: float = RATE_LIMIT_START,
+        min_rate: float = RATE_LIMIT_MIN,
+        max_rate: float = RATE_LIMIT_MAX,
+        increase: float = RATE_LIMIT_INCREASE,
+        decrease: float = RATE_LIMIT_DECREASE,
+    ) -> None:
+        """
+        Update settings and reset bucket and counters
+        See constructor for parameters
+        """
+        with self.lock:
+            self.min_rate = min_rate
+            self.max_rate = max_rate
+            self.rate = min(max(rate, min_rate), max_rate)
+            self.increase = increase
+            self.decrease = decrease
+
+            # bucket starts full, capacity is one second worth of tokens
+            self.tokens = self.rate
+            self.last_refill = monotonic()
+            self.last_decrease = 0
+
+            self.successes = 0
+            self.throttles = 0
+
+    def reserve(self) -> float:
+        """
+        Take one token from the bucket
+
+        ::return seconds to wait before sending the request
+        """
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(
+                self.rate, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+
+            # tokens may go negative. the deficit is the queue of
+            # requests already waiting, later callers wait longer
+            self.tokens -= 1
+
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Block until a token is available
+        """
+        delay = self.reserve()
+        if delay:
+            sleep(delay)
+
+    def on_success(self) -> None:
+        """
+        Additive increase
+        """
+        with self.lock:
+            self.successes += 1
+            # increase/rate per request is +increase per second at current rate
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self) -> None:
+        """
+        Multiplicative decrease
+        """
+        with self.lock:
+            self.throttles += 1
+            now = monotonic()
+
+            # requests of a same burst fail together
+            # only the first failure of the burst is accounted for
+            if now - self.last_decrease >= 1:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0)
+                self.last_decrease = now
+
+    def stats(self) -> dict:
+        """
+        ::return dict
+            - rate: current rate, requests/sec
+            - successes: number of successful requests
+            - throttles: number of throttled or failed requests
+        """
+        with self.lock:
+            return {
+                "rate": round(self.rate, 2),
+                "successes": self.successes,
+                "throttles": self.throttles,
+            }
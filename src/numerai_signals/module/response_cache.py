@@ -0,0 +1,197 @@
+"""
+response_cache.py
+
+Implements ResponseCache
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from time import time
+
+from config.constant import CACHE_FOLDER, CACHE_TTL, CACHE_MAX_SIZE
+
+
+class ResponseCache:
+    """
+    On disk cache for yahoo finance API responses, thread safe.
+
+    Responses are stored gzipped, under the hash of the request:
+    url - ie. ticker - and period1, period2, interval parameters.
+    File mtime is the write time, used for TTL.
+    File atime is set on each hit, used for LRU eviction.
+    """
+
+    # request parameters defining a response
+    KEY_PARAMS = ["period1", "period2", "interval"]
+
+    def __init__(
+        self,
+        folder: str = CACHE_FOLDER,
+        ttl: float = CACHE_TTL,
+        max_size: int = CACHE_MAX_SIZE,
+        enabled: bool = False,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param folder: cache folder
+        ::param ttl: seconds a response stays valid
+        ::param max_size: cache size upper boundary, bytes
+        ::param enabled: disabled cache never hits nor stores
+        """
+        self.lock = threading.Lock()
+        self.configure(folder, ttl, max_size, enabled)
+
+    def configure(
+        self,
+        folder: str = CACHE_FOLDER,
+        ttl: float = CACHE_TTL,
+        max_size: int = CACHE_MAX_SIZE,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Update settings, reset counters and index existing files
+        See constructor for parameters
+        """
+        with self.lock:
+            self.folder = folder
+            self.ttl = ttl
+            self.max_size = max_size
+            self.enabled = enabled
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+            # path: [size, last access]
+            self.index = {}
+            if enabled and os.path.isdir(folder):
+                for root, _, files in os.walk(folder):
+                    for file in files:
+                        path = os.path.join(root, file)
+                        stat = os.stat(path)
+                        self.index[path] = [stat.st_size, stat.st_atime]
+
+            self.size = sum(size for size, _ in self.index.values())
+
+    def path(self, url: str, params: dict) -> str:
+        """
+        File path of a given request
+
+        ::param url: requested URL
+        ::param params: request parameters
+
+        ::return path
+        """
+        params = params or {}
+        key = json.dumps([url] + [params.get(p) for p in ResponseCache.KEY_PARAMS])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+
+        return os.path.join(self.folder, digest[:2], f"{digest}.json.gz")
+
+    def get(self, url: str, params: dict) -> dict:
+        """
+        Read cached response
+
+        ::param url: requested URL
+        ::param params: request parameters
+
+        ::return response data, None if missing or expired
+        """
+        if not self.enabled:
+            return None
+
+        path = self.path(url, params)
+        now = time()
+        try:
+            written = os.stat(path).st_mtime
+            if now - written > self.ttl:
+                raise FileNotFoundError(path)
+
+            with gzip.open(path, "rt") as f:
+                data = json.load(f)
+
+            # mark as recently used, keeping write time
+            os.utime(path, (now, written))
+
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+            if path in self.index:
+                self.index[path][1] = now
+
+        return data
+
+    def put(self, url: str, params: dict, data: dict) -> None:
+        """
+        Store response, then evict least recently used ones if cache is full
+
+        ::param url: requested URL
+        ::param params: request parameters
+        ::param data: response data
+        """
+        if not self.enabled:
+            return
+
+        path = self.path(url, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write then rename, readers never see partial files
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            size = os.stat(path).st_size
+            self.size += size - self.index.get(path, [0])[0]
+            self.index[path] = [size, time()]
+
+            if self.size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used files until cache is under max_size.
+        Caller must hold the lock
+        """
+        for path, (size, _) in sorted(self.index.items(), key=lambda x: x[1][1]):
+            if self.size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            del self.index[path]
+            self.size -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        ::return dict
+            - hits: number of responses read from cache
+            - misses: number of responses not found or expired
+            - evictions: number of responses evicted
+            - files: number of responses in cache
+            - size: cache size, bytes
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "files": len(self.index),
+                "size": self.size,
+            }
@@ -0,0 +1,97 @@
+"""
+retry_queue.py
+
+Implements RetryQueue
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import heapq
+import random
+from time import monotonic, sleep
+
+from config.constant import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+
+class RetryQueue:
+    """
+    Holds failed tasks until their backoff delay expires.
+
+    Delay doubles with each attempt, capped, and is jittered
+    so that tasks throttled together are not retried together.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param max_attempts: attempts per task, first one included
+        ::param base_delay: delay before the first retry, seconds
+        ::param max_delay: delay upper boundary, seconds
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.heap = []
+        self.attempts = {}
+        self.dropped = []
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Equal jitter exponential backoff
+
+        ::param attempt: number of attempts already made
+
+        ::return delay in seconds, within [d/2, d] where d = base * 2^(attempt-1)
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def push(self, task) -> bool:
+        """
+        Schedule task for retry, unless it ran out of attempts
+
+        ::param task: failed task, ex: url
+
+        ::return True if scheduled, False if dropped
+        """
+        attempt = self.attempts.get(task, 1)
+        if attempt >= self.max_attempts:
+            self.dropped.append(task)
+            return False
+
+        self.attempts[task] = attempt + 1
+        ready_at = monotonic() + self.delay(attempt)
+        heapq.heappush(self.heap, (ready_at, attempt, task))
+
+        return True
+
+    def pop_ready(self) -> list:
+        """
+        Wait until at least one task is ready, then pop all ready tasks
+
+        ::return list of tasks, empty if queue is empty
+        """
+        if not self.heap:
+            return []
+
+        wait = self.heap[0][0] - monotonic()
+        if wait > 0:
+            sleep(wait)
+
+        tasks = []
+        now = monotonic()
+        while self.heap and self.heap[0][0] <= now:
+            tasks.append(heapq.heappop(self.heap)[2])
+
+        return tasks
@@ -0,0 +1,199 @@
+"""
+run_manifest.py
+
+Implements RunManifest
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import datetime as dt
+import gzip
+import io
+import json
+import threading
+import uuid
+
+import pandas as pd
+
+from config.constant import RUN_MANIFEST_KEY, RUN_CHECKPOINT_FOLDER
+from module.exception import OperationalException
+from module.logger.logger import Logger
+
+logger = Logger().logger
+
+
+class RunManifest:
+    """
+    Checkpoints of a load run, thread safe.
+    Persisted in the data bucket as gzipped json:
+        - params: CLI arguments defining the run
+        - crawled: tickers crawled so far
+        - batches: bucket keys of crawled data, one parquet file per batch
+        - partitions: days to rewrite, known once crawling is over
+        - uploaded: partition files uploaded
+        - complete: True once the run is over
+    A resumed run only crawls tickers not crawled yet,
+    reads back crawled batches, and uploads partitions not uploaded yet.
+    Not persisted unless asked, progress is then only tracked in memory
+    """
+
+    def __init__(
+        self, s3, run_id: str = None, params: dict = None, persist: bool = True
+    ) -> None:
+        """
+        Class constructor
+
+        ::param s3: S3 object, bucket holding the manifest and checkpoints
+        ::param run_id: run to resume, a new one if not given
+        ::param params: CLI arguments defining the run, must match on resume
+        ::param persist: write manifest and crawled batches to bucket
+        """
+        self.s3 = s3
+        # new run id: start time, utc, and a random suffix
+        now = dt.datetime.now(dt.timezone.utc)
+        self.run_id = run_id or f"{now.strftime('%y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.key = RUN_MANIFEST_KEY.format(run_id=self.run_id)
+        self.folder = RUN_CHECKPOINT_FOLDER.format(run_id=self.run_id)
+        self.persist = persist
+        self.lock = threading.Lock()
+        # manifest writes, in order, see save
+        self.save_lock = threading.Lock()
+        self.version = 0
+        self.saved = 0
+
+        self.params = dict(params or {})
+        self.crawled = set()
+        self.batches = []
+        self.partitions = None
+        self.uploaded = set()
+        self.complete = False
+
+    def load(self) -> "RunManifest":
+        """
+        Read manifest from bucket, to resume the run
+
+        ::return self
+        """
+        content = self.s3.read_file(self.key)
+        if content is None:
+            raise OperationalException(f"No run manifest found at {self.key}")
+
+        manifest = json.loads(gzip.decompress(content))
+        if manifest["params"] != self.params:
+            raise OperationalException(
+                f"Run {self.run_id} was started with {manifest['params']}, "
+                f"not {self.params}"
+            )
+
+        self.crawled = set(manifest["crawled"])
+        self.batches = manifest["batches"]
+        self.partitions = manifest["partitions"]
+        self.uploaded = set(manifest["uploaded"])
+        self.complete = manifest["complete"]
+        logger.info(
+            f"Resuming run {self.run_id}: {len(self.crawled)} tickers crawled, "
+            f"{len(self.uploaded)} partitions uploaded"
+        )
+
+        return self
+
+    def save(self) -> dict:
+        """
+        Write manifest to bucket.
+        Concurrent saves are coalesced: a save waiting for another one
+        is skipped if that one already wrote its changes
+
+        ::return response: s3.upload_file response, None if not written
+        """
+        if not self.persist:
+            return None
+
+        with self.lock:
+            self.version += 1
+            version = self.version
+
+        with self.save_lock:
+            if self.saved >= version:
+                return None
+
+            # latest content, only built under the lock
+            with self.lock:
+                version = self.version
+                manifest = {
+                    "params": self.params,
+                    "crawled": sorted(self.crawled),
+                    "batches": list(self.batches),
+                    "partitions": self.partitions,
+                    "uploaded": sorted(self.uploaded),
+                    "complete": self.complete,
+                }
+
+            # writes are ordered, a late save never overwrites a newer one
+            response = self.s3.upload_file(
+                self.key, gzip.compress(json.dumps(manifest).encode())
+            )
+            self.saved = version
+
+            return response
+
+    def checkpoint(self, tickers: list, df: pd.DataFrame = None) -> None:
+        """
+        Record a crawled batch, its data first then its tickers
+
+        ::param tickers: tickers crawled
+        ::param df: crawled data, None if no data
+        """
+        if self.persist and df is not None and not df.empty:
+            key = f"{self.folder}/crawled_{len(self.batches):05d}.parquet"
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False)
+            self.s3.upload_file(key, buffer.getvalue())
+            self.batches.append(key)
+
+        self.crawled.update(tickers)
+        self.save()
+
+    def frames(self):
+        """
+        Read back crawled batches, one at a time
+
+        ::yield df: crawled data
+        """
+        for key in list(self.batches):
+            content = self.s3.read_file(key)
+            if content is None:
+                raise OperationalException(f"Checkpoint {key} is missing")
+
+            yield pd.read_parquet(io.BytesIO(content))
+
+    def mark_partitions(self, days: list) -> None:
+        """
+        Record days to rewrite, ie. crawling is over
+
+        ::param days: days - partitions - to rewrite
+        """
+        self.partitions = sorted(pd.to_datetime(day).strftime("%Y-%m-%d") for day in days)
+        self.save()
+
+    def mark_uploaded(self, key: str) -> None:
+        """
+        Record an uploaded partition file
+
+        ::param key: partition file, considering bucket as root
+        """
+        with self.lock:
+            self.uploaded.add(key)
+        self.save()
+
+    def finish(self) -> None:
+        """
+        Mark run as complete and remove crawled batches
+        """
+        failed = self.s3.delete_files(self.batches) if self.batches else []
+        if failed:
+            logger.warning(f"Could not remove checkpoints {failed}")
+
+        self.batches = []
+        self.complete = True
+        self.save()
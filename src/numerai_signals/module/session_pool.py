@@ -0,0 +1,133 @@
+"""
+session_pool.py
+
+Implements SessionPool
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.constant import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+
+class SessionPool:
+    """
+    Purpose of this class:
+        - give each worker thread its own keep-alive requests.Session
+        - bound every request with connect/read timeouts
+        - count how often connections are reused
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param pool_size: number of connections kept alive per host and session
+        ::param connect_timeout: seconds to wait for a connection
+        ::param read_timeout: seconds to wait between two bytes of the response
+
+        ex: SessionPool(10, 3.05, 10)
+        """
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sessions = []
+        self.configure(pool_size, connect_timeout, read_timeout)
+
+    def configure(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+    ) -> None:
+        """
+        Update settings. Sessions already opened are closed,
+        new ones will be created on next request
+
+        ::param pool_size: number of connections kept alive per host and session
+        ::param connect_timeout: seconds to wait for a connection
+        ::param read_timeout: seconds to wait between two bytes of the response
+        """
+        self.close()
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+
+    def session(self) -> requests.Session:
+        """
+        Get current thread session, create it on first call
+
+        ::return requests.Session object
+        """
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.local.session = session
+
+            with self.lock:
+                self.sessions.append(session)
+
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET request through current thread session
+
+        ::param url: requested URL
+        ::param kwargs: requests.get keyword arguments
+
+        ::return response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().get(url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Connection usage across all sessions
+
+        ::return dict
+            - sessions: number of sessions opened
+            - requests: number of requests sent
+            - connections: number of connections opened
+            - reused: number of requests sent over an already opened connection
+        """
+        stats = {"sessions": 0, "requests": 0, "connections": 0}
+        with self.lock:
+            for session in self.sessions:
+                stats["sessions"] += 1
+                for adapter in set(session.adapters.values()):
+                    pools = adapter.poolmanager.pools
+                    for key in pools.keys():
+                        pool = pools[key]
+                        stats["requests"] += pool.num_requests
+                        stats["connections"] += pool.num_connections
+
+        stats["reused"] = stats["requests"] - stats["connections"]
+
+        return stats
+
+    def close(self) -> None:
+        """
+        Close all sessions
+        """
+        with self.lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions = []
+
+        # sessions attached to other threads are closed already
+        # they will be replaced on their next request
+        self.local = threading.local()
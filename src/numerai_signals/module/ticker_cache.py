@@ -0,0 +1,107 @@
+"""
+ticker_cache.py
+
+Implements TickerCache
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import gzip
+import json
+import os
+from time import time
+
+from config.constant import TICKER_CACHE_FOLDER, TICKER_CACHE_KEY, TICKER_CACHE_TTL
+from module.logger.logger import Logger
+
+logger = Logger().logger
+
+
+class TickerCache:
+    """
+    Last snapshot of the ticker universe, kept locally and in the data bucket.
+
+    Snapshot is a dict:
+        - ticker_map: bloomberg/yahoo mapping file, csv content
+        - etag, last_modified: mapping file validators
+        - universe: numerai live tickers
+        - fetched: snapshot time, used for TTL
+    """
+
+    def __init__(
+        self,
+        s3=None,
+        folder: str = TICKER_CACHE_FOLDER,
+        key: str = TICKER_CACHE_KEY,
+        ttl: float = TICKER_CACHE_TTL,
+    ) -> None:
+        """
+        Class constructor
+
+        ::param s3: bucket holding the shared snapshot, local only if not given
+        ::param folder: local cache folder
+        ::param key: snapshot path, considering bucket as root
+        ::param ttl: seconds a snapshot stays fresh
+        """
+        self.s3 = s3
+        self.key = key
+        self.ttl = ttl
+        self.path = os.path.join(folder, os.path.basename(key))
+        self.snapshot = None
+
+    def load(self) -> dict:
+        """
+        Read snapshot, local copy first then bucket copy
+
+        ::return snapshot, None if there is none
+        """
+        content = None
+        if os.path.isfile(self.path):
+            with open(self.path, "rb") as f:
+                content = f.read()
+
+        elif self.s3 is not None:
+            content = self.s3.read_file(self.key)
+            if content is not None:
+                self._write(content)
+
+        if content is not None:
+            self.snapshot = json.loads(gzip.decompress(content))
+            logger.info(f"Loaded ticker snapshot from {self.key}")
+
+        return self.snapshot
+
+    def save(self, snapshot: dict) -> None:
+        """
+        Write snapshot locally and to bucket
+
+        ::param snapshot: see class docstring
+        """
+        self.snapshot = snapshot
+        content = gzip.compress(json.dumps(snapshot).encode())
+
+        self._write(content)
+        if self.s3 is not None:
+            self.s3.upload_file(self.key, content)
+
+    def fresh(self) -> bool:
+        """
+        ::return True if snapshot is younger than ttl
+        """
+        if self.snapshot is None:
+            return False
+
+        return time() - self.snapshot.get("fetched", 0) < self.ttl
+
+    def _write(self, content: bytes) -> None:
+        """
+        Write local copy, readers never see partial files
+
+        ::param content: gzipped snapshot
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
@@ -28,15 +28,25 @@ class Tor:
         self.old_ip = "0.0.0.0"
         self.new_identity()
 
+    @staticmethod
+    def renew(control_port: int = 9051, password: str = "1234"):
+        """
+        Ask a TOR instance for a new identity, does not wait for it.
+        See module.proxy_pool to rotate several instances in background
+
+        :param control_port: TOR instance control port
+        :param password: TOR control password
+        """
+        with Controller.from_port(port=control_port) as controller:
+            controller.authenticate(password=password)
+            controller.signal(Signal.NEWNYM)
+
     @classmethod
     def _get_connection(self):
         """
         TOR new connection
         """
-        with Controller.from_port(port=9051) as controller:
-            controller.authenticate(password="1234")
-            controller.signal(Signal.NEWNYM)
-            controller.close()
+        self.renew()
 
     @classmethod
     def _set_url_proxy(self):
@@ -0,0 +1,118 @@
+"""
+watermark.py
+
+Implements Watermark
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import datetime as dt
+import gzip
+import json
+
+import pandas as pd
+
+from config.constant import WATERMARK_KEY
+from module.logger.logger import Logger
+
+logger = Logger().logger
+
+
+class Watermark:
+    """
+    Per ticker high-water mark, ie. last loaded date.
+    Persisted in the data bucket as gzipped json, grouped by date:
+        {"2022-03-04": ["AAPL", "MSFT"], "2022-03-03": ["000060.KS"]}
+    most tickers share the same date so this stays compact.
+    """
+
+    def __init__(self, s3, key: str = WATERMARK_KEY) -> None:
+        """
+        Class constructor
+
+        ::param s3: S3 object, bucket holding the manifest
+        ::param key: manifest path in bucket
+        """
+        self.s3 = s3
+        self.key = key
+        self.marks = {}
+
+    def load(self) -> "Watermark":
+        """
+        Read manifest from bucket. Starts empty if there is none yet
+
+        ::return self
+        """
+        content = self.s3.read_file(self.key)
+        if content is None:
+            logger.info(f"No manifest found at {self.key}, starting from scratch")
+            return self
+
+        manifest = json.loads(gzip.decompress(content))
+        self.marks = {
+            ticker: dt.datetime.strptime(day, "%Y-%m-%d")
+            for day, tickers in manifest.items()
+            for ticker in tickers
+        }
+        logger.info(f"Loaded {len(self.marks)} watermarks from {self.key}")
+
+        return self
+
+    def save(self) -> dict:
+        """
+        Write manifest to bucket
+
+        ::return response: s3.upload_file response
+        """
+        manifest = {}
+        for ticker, day in sorted(self.marks.items()):
+            manifest.setdefault(day.strftime("%Y-%m-%d"), []).append(ticker)
+
+        return self.s3.upload_file(
+            self.key, gzip.compress(json.dumps(manifest).encode())
+        )
+
+    def ranges(self, tickers: list, start: dt.datetime, end: dt.datetime) -> dict:
+        """
+        Group tickers by the date they should be crawled from:
+        the day after their watermark, or start if later or missing.
+        Tickers already up to date are left out
+
+        ::param tickers: list of tickers
+        ::param start: crawler start date, inclusive
+        ::param end: crawler end date, exclusive
+
+        ::return {start date: [tickers]}
+        """
+        ranges = {}
+        for ticker in tickers:
+            mark = self.marks.get(ticker)
+            ticker_start = start if mark is None else max(start, mark + dt.timedelta(1))
+
+            if ticker_start < end:
+                ranges.setdefault(ticker_start, []).append(ticker)
+
+        return ranges
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep rows strictly after their ticker watermark
+
+        ::param df: crawled data
+
+        ::return df: new rows only
+        """
+        marks = pd.to_datetime(df["ticker"].map(self.marks))
+        return df[marks.isna() | (df["timestamp"] > marks)]
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Move watermarks forward to the last loaded date of each ticker
+
+        ::param df: loaded data
+        """
+        for ticker, day in df.groupby("ticker")["timestamp"].max().items():
+            day = day.to_pydatetime()
+            if ticker not in self.marks or day > self.marks[ticker]:
+                self.marks[ticker] = day
@@ -7,11 +7,29 @@ Implements Yahoo
 __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
+from urllib.parse import quote
+
 import pandas as pd
 
+from config.constant import (
+    YAHOO_API_URL,
+    YAHOO_SPARK_URL,
+    CRAWLER_CONCURRENCY,
+    RETRY_MAX_ATTEMPTS,
+)
 from module.logger.logger import Logger
 from module.multi_thread import MultiThread
-from util.curl_url import curl_url
+from module.async_crawler import AsyncCrawler
+from module.chart_buffer import ChartBuffer
+from module.retry_queue import RetryQueue
+from util.curl_url import (
+    curl_url,
+    is_retryable,
+    session_pool,
+    rate_limiter,
+    response_cache,
+    proxy_pool,
+)
 
 logger = Logger().logger
 
@@ -23,19 +41,42 @@ class Yahoo:
         - parse result in dataframe
     """
 
-    def __init__(self, tickers: list, start: str, end: str):
+    def __init__(
+        self,
+        tickers: list,
+        start: str,
+        end: str,
+        engine: str = "thread",
+        concurrency: int = CRAWLER_CONCURRENCY,
+        api_url: str = YAHOO_API_URL,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        spark_batch: int = 0,
+        spark_url: str = YAHOO_SPARK_URL,
+    ):
         """
         Class constructor
 
         ::param tickers: list of tickers to crawl
         ::param start: crawler start date, unix UTC timestamp
         ::param end: crawler end date, unix UTC timestamp
+        ::param engine: crawler engine, thread or async
+        ::param concurrency: maximum number of requests in flight, async engine only
+        ::param api_url: yahoo finance chart API url
+        ::param max_attempts: attempts per ticker when throttled or failed
+        ::param spark_batch: symbols per spark request, 0 for chart requests only
+        ::param spark_url: yahoo finance spark API url
 
         ex: Yahoo('AMZN', 'XXXXX', 'YYYYY')
         """
         self.tickers = tickers
         self.start = start
         self.end = end
+        self.engine = engine
+        self.concurrency = concurrency
+        self.api_url = api_url
+        self.max_attempts = max_attempts
+        self.spark_batch = spark_batch
+        self.spark_url = spark_url
 
     def load_data(self) -> pd.DataFrame:
         """
@@ -44,10 +85,6 @@ class Yahoo:
 
         ::return df: output frame
         """
-        # build request urls
-        api_url = "https://query2.finance.yahoo.com/v8/finance/chart"
-        urls = [f"{api_url}/{ticker}" for ticker in self.tickers]
-
         # define request parameters
         # period2 is inclusive so we put -1 to exclude upper boundary
         # [start, end - 1] = [start, end[
@@ -59,11 +96,49 @@ class Yahoo:
             events="history",
         )
 
-        # call multi thread to curl urls
-        mt = MultiThread()
-        # one process per URL - ticker - to curl
-        mt.execute(urls, curl_url, params)
-        df = mt.parse_yahoo()
+        # init buffer
+        # assuming a week worth of daily data per ticker
+        buffer = ChartBuffer(capacity=len(self.tickers) * 7)
+
+        # batched requests first, if enabled
+        # tickers missing from batches fall back to one request per ticker
+        tickers = self.tickers
+        if self.spark_batch:
+            parsed = self.load_spark(params, buffer)
+            tickers = [ticker for ticker in tickers if ticker not in parsed]
+            logger.info(
+                f"Spark coverage: {len(parsed)}/{len(self.tickers)} tickers parsed, "
+                f"{len(tickers)} falling back to chart requests"
+            )
+
+        # build request urls
+        urls = [f"{self.api_url}/{ticker}" for ticker in tickers]
+        retry_queue = RetryQueue(self.max_attempts)
+
+        # crawl, then retry throttled/failed urls once their backoff expired
+        while urls:
+            for url in self.crawl(urls, params, buffer):
+                if not retry_queue.push(url):
+                    logger.warning(f"Giving up on {url}")
+
+            urls = retry_queue.pop_ready()
+
+        # log coverage and connection reuse
+        # connections are kept alive for the next batch, see load.crawl
+        logger.info(
+            f"Crawler coverage: {len(buffer.meta['ticker'])}/{len(self.tickers)} "
+            f"tickers parsed, {len(retry_queue.dropped)} dropped after "
+            f"{retry_queue.max_attempts} attempts"
+        )
+        logger.info(f"Rate limiter: {rate_limiter.stats()}")
+        if response_cache.enabled:
+            logger.info(f"Response cache: {response_cache.stats()}")
+        if len(proxy_pool):
+            logger.info(f"Proxies: {proxy_pool.stats()}")
+        if self.engine == "thread":
+            logger.info(f"HTTP sessions: {session_pool.stats()}")
+
+        df = buffer.to_frame()
 
         # raise exception if resulting df is empty
         try:
@@ -73,3 +148,118 @@ class Yahoo:
             raise e
 
         return df
+
+    def load_spark(self, params: dict, buffer: ChartBuffer) -> set:
+        """
+        Curl yahoo finance spark API, spark_batch symbols per request
+
+        ::param params: request parameters, shared by all urls
+        ::param buffer: ChartBuffer to write into
+
+        ::return symbols parsed
+        """
+        urls = [
+            f"{self.spark_url}?symbols="
+            f"{quote(','.join(self.tickers[i:i + self.spark_batch]), safe=',')}"
+            for i in range(0, len(self.tickers), self.spark_batch)
+        ]
+
+        # yahoo spark series usually carry close prices only, every symbol
+        # then falls back to a chart request: first batch alone, as a probe
+        parsed = self.crawl_spark(urls[:1], params, buffer)
+        if not parsed:
+            logger.warning(
+                "No complete symbol in first spark answer, "
+                "skipping spark for chart requests only"
+            )
+            return parsed
+
+        return parsed | self.crawl_spark(urls[1:], params, buffer)
+
+    def crawl_spark(self, urls: list, params: dict, buffer: ChartBuffer) -> set:
+        """
+        Curl spark urls, retry throttled/failed ones once their backoff expired
+
+        ::param urls: spark urls
+        ::param params: request parameters, shared by all urls
+        ::param buffer: ChartBuffer to write into
+
+        ::return symbols parsed
+        """
+        retry_queue = RetryQueue(self.max_attempts)
+
+        parsed = set()
+        while urls:
+            for url, response, status in self.fetch(urls, params):
+                if is_retryable(status):
+                    if not retry_queue.push(url):
+                        logger.warning(f"Giving up on {url}")
+                    continue
+
+                try:
+                    parsed |= buffer.add_spark(response)
+
+                except Exception as e:
+                    # pass if could not parse response
+                    logger.info(f"Exception {url}: {e}")
+
+            urls = retry_queue.pop_ready()
+
+        return parsed
+
+    def fetch(self, urls: list, params: dict) -> list:
+        """
+        Curl urls with the selected engine
+
+        ::param urls: list of urls to curl
+        ::param params: request parameters, shared by all urls
+
+        ::return list of [url, data, status], see curl_url
+        """
+        if self.engine == "async":
+            crawler = AsyncCrawler(
+                self.concurrency,
+                session_pool.timeout,
+                rate_limiter,
+                response_cache,
+                proxy_pool,
+            )
+            crawler.execute(urls, params)
+
+            return crawler.responses
+
+        mt = MultiThread()
+        mt.execute(urls, curl_url, params)
+
+        return mt.parse_results()
+
+    def crawl(self, urls: list, params: dict, buffer: ChartBuffer) -> list:
+        """
+        Curl urls with the selected engine, parse responses into buffer
+
+        ::param urls: list of urls to curl
+        ::param params: request parameters, shared by all urls
+        ::param buffer: ChartBuffer to write into
+
+        ::return urls to retry, ie. throttled or failed
+        """
+        if self.engine == "async":
+            # one coroutine per URL - ticker - to curl
+            # all sharing the same connection pool
+            crawler = AsyncCrawler(
+                self.concurrency,
+                session_pool.timeout,
+                rate_limiter,
+                response_cache,
+                proxy_pool,
+            )
+            crawler.execute(urls, params)
+
+            return crawler.parse_yahoo(buffer)
+
+        # call multi thread to curl urls
+        mt = MultiThread()
+        # one process per URL - ticker - to curl
+        mt.execute(urls, curl_url, params)
+
+        return mt.parse_yahoo(buffer)
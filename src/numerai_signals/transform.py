@@ -9,6 +9,7 @@ __email__ = "numerai_2021@protonmail.com"
 
 from time import time
 import datetime
+import io
 
 import pandas as pd
 import numpy as np
@@ -22,30 +23,59 @@ from module.aws.athena import Athena
 from module.aws.glue import Glue
 from module.app import App
 from module.transformer import Transformer
+from module.panel_indicators import PanelIndicators
 from util.parse_args import parse_args_transform
 from util.optimise_frame import optimise_frame
+from config.constant import TRANSFORM_LAGS, TRANSFORM_STATE_KEY
+
+
+def ticker_slices(df: pd.DataFrame):
+    """
+    Split data into tickers in a single pass.
+    Data is sorted once by ticker and timestamp,
+    each ticker is then a contiguous slice between two group offsets
+
+    ::param df: data to split
+
+    ::yield (ticker, df) tuples, rows sorted by timestamp
+    """
+    df = df.sort_values(by=["ticker", "timestamp"], kind="stable", ignore_index=True)
+
+    # group offsets, ie. rows where ticker changes
+    tickers = df["ticker"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+    ends = np.r_[starts[1:], len(tickers)]
+
+    for start, end in zip(starts, ends):
+        yield tickers[start], df.iloc[start:end]
 
 
 def transform(params):
+    """
+    Compute features of a given ticker
+
+    ::param params:
+        - task: (ticker, df) tuple, see ticker_slices
+        - params
+            - cmd: indicators to compute, see Transformer
+            - lags: number of lags
+
+    ::return df: ticker features, fridays only. None if failed
+    """
     logger = Logger().logger
-    df = params["params"]["df"]
     cmd = params["params"]["cmd"]
-    ticker = params["task"]
+    lags = params["params"]["lags"]
+    ticker, df_ticker = params["task"]
 
     try:
         trans = Transformer()
 
-        # Create a final frame with the transformed tickers
-        df_ticker = df[df["ticker"] == ticker]
-        # derniere date=aujourd'hui=derniere ligne
-        df_ticker.sort_values(by=["timestamp"], inplace=True)
-
         # This is where the magic happens
         logger.info(f"processing {ticker}")
         df_ticker = getattr(trans, f"{cmd}_indicators")(df_ticker)
 
-        for i in df_ticker.columns[3:]:
-            df_ticker = trans.shifter(df_ticker, i)
+        # ticker, timestamp and currency aside, every column is lagged
+        df_ticker = trans.lagger(df_ticker, df_ticker.columns[3:], lags)
 
         df_ticker = optimise_frame(df_ticker)
         df_ticker = df_ticker[df_ticker["timestamp"].dt.weekday == 4]
@@ -77,8 +107,8 @@ def main():
         App.set("aws_account_id", Aws().get_account_id())  # aws dev or prod account
 
         # these are the lags we will apply to our TA features
-        if args.lags:  # not required, default is 5
-            App.set("lags", int(args.lags))
+        # not required, default is 5
+        App.set("lags", int(args.lags) if args.lags else TRANSFORM_LAGS)
 
         # part 1: load data
         # reload raw data. this is the default behavior
@@ -114,21 +144,57 @@ def main():
         df[df["timestamp"].dt.date.between(end_date, start_date)]
 
         logger.info("Let's go 🔥")
-        tickers = list(np.sort(df.ticker.unique()))
+        s3 = S3(f"{App.config('aws_account_id')}-signals-data")
 
-        # call multi thread to compute features
-        mt = MultiThread()
-        mt.execute(tickers, transform, {"df": df, "cmd": args.cmd})
-        df_out = mt.parse_transform()
+        if args.cmd == "panel":
+            # indicators state of the previous run, only new bars are processed
+            state = None
+            if args.incremental:
+                content = s3.read_file(TRANSFORM_STATE_KEY)
+                if content is None:
+                    raise OperationalException(
+                        f"No indicator state at {TRANSFORM_STATE_KEY}, run a full transform"
+                    )
+                state = pd.read_parquet(io.BytesIO(content))
+                df = PanelIndicators.new_bars(df, state)
+                logger.info(f"{len(df.index)} new rows since previous state")
+
+            # all tickers at once, one array operation per indicator
+            panel = PanelIndicators(df, state)
+            df_out = panel.transform(App.config("lags"))
+
+        else:
+            # each task only carries its ticker rows, not the whole frame
+            # that is what gets pickled to worker processes
+            # derniere date=aujourd'hui=derniere ligne
+            tasks = ticker_slices(df)
+
+            # call multi thread, or multi process, to compute features
+            # indicators are CPU bound, threads are serialised by the GIL
+            mt = MultiThread(args.backend, args.workers, args.chunksize)
+            mt.execute(tasks, transform, {"cmd": args.cmd, "lags": App.config("lags")})
+            df_out = mt.parse_transform()
+
+        # incremental rows are appended to previous features
+        if args.incremental:
+            content = s3.read_file(f"transform_data/updated_training.csv")
+            if content is not None:
+                df_previous = pd.read_csv(io.BytesIO(content), parse_dates=["timestamp"])
+                df_out = pd.concat([df_previous, df_out], ignore_index=True)
 
         df_out.to_csv(f"data/transform/transform.csv", index=False)
 
         logger.info(f"Uploading file")
-        s3 = S3(f"{App.config('aws_account_id')}-signals-data")
         s3.upload_file(
             f"transform_data/updated_training.csv", f"data/transform/transform.csv"
         )
 
+        # state saved once features are uploaded, never ahead of them
+        if args.cmd == "panel":
+            buffer = io.BytesIO()
+            PanelIndicators.merge_state(state, panel.state).to_parquet(buffer)
+            s3.upload_file(TRANSFORM_STATE_KEY, buffer.getvalue())
+
         logger.info(f"Nrows published: {len(df_out.index)}")
         _time_sec = round(time() - run_start_time, 2)
         _time_min = round(_time_sec / 60, 2)
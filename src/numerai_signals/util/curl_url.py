@@ -7,14 +7,45 @@ Define curl_url
 __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
-import requests
 import random
+from time import monotonic
 
 from config.constant import USER_AGENTS
 from module.logger.logger import Logger
+from module.session_pool import SessionPool
+from module.rate_limiter import RateLimiter
+from module.response_cache import ResponseCache
+from module.proxy_pool import ProxyPool
 
 logger = Logger().logger
 
+# one keep-alive session per worker thread
+# use session_pool.configure() to change pool size or timeouts
+session_pool = SessionPool()
+
+# request rate shared by all workers
+# use rate_limiter.configure() to change rate boundaries
+rate_limiter = RateLimiter()
+
+# on disk responses cache, disabled by default
+# use response_cache.configure() to enable it
+response_cache = ResponseCache()
+
+# local proxies requests are spread across, none by default
+# use proxy_pool.configure() to add proxies
+proxy_pool = ProxyPool()
+
+
+def is_retryable(status: int) -> bool:
+    """
+    Whether a request should be retried given its response status
+
+    ::param status: HTTP status code, None if no response
+
+    ::return True if throttled (429), server error (5xx) or no response
+    """
+    return status is None or status == 429 or status >= 500
+
 
 def curl_url(params: dict) -> dict:
     """
@@ -28,20 +59,59 @@ def curl_url(params: dict) -> dict:
             interval=1d
             events=history
 
-    ::return response data
+    ::return [url, data, status]
+        - data: response data, None if failed
+        - status: HTTP status code, None if no response
     """
     url = params["task"]
+
+    # serve from cache if possible
+    data = response_cache.get(url, params["params"])
+    if data is not None:
+        return [url, data, 200]
+
+    # wait for our turn
+    rate_limiter.acquire()
+
+    # then assign a proxy, if any, and time the request only
+    proxy = proxy_pool.acquire()
+    start = monotonic()
+
     try:
         logger.info(f"Crawling {url}")
-        data = requests.get(
+        response = session_pool.get(
             url=url,
             params=params["params"],
             headers={"User-Agent": random.choice(USER_AGENTS)},
+            proxies={"http": proxy, "https": proxy} if proxy else None,
         )
 
-        return [url, data.json()]
-
     except Exception as e:
-        # return none if exception
+        # no response, ie. timeout or connection error
+        rate_limiter.on_throttle()
+        proxy_pool.report(proxy, True)
+        logger.info(f"Exception {url}: {e}")
+        return [url, None, None]
+
+    proxy_pool.report(proxy, is_retryable(response.status_code), monotonic() - start)
+
+    # slow down if throttled, speed up otherwise
+    if is_retryable(response.status_code):
+        rate_limiter.on_throttle()
+        logger.info(f"Throttled {url}: HTTP {response.status_code}")
+        return [url, None, response.status_code]
+
+    rate_limiter.on_success()
+
+    try:
+        data = response.json()
+
+    except ValueError as e:
+        # return none if response is not json
         logger.info(f"Exception {url}: {e}")
-        return [url, None]
+        return [url, None, response.status_code]
+
+    if response.status_code == 200:
+        response_cache.put(url, params["params"], data)
+
+    return [url, data, response.status_code]
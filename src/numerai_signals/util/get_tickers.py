@@ -7,45 +7,79 @@ Main script for loading raw data
 __author__ = "Julien Lefebvre, Hugo Chauvary"
 __email__ = "numerai_2021@protonmail.com"
 
+import io
+import zlib
+from time import time
+
 import pandas as pd
 import json
 import warnings
 import numerapi
 
+from config.constant import TICKER_MAP_URL
+from module.exception import OperationalException
+from module.logger.logger import Logger
+from module.ticker_cache import TickerCache
+from util.curl_url import session_pool
+
 warnings.filterwarnings("ignore")
 
+logger = Logger().logger
+
 
-def get_bloomberg_yahoo_mapping() -> pd.DataFrame:
+def apply_corrections(ticker_map: pd.DataFrame, corrections: dict) -> pd.DataFrame:
     """
-    Read in yahoo to bloomberg ticker map
-    Add corrections
+    Apply yahoo ticker corrections, in a single pass:
+        - update yahoo ticker if bloomberg ticker already exists
+        - append new row if not
+
+    ::param ticker_map: mapping table, bloomberg_ticker column
+    ::param corrections: {bloomberg ticker: yahoo ticker}
 
-    ::return ticker_map mapping table
+    ::return ticker_map mapping table, indexed by bloomberg_ticker
     """
-    # read
-    url = (
-        "https://numerai-signals-public-data.s3-us-west-2.amazonaws.com/"
-        "signals_ticker_map_w_bbg.csv"
+    ticker_map = ticker_map.set_index("bloomberg_ticker")
+    corrections = pd.Series(corrections, dtype=object)
+
+    # update existing rows, duplicated bloomberg tickers included
+    known = ticker_map.index.isin(corrections.index)
+    ticker_map.loc[known, "yahoo"] = corrections.reindex(
+        ticker_map.index[known]
+    ).values
+
+    # append new rows, at once
+    new = corrections[~corrections.index.isin(ticker_map.index)]
+    ticker_map = pd.concat(
+        [
+            ticker_map,
+            pd.DataFrame(
+                {"ticker": new.index, "yahoo": new.values},
+                index=pd.Index(new.index, name="bloomberg_ticker"),
+            ),
+        ]
     )
 
+    return ticker_map
+
+
+def get_bloomberg_yahoo_mapping(ticker_map: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Read in yahoo to bloomberg ticker map
+    Add corrections
+
+    ::param ticker_map: mapping file content, downloaded if not given
+
+    ::return ticker_map mapping table, indexed by bloomberg_ticker
+    """
     # load bloomberg/yahoo mapping file
-    ticker_map = pd.read_csv(url)
+    if ticker_map is None:
+        ticker_map = pd.read_csv(TICKER_MAP_URL)
 
     # some corrections
     with open("data/config/ticker_corrections.json") as json_file:
         corrections = json.load(json_file)
 
-    for old, new in corrections.items():
-        # update if bloomberg_ticker already exists
-        if old in ticker_map["bloomberg_ticker"].values:
-            ticker_map.loc[ticker_map["bloomberg_ticker"] == old, "yahoo"] = new
-
-        # append new row if not
-        else:
-            _row = {"ticker": old, "bloomberg_ticker": old, "yahoo": new}
-            ticker_map = ticker_map.append(_row, ignore_index=True)
-
-    return ticker_map
+    return apply_corrections(ticker_map, corrections)
 
 
 def get_numerai_tickers() -> list:
@@ -59,31 +93,91 @@ def get_numerai_tickers() -> list:
     return [x for x in napi.ticker_universe()]
 
 
-def get_yahoo_tickers(ticker: str = None, ntickers: str = None) -> list:
+def get_snapshot(cache: TickerCache, offline: bool = False) -> dict:
+    """
+    Get ticker universe snapshot, refreshed if expired.
+    Mapping file is revalidated with its ETag/Last-Modified,
+    last snapshot is used if refresh fails
+
+    ::param cache: snapshot cache
+    ::param offline: use last snapshot, whatever its age
+
+    ::return snapshot, see TickerCache
+    """
+    snapshot = cache.load()
+
+    if offline:
+        if snapshot is None:
+            raise OperationalException("Offline mode: no ticker snapshot found")
+        return snapshot
+
+    if cache.fresh():
+        return snapshot
+
+    snapshot = dict(snapshot or {})
+    try:
+        # conditional request, 304 if mapping file did not change
+        headers = {}
+        if snapshot.get("etag"):
+            headers["If-None-Match"] = snapshot["etag"]
+        if snapshot.get("last_modified"):
+            headers["If-Modified-Since"] = snapshot["last_modified"]
+
+        response = session_pool.get(TICKER_MAP_URL, headers=headers)
+        if response.status_code == 304:
+            logger.info("Ticker map not modified")
+
+        else:
+            response.raise_for_status()
+            snapshot["ticker_map"] = response.text
+            snapshot["etag"] = response.headers.get("ETag")
+            snapshot["last_modified"] = response.headers.get("Last-Modified")
+
+        # universe has no validator, fetched again
+        snapshot["universe"] = get_numerai_tickers()
+
+    except Exception as e:
+        if "ticker_map" not in snapshot or "universe" not in snapshot:
+            raise e
+        logger.warning(f"Could not refresh tickers, using last snapshot: {e}")
+        return snapshot
+
+    snapshot["fetched"] = time()
+    cache.save(snapshot)
+
+    return snapshot
+
+
+def get_yahoo_tickers(
+    ticker: str = None,
+    ntickers: str = None,
+    cache: TickerCache = None,
+    offline: bool = False,
+) -> list:
     """
     This function helps mapping to yahoo tickers
     and to return the corresponding, cleaned list
 
     ::param ticker: optional ticker
     ::param ntickers: optional ticker list length
+    ::param cache: optional ticker universe cache, see get_snapshot
+    ::param offline: use cached ticker universe, whatever its age
     ::return: list of live tickers
     """
-    # get bloomberg/yahoo mapping
-    ticker_map = get_bloomberg_yahoo_mapping()
-
-    # get numerai live tickers
-    universe = pd.Series(get_numerai_tickers())
-    # avoids ValueError: Cannot merge a Series without a name
-    universe.name = "universe"
-
-    # join on universe.universe = ticker_map.bloomberg_ticker
-    tickers = pd.merge(
-        ticker_map,
-        universe,
-        how="inner",
-        left_on="bloomberg_ticker",
-        right_on="universe",
-    )
+    # get bloomberg/yahoo mapping and numerai live tickers
+    if cache is None:
+        ticker_map = get_bloomberg_yahoo_mapping()
+        universe = get_numerai_tickers()
+
+    else:
+        snapshot = get_snapshot(cache, offline)
+        ticker_map = get_bloomberg_yahoo_mapping(
+            pd.read_csv(io.StringIO(snapshot["ticker_map"]))
+        )
+        universe = snapshot["universe"]
+
+    # keep live bloomberg tickers, in mapping file order
+    tickers = ticker_map[ticker_map.index.isin(universe)]
     ticker_list = tickers.yahoo.dropna().to_list()
 
     # limit to first ntickers
@@ -99,3 +193,20 @@ def get_yahoo_tickers(ticker: str = None, ntickers: str = None) -> list:
             raise e
 
     return ticker_list
+
+
+def shard_tickers(tickers: list, shard: int, nshards: int) -> list:
+    """
+    Keep tickers of a given shard.
+    Stable hash partitioning: a ticker always belongs to the same shard,
+    whatever the run or the machine
+
+    ::param tickers: list of tickers
+    ::param shard: shard index, within [0, nshards[
+    ::param nshards: number of shards
+
+    ::return list of tickers, in original order
+    """
+    return [
+        ticker for ticker in tickers if zlib.crc32(ticker.encode()) % nshards == shard
+    ]
@@ -0,0 +1,31 @@
+"""
+hash_frame.py
+
+Implements hash_frame
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = "numerai_2021@protonmail.com"
+
+import hashlib
+
+import pandas as pd
+
+
+def hash_frame(df: pd.DataFrame, keys: tuple = ("ticker", "timestamp")) -> str:
+    """
+    Deterministic content hash of a frame.
+    Row order, column order and index do not matter
+
+    ::param df: frame to hash
+    ::param keys: columns identifying a row, used to sort rows
+
+    ::return sha256 hex digest
+    """
+    columns = sorted(df.columns)
+    df = df[columns].sort_values(list(keys), kind="stable")
+
+    digest = hashlib.sha256(",".join(columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+    return digest.hexdigest()
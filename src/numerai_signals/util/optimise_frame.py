@@ -20,7 +20,8 @@ def optimise_frame(df: pd.DataFrame) -> pd.DataFrame:
     ::return df: optmized dataframe
     """
     # round to 4 decimals
-    fcols = df.select_dtypes(include=[np.float, np.int]).columns
+    # np.float and np.int aliases were removed in numpy 1.24
+    fcols = df.select_dtypes(include=[np.floating, np.integer]).columns
     df[fcols] = df[fcols].round(4)
     df[fcols] = df[fcols].astype("float32")
 
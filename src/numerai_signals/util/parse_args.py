@@ -7,6 +7,23 @@ Define parse_args functions
 import argparse
 from datetime import datetime
 
+from config.constant import (
+    CRAWLER_ENGINES,
+    CRAWLER_CONCURRENCY,
+    HTTP_POOL_SIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    RATE_LIMIT_START,
+    RETRY_MAX_ATTEMPTS,
+    CACHE_TTL,
+    CACHE_MAX_SIZE,
+    STREAM_BATCH_SIZE,
+    PROXY_STRATEGIES,
+    YAHOO_SPARK_BATCH,
+    EXECUTOR_BACKENDS,
+    EXECUTOR_CHUNK_SIZE,
+)
+
 
 def validate_load_args(**kwargs):
     """
@@ -37,6 +54,50 @@ def validate_load_args(**kwargs):
         except AssertionError as e:
             raise e
 
+    # validate crawler settings > 0
+    for key in (
+        "concurrency",
+        "pool_size",
+        "connect_timeout",
+        "read_timeout",
+        "rate",
+        "max_attempts",
+        "cache_ttl",
+        "cache_size",
+        "batch_size",
+        "nshards",
+    ):
+        if key in kwargs and kwargs[key] is not None:
+            try:
+                assert float(kwargs[key]) > 0
+
+            except AssertionError as e:
+                raise e
+
+    # validate spark batch within [0, YAHOO_SPARK_BATCH], 0 disables it
+    if kwargs.get("spark_batch") is not None:
+        try:
+            assert 0 <= int(kwargs["spark_batch"]) <= YAHOO_SPARK_BATCH
+
+        except AssertionError as e:
+            raise e
+
+    # validate one tor control port per proxy
+    if kwargs.get("tor_control_ports") is not None:
+        try:
+            assert len(kwargs["tor_control_ports"]) == len(kwargs.get("proxies") or [])
+
+        except AssertionError as e:
+            raise e
+
+    # validate shard within [0, nshards[
+    if "shard" in kwargs and "nshards" in kwargs:
+        try:
+            assert 0 <= int(kwargs["shard"]) < int(kwargs["nshards"])
+
+        except AssertionError as e:
+            raise e
+
 
 def parse_args_load():
     """
@@ -76,30 +137,270 @@ def parse_args_load():
         help="Load a given ticker",
     )
 
+    # only crawl dates not loaded yet, ticker by ticker
+    parser.add_argument(
+        "--incremental",
+        required=False,
+        action="store_const",
+        const=True,
+        default=False,
+        help="Crawl each ticker from its last loaded date",
+    )
+
+    # ticker universe
+    parser.add_argument(
+        "--offline",
+        required=False,
+        action="store_const",
+        const=True,
+        default=False,
+        help="Use last ticker universe snapshot, whatever its age",
+    )
+
+    # sharding, across parallel load tasks
+    parser.add_argument(
+        "--shard",
+        required=False,
+        default=0,
+        type=int,
+        help="Shard to load, within [0, nshards[",
+    )
+
+    parser.add_argument(
+        "--nshards",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of shards tickers are split into",
+    )
+
+    # crawler engine
+    parser.add_argument(
+        "--engine",
+        choices=CRAWLER_ENGINES,
+        required=False,
+        default="thread",
+        type=str,
+        help="Crawler engine, please choose from: thread, async",
+    )
+
+    # async engine concurrency
+    parser.add_argument(
+        "--concurrency",
+        required=False,
+        default=CRAWLER_CONCURRENCY,
+        type=int,
+        help="Maximum number of requests in flight, async engine only",
+    )
+
+    # http sessions
+    parser.add_argument(
+        "--pool-size",
+        required=False,
+        default=HTTP_POOL_SIZE,
+        type=int,
+        help="Connections kept alive per host and worker, thread engine only",
+    )
+
+    parser.add_argument(
+        "--connect-timeout",
+        required=False,
+        default=HTTP_CONNECT_TIMEOUT,
+        type=float,
+        help="Seconds to wait for a connection",
+    )
+
+    parser.add_argument(
+        "--read-timeout",
+        required=False,
+        default=HTTP_READ_TIMEOUT,
+        type=float,
+        help="Seconds to wait for the server to send data",
+    )
+
+    # proxies
+    parser.add_argument(
+        "--proxies",
+        required=False,
+        default=None,
+        nargs="+",
+        type=str,
+        help="Local proxies to spread requests across, ex: http://127.0.0.1:8118",
+    )
+
+    parser.add_argument(
+        "--proxy-strategy",
+        choices=PROXY_STRATEGIES,
+        required=False,
+        default="round_robin",
+        type=str,
+        help="Proxy assignment, please choose from: round_robin, health",
+    )
+
+    parser.add_argument(
+        "--tor-control-ports",
+        required=False,
+        default=None,
+        nargs="+",
+        type=int,
+        help="TOR control port of each proxy, renews identities of throttled proxies",
+    )
+
+    # throttling
+    parser.add_argument(
+        "--rate",
+        required=False,
+        default=RATE_LIMIT_START,
+        type=float,
+        help="Initial request rate, requests/sec. Tuned at runtime",
+    )
+
+    parser.add_argument(
+        "--max-attempts",
+        required=False,
+        default=RETRY_MAX_ATTEMPTS,
+        type=int,
+        help="Attempts per ticker when throttled or failed",
+    )
+
+    # batched requests
+    parser.add_argument(
+        "--spark-batch",
+        required=False,
+        default=0,
+        type=int,
+        help=f"Symbols per spark request, up to {YAHOO_SPARK_BATCH}. "
+        "0, the default, disables it: yahoo spark answers close prices only",
+    )
+
+    # responses cache
+    parser.add_argument(
+        "--cache",
+        required=False,
+        action="store_const",
+        const=True,
+        default=False,
+        help="Enable on disk cache of yahoo finance API responses",
+    )
+
+    parser.add_argument(
+        "--cache-ttl",
+        required=False,
+        default=CACHE_TTL,
+        type=float,
+        help="Seconds a cached response stays valid",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        required=False,
+        default=CACHE_MAX_SIZE // 1024 ** 2,
+        type=int,
+        help="Cache size upper boundary, MB",
+    )
+
+    # streaming load
+    parser.add_argument(
+        "--stream",
+        required=False,
+        action="store_const",
+        const=True,
+        default=False,
+        help="Crawl tickers batch by batch, spilling partitions to disk",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        required=False,
+        default=STREAM_BATCH_SIZE,
+        type=int,
+        help="Tickers crawled per batch, the unit of checkpoints",
+    )
+
+    # checkpoints
+    parser.add_argument(
+        "--checkpoint",
+        required=False,
+        action="store_const",
+        const=True,
+        default=False,
+        help="Checkpoint the run in the data bucket, so that it can be resumed",
+    )
+
+    parser.add_argument(
+        "--resume",
+        required=False,
+        default=None,
+        type=str,
+        metavar="RUN_ID",
+        help="Continue a given run from its last checkpoint",
+    )
+
     parser = parse_args_all(parser)
 
     # parse and validate args
     args = parser.parse_args()
-    validate_load_args(start=args.start, end=args.end, ntickers=args.ntickers)
+    validate_load_args(
+        start=args.start,
+        end=args.end,
+        ntickers=args.ntickers,
+        concurrency=args.concurrency,
+        pool_size=args.pool_size,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        rate=args.rate,
+        max_attempts=args.max_attempts,
+        spark_batch=args.spark_batch,
+        cache_ttl=args.cache_ttl,
+        cache_size=args.cache_size,
+        batch_size=args.batch_size,
+        shard=args.shard,
+        nshards=args.nshards,
+        proxies=args.proxies,
+        tor_control_ports=args.tor_control_ports,
+    )
 
     return args
 
 
+def validate_transform_args(**kwargs):
+    """
+    Validate kwargs args format
+    """
+    # incremental state is only kept by the panel engine
+    if kwargs.get("incremental"):
+        try:
+            assert kwargs.get("cmd") == "panel"
+
+        except AssertionError as e:
+            raise e
+
+    # validate executor settings > 0
+    for key in ("workers", "chunksize"):
+        if key in kwargs and kwargs[key] is not None:
+            try:
+                assert int(kwargs[key]) > 0
+
+            except AssertionError as e:
+                raise e
+
+
 def parse_args_transform():
     """
     Parse CLI arguments for transform entry point
+    Validate format
 
-    ::return parsed CLI
+    ::return parsed and validated CLI arguments
     """
     parser = argparse.ArgumentParser()
 
     # TA command
     parser.add_argument(
         "--cmd",
-        choices=["all", "momentum", "other", "trend", "volatility", "volume"],
+        choices=["all", "momentum", "other", "trend", "volatility", "volume", "panel"],
         required=True,
         type=str,
-        help=" please choose from: all, momentum, other, trend,volatility, volume",
+        help=" please choose from: all, momentum, other, trend,volatility, volume, panel",
     )
 
     # reload raw data
@@ -117,9 +418,52 @@ def parse_args_transform():
         "--lags", required=False, type=str, help="How many lags you want to apply"
     )
 
+    # resume indicators from previous state
+    parser.add_argument(
+        "--incremental",
+        required=False,
+        action="store_true",
+        help="Process bars newer than the stored indicator state only, panel only",
+    )
+
+    # executor
+    parser.add_argument(
+        "--backend",
+        choices=EXECUTOR_BACKENDS,
+        required=False,
+        default="process",
+        type=str,
+        help="Executor backend, please choose from: thread, process",
+    )
+
+    parser.add_argument(
+        "--workers",
+        required=False,
+        default=None,
+        type=int,
+        help="Number of workers, defaults to the number of processors",
+    )
+
+    parser.add_argument(
+        "--chunksize",
+        required=False,
+        default=EXECUTOR_CHUNK_SIZE,
+        type=int,
+        help="Tickers sent to a worker process at once, process backend only",
+    )
+
     parser = parse_args_all(parser)
 
-    return parser.parse_args()
+    # parse and validate args
+    args = parser.parse_args()
+    validate_transform_args(
+        cmd=args.cmd,
+        incremental=args.incremental,
+        workers=args.workers,
+        chunksize=args.chunksize,
+    )
+
+    return args
 
 
 def parse_args_all(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
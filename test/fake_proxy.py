@@ -0,0 +1,83 @@
+"""
+fake_proxy.py
+
+Local dummy HTTP forward proxy, used by unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# direct connections to upstream, whatever the environment
+_opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Forwards absolute-URI GET requests, or answers 429 if banned
+    """
+
+    def do_GET(self):
+        proxy = self.server.fake
+        with proxy.lock:
+            proxy.requests += 1
+
+        if proxy.banned:
+            status, body = 429, b'{"finance": {"error": {"code": "Too Many Requests"}}}'
+
+        else:
+            try:
+                with _opener.open(self.path) as response:
+                    status, body = response.status, response.read()
+            except urllib.error.HTTPError as e:
+                status, body = e.code, e.read()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # keep test output clean
+        pass
+
+
+class FakeProxy:
+    """
+    ex:
+        with FakeProxy() as proxy:
+            requests.get(url, proxies={"http": proxy.url})
+    """
+
+    def __init__(self, banned: bool = False):
+        """
+        Class constructor
+
+        ::param banned: answer 429 to every request, like a throttled IP
+        """
+        self.banned = banned
+        self.lock = threading.Lock()
+        self.requests = 0
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,91 @@
+"""
+fake_s3.py
+
+In memory stand-in for module.aws.s3.S3, used by unit tests and benchmarks
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import io
+import threading
+
+OK = {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+
+class FakeS3:
+    """
+    Same interface as S3, objects are kept in a dict
+    """
+
+    def __init__(self, bucket: str = "fake-bucket"):
+        self.bucket = bucket
+        self.objects = {}
+        self.metadata = {}
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def _count(self, method: str):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def list_folder(self, folder_path: str) -> list:
+        self._count("list_folder")
+        with self.lock:
+            return sorted(key for key in self.objects if key.startswith(folder_path))
+
+    def upload_file(self, s3_file_path, local_file_path, metadata: dict = None) -> dict:
+        self._count("upload_file")
+        if isinstance(local_file_path, (bytes, bytearray)):
+            body = bytes(local_file_path)
+        elif isinstance(local_file_path, io.IOBase):
+            body = local_file_path.read()
+        else:
+            with open(local_file_path, "rb") as f:
+                body = f.read()
+        with self.lock:
+            self.objects[s3_file_path] = body
+            self.metadata[s3_file_path] = dict(metadata or {})
+
+        return OK
+
+    def download_file(self, s3_file_path: str, local_file_path: str) -> None:
+        self._count("download_file")
+        with open(local_file_path, "wb") as f:
+            f.write(self.objects[s3_file_path])
+
+    def read_file(self, s3_file_path: str) -> bytes:
+        self._count("read_file")
+        with self.lock:
+            return self.objects.get(s3_file_path)
+
+    def get_metadata(self, s3_file_path: str) -> dict:
+        self._count("get_metadata")
+        with self.lock:
+            return self.metadata.get(s3_file_path)
+
+    def delete_file(self, file_path) -> None:
+        self._count("delete_file")
+        with self.lock:
+            self.objects.pop(file_path, None)
+            self.metadata.pop(file_path, None)
+
+    def list_folders(self, folders: list) -> dict:
+        self._count("list_folders")
+        listing = {folder: [] for folder in folders}
+        with self.lock:
+            for key in sorted(self.objects):
+                folder = key[:key.rfind("/") + 1]
+                if folder in listing:
+                    listing[folder].append(key)
+
+        return listing
+
+    def delete_files(self, keys: list) -> list:
+        self._count("delete_files")
+        with self.lock:
+            for key in keys:
+                self.objects.pop(key, None)
+                self.metadata.pop(key, None)
+
+        return []
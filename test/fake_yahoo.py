@@ -0,0 +1,250 @@
+"""
+fake_yahoo.py
+
+Synthetic yahoo finance API responses, used by unit tests and benchmarks
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 2022-03-01 14:30:00 UTC, ie. US market open
+START_TS = 1646145000
+DAY = 86400
+# US market open, seconds after midnight utc
+OPEN_OFFSET = 52200
+
+
+def chart_response(ticker: str, ndays: int = 5, start_ts: int = START_TS,
+                   gmtoffset: int = -18000, seed: int = None) -> dict:
+    """
+    Build a /v8/finance/chart like response with ndays daily bars
+
+    ::param ticker: ticker symbol
+    ::param ndays: number of daily bars
+    ::param start_ts: first bar utc timestamp
+    ::param gmtoffset: exchange offset to utc, in seconds
+    ::param seed: random seed, defaults to ticker based seed
+
+    ::return response: parsed json
+    """
+    rng = random.Random(ticker if seed is None else seed)
+    timestamp = [start_ts + i * DAY for i in range(ndays)]
+
+    close = []
+    price = rng.uniform(10, 500)
+    for _ in range(ndays):
+        price *= 1 + rng.gauss(0, 0.02)
+        close.append(round(price, 4))
+
+    quote = {
+        "open": [round(c * (1 + rng.gauss(0, 0.005)), 4) for c in close],
+        "high": [round(c * 1.01, 4) for c in close],
+        "low": [round(c * 0.99, 4) for c in close],
+        "close": close,
+        "volume": [rng.randint(1000, 1000000) for _ in close],
+    }
+
+    return {
+        "chart": {
+            "result": [
+                {
+                    "meta": {
+                        "currency": "USD",
+                        "symbol": ticker,
+                        "exchangeName": "NMS",
+                        "gmtoffset": gmtoffset,
+                    },
+                    "timestamp": timestamp,
+                    "indicators": {"quote": [quote]},
+                }
+            ],
+            "error": None,
+        }
+    }
+
+
+def spark_response(charts: list, ohlcv: set = None) -> dict:
+    """
+    Build a /v7/finance/spark like response out of chart responses.
+    As yahoo does, series carry close prices only
+
+    ::param charts: chart responses, see chart_response
+    ::param ohlcv: symbols answered with full OHLCV series nonetheless
+
+    ::return response: parsed json
+    """
+    result = []
+    for chart in charts:
+        item = json.loads(json.dumps(chart["chart"]["result"][0]))
+        symbol = item["meta"]["symbol"]
+        if symbol not in (ohlcv or set()):
+            quote = item["indicators"]["quote"][0]
+            item["indicators"]["quote"] = [{"close": quote["close"]}]
+
+        result.append({"symbol": symbol, "response": [item]})
+
+    return {"spark": {"result": result, "error": None}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Serves /v8/finance/chart/{ticker} and /v7/finance/spark?symbols=...
+    requests with synthetic data
+    """
+
+    # enables keep-alive
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server.fake
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        try:
+            if server.latency:
+                threading.Event().wait(server.latency)
+
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            ticker = url.path.rsplit("/", 1)[-1]
+
+            if url.path.endswith("/spark"):
+                # throttled as a whole, keyed by symbols
+                ticker = query.get("symbols", "")
+                with server.lock:
+                    server.spark_requests += 1
+
+            with server.lock:
+                throttled = server.throttled.get(ticker, 0) < server.throttle
+                server.throttled[ticker] = server.throttled.get(ticker, 0) + 1
+                # random failures, on top of the per ticker ones
+                draw = server.rng.random()
+                throttled = throttled or draw < server.throttle_rate
+                failed = not throttled and draw < server.throttle_rate + server.error_rate
+
+            if failed:
+                status = 500
+                body = {"finance": {"error": {"code": "Internal Server Error"}}}
+            elif throttled:
+                status = 429
+                body = {"finance": {"error": {"code": "Too Many Requests"}}}
+            elif ticker in server.unknown:
+                status = 404
+                body = {"chart": {"result": None, "error": {"code": "Not Found"}}}
+            elif url.path.endswith("/spark"):
+                # unknown symbols are left out, as yahoo does
+                status = 200
+                charts = [
+                    server.response(symbol, query)
+                    for symbol in ticker.split(",")
+                    if symbol and symbol not in server.unknown
+                ]
+                body = spark_response(charts, server.spark_ohlcv)
+            else:
+                status = 200
+                body = server.response(ticker, query)
+
+            with server.lock:
+                server.statuses[status] = server.statuses.get(status, 0) + 1
+
+            self._send(status, body)
+
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        # keep test output clean
+        pass
+
+
+class FakeYahooServer:
+    """
+    Local stand-in for the yahoo finance chart API
+
+    ex:
+        with FakeYahooServer() as server:
+            Yahoo(tickers, start, end, api_url=server.api_url).load_data()
+    """
+
+    def __init__(self, latency: float = 0, unknown: list = None, throttle: int = 0,
+                 spark_ohlcv: list = None, throttle_rate: float = 0,
+                 error_rate: float = 0, seed: int = 0):
+        """
+        Class constructor
+
+        ::param latency: seconds to wait before answering each request
+        ::param unknown: tickers answered with a 404, left out of spark answers
+        ::param throttle: number of 429 answered per ticker before serving data
+        ::param spark_ohlcv: tickers answered with full OHLCV by spark,
+            none by default: yahoo spark series carry close prices only
+        ::param throttle_rate: share of requests answered with a 429, at random
+        ::param error_rate: share of requests answered with a 500, at random
+        ::param seed: random seed of throttle_rate and error_rate draws
+        """
+        self.latency = latency
+        self.unknown = set(unknown or [])
+        self.throttle = throttle
+        self.spark_ohlcv = set(spark_ohlcv or [])
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.throttled = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.spark_requests = 0
+        # {HTTP status: number of answers}
+        self.statuses = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/v8/finance/chart"
+
+    @property
+    def spark_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/v7/finance/spark"
+
+    def response(self, ticker: str, query: dict) -> dict:
+        """
+        One daily bar per day within [period1, period2]
+        """
+        if "period1" not in query:
+            return chart_response(ticker)
+
+        period1 = int(query["period1"]) - int(query["period1"]) % DAY + OPEN_OFFSET
+        ndays = max((int(query["period2"]) - period1) // DAY + 1, 0)
+
+        return chart_response(ticker, ndays=ndays, start_ts=period1)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
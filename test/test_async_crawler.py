@@ -0,0 +1,81 @@
+"""
+test_async_crawler.py
+
+Implements AsyncCrawler unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.async_crawler import AsyncCrawler
+from module.chart_buffer import ChartBuffer
+from module.rate_limiter import RateLimiter
+from test.fake_yahoo import FakeYahooServer
+
+
+@pytest.fixture
+def server():
+    with FakeYahooServer(latency=0.05, unknown=['UNKNOWN']) as server:
+        yield server
+
+
+def test_execute(server):
+    urls = [f'{server.api_url}/T{i}' for i in range(20)]
+
+    crawler = AsyncCrawler(concurrency=5)
+    crawler.execute(urls)
+
+    assert server.requests == 20
+    assert len(crawler.responses) == 20
+    assert all(status == 200 for _, _, status in crawler.responses)
+
+
+def test_concurrency_is_bounded(server):
+    urls = [f'{server.api_url}/T{i}' for i in range(30)]
+
+    AsyncCrawler(concurrency=4).execute(urls)
+
+    assert 1 < server.max_in_flight <= 4
+
+
+def test_parse_yahoo(server):
+    urls = [f'{server.api_url}/{t}' for t in ('AAPL', 'MSFT', 'UNKNOWN')]
+    params = dict(period1=1646092800, period2=1646265599, interval='1d')
+
+    buffer = ChartBuffer()
+    crawler = AsyncCrawler()
+    crawler.execute(urls, params)
+
+    assert crawler.parse_yahoo(buffer) == []
+    df = buffer.to_frame()
+    assert sorted(df.ticker.unique()) == ['AAPL', 'MSFT']
+    assert df.shape[0] == 4
+
+
+def test_parse_yahoo_throttled():
+    rate_limiter = RateLimiter(rate=100)
+
+    with FakeYahooServer(throttle=1) as server:
+        crawler = AsyncCrawler(rate_limiter=rate_limiter)
+        crawler.execute([f'{server.api_url}/AAPL'])
+
+    assert crawler.parse_yahoo(ChartBuffer()) == [f'{server.api_url}/AAPL']
+    assert rate_limiter.stats()['throttles'] == 1
+
+
+def test_connection_error():
+    crawler = AsyncCrawler()
+    # nothing listening on port 9
+    crawler.execute(['http://127.0.0.1:9/v8/finance/chart/AAPL'])
+
+    assert crawler.responses == [['http://127.0.0.1:9/v8/finance/chart/AAPL', None, None]]
@@ -0,0 +1,112 @@
+"""
+test_chart_buffer.py
+
+Implements ChartBuffer unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import pandas as pd
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.chart_buffer import ChartBuffer
+from test.fake_yahoo import chart_response, spark_response, START_TS
+
+
+def test_add_grows_buffers():
+    buffer = ChartBuffer(capacity=1)
+
+    for i in range(10):
+        buffer.add(chart_response(f'T{i}', ndays=5))
+
+    assert buffer.size == 50
+    assert buffer.capacity >= 50
+
+
+def test_to_frame():
+    buffer = ChartBuffer()
+    buffer.add(chart_response('AAPL', ndays=3, gmtoffset=-18000))
+    buffer.add(chart_response('MSFT', ndays=2, gmtoffset=-18000))
+
+    df = buffer.to_frame()
+
+    assert list(df.columns) == [
+        'open', 'high', 'low', 'close', 'volume',
+        'ticker', 'timestamp', 'currency', 'exchange'
+    ]
+    assert df.shape[0] == 5
+    assert df[df.ticker == 'MSFT'].shape[0] == 2
+    # 14:30 utc - 5h = 09:30 local, same day, truncated to date
+    assert df.timestamp.iloc[0] == pd.Timestamp(START_TS, unit='s').normalize()
+
+
+def test_to_frame_empty():
+    assert ChartBuffer().to_frame().empty
+
+
+def test_missing_quote_is_nan():
+    response = chart_response('AAPL', ndays=2)
+    response['chart']['result'][0]['indicators']['quote'][0]['close'][1] = None
+
+    buffer = ChartBuffer()
+    buffer.add(response)
+
+    assert buffer.to_frame().close.isna().sum() == 1
+
+
+def test_invalid_response_leaves_buffer_untouched():
+    response = chart_response('AAPL', ndays=2)
+    response['chart']['result'][0]['indicators']['quote'][0]['close'].pop()
+
+    buffer = ChartBuffer()
+    with pytest.raises(ValueError):
+        buffer.add(response)
+
+    with pytest.raises(TypeError):
+        buffer.add({'chart': {'result': None, 'error': 'Not Found'}})
+
+    assert buffer.size == 0
+
+
+def test_add_spark_skips_incomplete_symbols():
+    response = spark_response(
+        [chart_response('AAPL', ndays=3), chart_response('MSFT', ndays=3)],
+        ohlcv={'AAPL'},
+    )
+
+    buffer = ChartBuffer()
+    assert buffer.add_spark(response) == {'AAPL'}
+    assert buffer.size == 3
+    assert buffer.meta['ticker'] == ['AAPL']
+
+    assert buffer.add_spark({'spark': {'result': None, 'error': None}}) == set()
+
+
+def test_to_frame_keeps_earliest_entry_per_day():
+    # intraday entry listed before the daily bar of the same day
+    response = chart_response('AAPL', ndays=2)
+    result = response['chart']['result'][0]
+    result['timestamp'].insert(0, result['timestamp'][1] + 3600)
+    for column in ChartBuffer.QUOTE_COLUMNS:
+        result['indicators']['quote'][0][column].insert(0, -1)
+
+    buffer = ChartBuffer()
+    buffer.add(response)
+    # same ticker, again, in a later response
+    buffer.add(chart_response('AAPL', ndays=3, seed=0))
+
+    df = buffer.to_frame()
+
+    assert df.shape[0] == 3
+    assert not (df.close == -1).any()
+    assert df.timestamp.is_monotonic_increasing
+    assert df.close.iloc[:2].tolist() == result['indicators']['quote'][0]['close'][1:]
@@ -11,13 +11,33 @@ import os
 import sys
 import inspect
 
+from time import time
+from types import SimpleNamespace
+
 import pytest
 
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(f'{parentdir}/src/numerai_signals')
 
-from util.get_tickers import get_yahoo_tickers
+import pandas as pd
+
+import util.get_tickers as get_tickers
+from util.get_tickers import apply_corrections, get_snapshot, get_yahoo_tickers, shard_tickers
+from module.exception import OperationalException
+from module.ticker_cache import TickerCache
+
+SNAPSHOT = {
+    'ticker_map': (
+        'ticker,bloomberg_ticker,yahoo\n'
+        'AAPL,AAPL US,AAPL\n'
+        'MSFT,MSFT US,MSFT\n'
+        'DEAD,DEAD US,DEAD\n'
+    ),
+    'universe': ['AAPL US', 'MSFT US'],
+    # expired, offline mode ignores it
+    'fetched': 0,
+}
 
 
 def test_get_yahoo_tickers_ticker():
@@ -31,3 +51,136 @@ def test_get_yahoo_tickers_nticker():
 @pytest.mark.xfail(raises=ValueError)
 def test_get_yahoo_tickers_not_exists():
     get_yahoo_tickers(ticker='Hugo')
+
+
+def test_get_yahoo_tickers_offline(tmp_path):
+    cache = TickerCache(folder=str(tmp_path))
+    cache.save(SNAPSHOT)
+
+    tickers = get_yahoo_tickers(cache=cache, offline=True)
+    assert tickers[:2] == ['AAPL', 'MSFT']
+    assert 'DEAD' not in tickers
+
+
+def test_get_yahoo_tickers_fresh(tmp_path):
+    cache = TickerCache(folder=str(tmp_path))
+    cache.save(dict(SNAPSHOT, fetched=time()))
+
+    assert get_yahoo_tickers(ticker='MSFT', cache=cache) == ['MSFT']
+
+
+@pytest.mark.xfail(raises=OperationalException)
+def test_get_yahoo_tickers_offline_no_snapshot(tmp_path):
+    get_yahoo_tickers(cache=TickerCache(folder=str(tmp_path)), offline=True)
+
+
+@pytest.fixture
+def ticker_map_server(monkeypatch):
+    """
+    Stub mapping file and universe downloads, requests headers are recorded
+    """
+    server = SimpleNamespace(requests=[], response=None)
+
+    def get(url, headers=None):
+        server.requests.append(headers)
+        if isinstance(server.response, Exception):
+            raise server.response
+        return server.response
+
+    monkeypatch.setattr(get_tickers.session_pool, 'get', get)
+    monkeypatch.setattr(get_tickers, 'get_numerai_tickers', lambda: ['AAPL US'])
+
+    return server
+
+
+def response(status_code, text='', headers=None):
+    return SimpleNamespace(
+        status_code=status_code,
+        text=text,
+        headers=headers or {},
+        raise_for_status=lambda: None,
+    )
+
+
+def test_get_snapshot_not_modified(tmp_path, ticker_map_server):
+    cache = TickerCache(folder=str(tmp_path))
+    cache.save(dict(SNAPSHOT, etag='"v1"', last_modified='Tue, 01 Mar 2022 00:00:00 GMT'))
+    ticker_map_server.response = response(304)
+
+    snapshot = get_snapshot(cache)
+
+    # mapping file revalidated, kept. universe fetched again
+    assert ticker_map_server.requests == [
+        {'If-None-Match': '"v1"', 'If-Modified-Since': 'Tue, 01 Mar 2022 00:00:00 GMT'}
+    ]
+    assert snapshot['ticker_map'] == SNAPSHOT['ticker_map']
+    assert snapshot['etag'] == '"v1"'
+    assert snapshot['universe'] == ['AAPL US']
+    assert TickerCache(folder=str(tmp_path)).load() == snapshot
+    assert cache.fresh()
+
+
+def test_get_snapshot_modified(tmp_path, ticker_map_server):
+    cache = TickerCache(folder=str(tmp_path))
+    cache.save(dict(SNAPSHOT, etag='"v1"'))
+    ticker_map_server.response = response(
+        200,
+        'ticker,bloomberg_ticker,yahoo\nAAPL,AAPL US,AAPL\n',
+        {'ETag': '"v2"', 'Last-Modified': 'Wed, 02 Mar 2022 00:00:00 GMT'},
+    )
+
+    snapshot = get_snapshot(cache)
+
+    assert ticker_map_server.requests == [{'If-None-Match': '"v1"'}]
+    assert snapshot['ticker_map'] == 'ticker,bloomberg_ticker,yahoo\nAAPL,AAPL US,AAPL\n'
+    assert snapshot['etag'] == '"v2"'
+    assert snapshot['last_modified'] == 'Wed, 02 Mar 2022 00:00:00 GMT'
+    assert TickerCache(folder=str(tmp_path)).load() == snapshot
+
+
+def test_get_snapshot_refresh_fails(tmp_path, ticker_map_server):
+    cache = TickerCache(folder=str(tmp_path))
+    cache.save(SNAPSHOT)
+    ticker_map_server.response = ConnectionError('unreachable')
+
+    # last snapshot, still expired
+    snapshot = get_snapshot(cache)
+    assert snapshot == SNAPSHOT
+    assert not cache.fresh()
+
+
+def test_get_snapshot_refresh_fails_no_snapshot(tmp_path, ticker_map_server):
+    ticker_map_server.response = ConnectionError('unreachable')
+
+    with pytest.raises(ConnectionError):
+        get_snapshot(TickerCache(folder=str(tmp_path)))
+
+
+def test_apply_corrections():
+    ticker_map = pd.DataFrame(
+        {
+            'ticker': ['AAPL', 'BRK', 'BRK'],
+            'bloomberg_ticker': ['AAPL US', 'BRK/B US', 'BRK/B US'],
+            'yahoo': ['AAPL', None, 'BRK.B'],
+        }
+    )
+
+    df = apply_corrections(ticker_map, {'BRK/B US': 'BRK-B', 'AA/ LN': 'AA.L'})
+
+    assert df.index.name == 'bloomberg_ticker'
+    assert df.index.tolist() == ['AAPL US', 'BRK/B US', 'BRK/B US', 'AA/ LN']
+    assert df.yahoo.tolist() == ['AAPL', 'BRK-B', 'BRK-B', 'AA.L']
+    assert df.loc['AA/ LN', 'ticker'] == 'AA/ LN'
+
+
+def test_shard_tickers():
+    tickers = [f'T{i}' for i in range(1000)]
+    shards = [shard_tickers(tickers, i, 4) for i in range(4)]
+
+    # each ticker belongs to exactly one shard, order is kept
+    assert sorted(sum(shards, [])) == sorted(tickers)
+    assert all(shard == sorted(shard, key=tickers.index) for shard in shards)
+    assert all(len(shard) > 200 for shard in shards)
+
+    # stable, whatever the ticker list
+    assert shard_tickers(['T1', 'T2'], 1, 4) == [t for t in ['T1', 'T2'] if t in shards[1]]
@@ -0,0 +1,41 @@
+"""
+test_hash_frame.py
+
+Implements hash_frame unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from util.hash_frame import hash_frame
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'timestamp', 'close']).assign(
+        timestamp=lambda df: pd.to_datetime(df.timestamp)
+    )
+
+
+def test_hash_frame_order_independent():
+    df = frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.0)])
+    shuffled = df.iloc[::-1][['close', 'timestamp', 'ticker']].reset_index(drop=True)
+
+    assert hash_frame(df) == hash_frame(shuffled)
+
+
+def test_hash_frame_content():
+    df = frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.0)])
+    changed = frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.5)])
+
+    assert hash_frame(df) != hash_frame(changed)
+    assert hash_frame(df) != hash_frame(df.rename(columns={'close': 'open'}))
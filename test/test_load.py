@@ -0,0 +1,340 @@
+"""
+test_load.py
+
+Implements load unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import datetime as dt
+import functools
+import os
+import sys
+import inspect
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+import load
+from load import (
+    crawl,
+    flush,
+    merge,
+    partition_file,
+    partition_folder,
+    partitions,
+    purge,
+    read,
+    unchanged,
+    upload,
+)
+from module.partition_writer import PartitionWriter
+from module.yahoo import Yahoo
+from util.curl_url import rate_limiter, session_pool
+from test.fake_s3 import FakeS3
+from test.fake_yahoo import FakeYahooServer
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'timestamp', 'close']).assign(
+        timestamp=lambda df: pd.to_datetime(df.timestamp)
+    )
+
+
+def test_partition_folder():
+    assert partition_folder(pd.Timestamp('2022-03-01')) == 'raw_data/yahoo/2022/3/1'
+
+
+def test_partitions():
+    df = frame(
+        [('AAPL', '2022-03-01', 1.0), ('AAPL', '2022-03-02', 2.0), ('MSFT', '2022-03-01', 3.0)]
+    )
+
+    tasks = dict(partitions(df))
+
+    assert list(tasks) == [pd.Timestamp('2022-03-01'), pd.Timestamp('2022-03-02')]
+    assert tasks[pd.Timestamp('2022-03-01')].ticker.tolist() == ['AAPL', 'MSFT']
+    assert tasks[pd.Timestamp('2022-03-02')].ticker.tolist() == ['AAPL']
+
+
+def test_upload():
+    s3 = FakeS3()
+    day, tmp = partitions(frame([('AAPL', '2022-03-01', 1.0)]))[0]
+
+    upload({'task': (day, tmp), 'params': {'s3': s3}})
+
+    df = read({'task': day, 'params': {'s3': s3}})
+    assert df.values.tolist() == [['AAPL', day, 1.0]]
+
+
+def test_merge(tmp_path):
+    s3 = FakeS3()
+
+    # partition 2022/3/1 already holds AAPL and MSFT
+    # 2022/3/10 must not be read along with it
+    path = tmp_path / 'existing.parquet'
+    frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.0)]).to_parquet(path)
+    s3.upload_file('raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet', path)
+    frame([('AAPL', '2022-03-10', 9.0)]).to_parquet(path)
+    s3.upload_file('raw_data/yahoo/2022/3/10/yahoo_data_220310.parquet', path)
+
+    df = merge(
+        frame([('AAPL', '2022-03-01', 1.5), ('AMZN', '2022-03-02', 3.0)]), s3
+    )
+
+    assert sorted(df.values.tolist()) == [
+        ['AAPL', pd.Timestamp('2022-03-01'), 1.5],
+        ['AMZN', pd.Timestamp('2022-03-02'), 3.0],
+        ['MSFT', pd.Timestamp('2022-03-01'), 2.0],
+    ]
+
+
+def test_merge_nothing_loaded():
+    df = frame([('AAPL', '2022-03-01', 1.5)])
+
+    assert merge(df, FakeS3()).equals(df)
+
+
+def test_flush(tmp_path):
+    s3 = FakeS3()
+    day = pd.Timestamp('2022-03-01')
+
+    # partition already holds AAPL and MSFT
+    path = tmp_path / 'existing.parquet'
+    frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.0)]).to_parquet(path)
+    s3.upload_file('raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet', path)
+
+    writer = PartitionWriter(str(tmp_path / 'stream'))
+    writer.append(frame([('AAPL', '2022-03-01', 1.5)]))
+
+    flush({'task': day, 'params': {'writer': writer, 's3': s3, 'merge': True}})
+
+    # spilled file is uploaded then removed
+    assert not os.path.exists(writer.paths[day])
+    assert s3.list_folder('raw_data/yahoo/2022/3/1/') == [
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet'
+    ]
+
+    df = read({'task': day, 'params': {'s3': s3}})
+    assert sorted(df.values.tolist()) == [
+        ['AAPL', day, 1.5],
+        ['MSFT', day, 2.0],
+    ]
+
+
+def test_purge(tmp_path):
+    s3 = FakeS3()
+
+    path = tmp_path / 'existing.parquet'
+    frame([('AAPL', '2022-03-01', 1.0)]).to_parquet(path)
+    for key in (
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet',
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301_0of2.parquet',
+        'raw_data/yahoo/2022/3/10/yahoo_data_220310_0of2.parquet',
+    ):
+        s3.upload_file(key, path)
+
+    # the partition file is replaced by uploads, only other layouts go
+    purge([pd.Timestamp('2022-03-01')], s3)
+
+    assert s3.list_folder('raw_data/') == [
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet',
+        'raw_data/yahoo/2022/3/10/yahoo_data_220310_0of2.parquet',
+    ]
+    assert 'delete_file' not in s3.calls
+
+
+def test_unchanged():
+    s3 = FakeS3()
+    task = partitions(frame([('AAPL', '2022-03-01', 1.0), ('MSFT', '2022-03-01', 2.0)]))[0]
+    day = task[0]
+
+    # never uploaded
+    assert unchanged({'task': task, 'params': {'s3': s3}}) is None
+
+    upload({'task': task, 'params': {'s3': s3}})
+    assert unchanged({'task': task, 'params': {'s3': s3}}) == day
+
+    # same content, different row order
+    reordered = (day, task[1].iloc[::-1])
+    assert unchanged({'task': reordered, 'params': {'s3': s3}}) == day
+
+    changed = partitions(frame([('AAPL', '2022-03-01', 1.5), ('MSFT', '2022-03-01', 2.0)]))[0]
+    assert unchanged({'task': changed, 'params': {'s3': s3}}) is None
+
+
+def test_flush_unchanged(tmp_path):
+    s3 = FakeS3()
+    day = pd.Timestamp('2022-03-01')
+    params = {'task': day, 'params': {'s3': s3, 'merge': False}}
+
+    for _ in range(2):
+        writer = PartitionWriter(str(tmp_path / 'stream'))
+        writer.append(frame([('AAPL', '2022-03-01', 1.5)]))
+        params['params']['writer'] = writer
+        response = flush(params)
+
+    # second flush is skipped, spilled file is still removed
+    assert response is None
+    assert s3.calls['upload_file'] == 1
+    assert not os.path.exists(writer.paths[day])
+
+
+def test_sharded_partitions(tmp_path):
+    s3 = FakeS3()
+    day = pd.Timestamp('2022-03-01')
+    assert partition_file(day, (1, 4)) == 'raw_data/yahoo/2022/3/1/yahoo_data_220301_1of4.parquet'
+
+    # two shards write to the same partition
+    for shard, ticker in ((0, 'AAPL'), (1, 'MSFT')):
+        task = partitions(frame([(ticker, '2022-03-01', 1.0)]))[0]
+        upload({'task': task, 'params': {'s3': s3, 'shard': (shard, 2)}})
+
+    # a shard only reads its own file, and keeps the other shards' ones
+    df = read({'task': day, 'params': {'s3': s3, 'shard': (1, 2)}})
+    assert df.ticker.tolist() == ['MSFT']
+
+    purge([day], s3, (1, 2))
+    assert s3.list_folder('raw_data/') == [
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301_0of2.parquet',
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301_1of2.parquet',
+    ]
+
+
+def test_crawl_keeps_connections_across_batches(monkeypatch):
+    closed = []
+    monkeypatch.setattr(session_pool, 'close', lambda: closed.append(True))
+    rate_limiter.configure(rate=100)
+
+    args = SimpleNamespace(
+        batch_size=2, engine='thread', concurrency=2, max_attempts=3, spark_batch=0
+    )
+    start, end = dt.datetime(2022, 3, 1), dt.datetime(2022, 3, 3)
+
+    with FakeYahooServer() as server:
+        monkeypatch.setattr(load, 'Yahoo', functools.partial(Yahoo, api_url=server.api_url))
+        batches = crawl({start: ['T0', 'T1', 'T2', 'T3', 'T4']}, start, end, args)
+
+        next(batches)
+        next(batches)
+        assert not closed
+
+        assert len(list(batches)) == 1
+
+    # pool released once, when crawling is over
+    assert closed == [True]
+
+
+def test_reshard(tmp_path):
+    s3 = FakeS3()
+    day = pd.Timestamp('2022-03-01')
+    tickers = [f'T{i}' for i in range(40)]
+    df = frame([(ticker, '2022-03-01', 1.0) for ticker in tickers])
+
+    def load_partition(shard):
+        # as load.main: skip unchanged partitions, upload then drop stale files
+        share = df if shard is None else df[df.ticker.isin(tickers[shard[0]::shard[1]])]
+        task = partitions(share)[0]
+        if unchanged({'task': task, 'params': {'s3': s3, 'shard': shard}}) is None:
+            upload({'task': task, 'params': {'s3': s3, 'shard': shard}})
+
+    # unsharded, then 2 shards, then 4 shards, then unsharded again
+    for nshards in (1, 2, 4, 1):
+        for shard in range(nshards):
+            load_partition((shard, nshards) if nshards > 1 else None)
+
+        if nshards > 1:
+            assert s3.list_folder('raw_data/') == [
+                partition_file(day, (shard, nshards)) for shard in range(nshards)
+            ]
+        else:
+            assert s3.list_folder('raw_data/') == [partition_file(day)]
+
+        loaded = read({'task': day, 'params': {'s3': s3}})
+        assert sorted(loaded.ticker) == sorted(tickers)
+
+    # a partition left with files of another layout is never unchanged
+    task = partitions(df)[0]
+    upload({'task': task, 'params': {'s3': s3, 'shard': (0, 2)}})
+    assert unchanged({'task': task, 'params': {'s3': s3}}) is None
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_resume_after_upload_crash(monkeypatch, stream):
+    s3 = FakeS3()
+    tickers = ['A', 'B', 'C']
+    monkeypatch.setattr(load, 'Aws', lambda: SimpleNamespace(get_account_id=lambda: 'test'))
+    monkeypatch.setattr(load, 'S3', lambda bucket: s3)
+    monkeypatch.setattr(load, 'get_yahoo_tickers', lambda *args: tickers)
+    rate_limiter.configure(rate=100)
+
+    def run(*argv):
+        argv = ['load.py', '--start', '220301', '--end', '220310', '--incremental', *argv]
+        monkeypatch.setattr(sys, 'argv', argv + (['--stream'] if stream else []))
+        load.main()
+
+    def loaded(day):
+        return sorted(read({'task': pd.Timestamp(day), 'params': {'s3': s3}}).ticker.unique())
+
+    def crash(key, *args, **kwargs):
+        # checkpoints go through, partition uploads fail
+        if key.startswith('raw_data/'):
+            raise RuntimeError('crash')
+        return upload_file(key, *args, **kwargs)
+
+    with FakeYahooServer() as server:
+        monkeypatch.setattr(load, 'Yahoo', functools.partial(Yahoo, api_url=server.api_url))
+        run()
+        assert loaded('2022-03-02') == ['A', 'B', 'C']
+        # not checkpointed
+        assert not s3.list_folder('manifest/runs/')
+        assert not s3.list_folder('checkpoint/')
+
+        # a new ticker, the run dies while uploading partitions
+        tickers.append('T0')
+        upload_file = s3.upload_file
+        monkeypatch.setattr(s3, 'upload_file', crash)
+        run('--checkpoint')
+
+        # partitions are left as they were
+        assert loaded('2022-03-02') == ['A', 'B', 'C']
+
+        monkeypatch.setattr(s3, 'upload_file', upload_file)
+        [key] = s3.list_folder('manifest/runs/')
+        run_id = key.split('/')[-1].split('.')[0]
+        run('--resume', run_id)
+
+    assert loaded('2022-03-02') == ['A', 'B', 'C', 'T0']
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_partitions_listed_once(monkeypatch, stream):
+    s3 = FakeS3()
+    tickers = ['A', 'B']
+    monkeypatch.setattr(load, 'Aws', lambda: SimpleNamespace(get_account_id=lambda: 'test'))
+    monkeypatch.setattr(load, 'S3', lambda bucket: s3)
+    monkeypatch.setattr(load, 'get_yahoo_tickers', lambda *args: tickers)
+    rate_limiter.configure(rate=100)
+
+    argv = ['load.py', '--start', '220301', '--end', '220310', '--incremental']
+    monkeypatch.setattr(sys, 'argv', argv + (['--stream'] if stream else []))
+
+    with FakeYahooServer() as server:
+        monkeypatch.setattr(load, 'Yahoo', functools.partial(Yahoo, api_url=server.api_url))
+        load.main()
+
+        # a new ticker: partitions are read back, merged and rewritten
+        tickers.append('C')
+        s3.calls.clear()
+        load.main()
+
+    assert s3.calls['list_folders'] == 1
+    assert 'list_folder' not in s3.calls
+    day = pd.Timestamp('2022-03-02')
+    assert sorted(read({'task': day, 'params': {'s3': s3}}).ticker.unique()) == ['A', 'B', 'C']
@@ -38,3 +38,11 @@ def test_parse():
 
     assert len(res) > 0
     assert res[0] == 0
+
+def test_process_backend():
+    mtp = MultiThread(backend='process', workers=2, chunksize=7)
+    mtp.execute(range(100), square)
+
+    # 100 tasks, 7 per chunk
+    assert len(mtp.processes) == 15
+    assert mtp.parse_square() == [i * i for i in range(100)]
@@ -0,0 +1,170 @@
+"""
+test_panel_indicators.py
+
+Implements PanelIndicators unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import io
+import os
+import sys
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.exception import OperationalException
+from module.panel_indicators import PanelIndicators
+
+
+def raw_data(missing=False):
+    # tickers with different histories, rows shuffled
+    # missing: a few missing closes, as yahoo answers them
+    rng = np.random.default_rng(0)
+    frames = []
+    for ticker, ndays in [('AAPL', 60), ('AMZN', 35), ('HALT', 80), ('MSFT', 12)]:
+        close = 100 + np.cumsum(rng.normal(size=ndays))
+        if ticker == 'HALT':
+            # trading halted after a trend, flat prices
+            close[40:] = round(close[39], 2)
+        if missing:
+            close[rng.choice(np.arange(1, ndays), size=ndays // 10, replace=False)] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    'ticker': ticker,
+                    'timestamp': pd.date_range('2022-03-01', periods=ndays),
+                    'currency': 'USD',
+                    'open': close + rng.normal(size=ndays),
+                    'high': close + rng.random(ndays),
+                    'low': close - rng.random(ndays),
+                    'close': close,
+                    'volume': rng.integers(1000, 100000, ndays).astype('float64'),
+                }
+            )
+        )
+
+    return pd.concat(frames).sample(frac=1, random_state=0, ignore_index=True)
+
+
+def ta_indicators(df):
+    high, low, close, volume = df.high, df.low, df.close, df.volume
+    macd = ta.trend.MACD(close, fillna=True)
+    bollinger = ta.volatility.BollingerBands(close, fillna=True)
+
+    return {
+        'momentum_rsi': ta.momentum.RSIIndicator(close, fillna=True).rsi(),
+        'momentum_roc': ta.momentum.ROCIndicator(close, fillna=True).roc(),
+        'trend_sma_fast': ta.trend.SMAIndicator(close, 12, fillna=True).sma_indicator(),
+        'trend_sma_slow': ta.trend.SMAIndicator(close, 26, fillna=True).sma_indicator(),
+        'trend_ema_fast': ta.trend.EMAIndicator(close, 12, fillna=True).ema_indicator(),
+        'trend_ema_slow': ta.trend.EMAIndicator(close, 26, fillna=True).ema_indicator(),
+        'trend_macd': macd.macd(),
+        'trend_macd_signal': macd.macd_signal(),
+        'trend_macd_diff': macd.macd_diff(),
+        'volatility_bbm': bollinger.bollinger_mavg(),
+        'volatility_bbh': bollinger.bollinger_hband(),
+        'volatility_bbl': bollinger.bollinger_lband(),
+        'volatility_bbw': bollinger.bollinger_wband(),
+        'volatility_bbp': bollinger.bollinger_pband(),
+        'volatility_bbhi': bollinger.bollinger_hband_indicator(),
+        'volatility_bbli': bollinger.bollinger_lband_indicator(),
+        'volatility_atr': ta.volatility.AverageTrueRange(
+            high, low, close, 10, fillna=True
+        ).average_true_range(),
+        'volume_obv': ta.volume.OnBalanceVolumeIndicator(
+            close, volume, fillna=True
+        ).on_balance_volume(),
+    }
+
+
+def test_compute_matches_ta():
+    df = raw_data()
+    panel = PanelIndicators(df)
+    indicators = panel.compute()
+
+    assert sorted(indicators) == sorted(PanelIndicators.INDICATORS)
+    for code, ticker in enumerate(panel.tickers):
+        df_ticker = df[df.ticker == ticker].sort_values('timestamp', ignore_index=True)
+        nbars = len(df_ticker)
+
+        for name, expected in ta_indicators(df_ticker).items():
+            np.testing.assert_allclose(
+                indicators[name][:nbars, code], expected, rtol=1e-9, atol=1e-9, err_msg=name
+            )
+
+        # padding past the last bar of the ticker
+        assert np.isnan(panel.panel('close')[nbars:, code]).all()
+
+
+def test_transform_lags_fridays():
+    df = raw_data()
+    out = PanelIndicators(df).transform(lags=3)
+
+    assert out.timestamp.dt.weekday.eq(4).all()
+    assert len(out) == (df.timestamp.dt.weekday == 4).sum()
+    assert list(out.columns[:3]) == ['ticker', 'timestamp', 'currency']
+    assert 'FEATURE_close_shift2' in out.columns
+    assert 'FEATURE_volume_obv_shift0' in out.columns
+
+    # Transformer.lagger layout: shift0 of every column, then other lags
+    columns = list(df.columns[3:]) + PanelIndicators.INDICATORS
+    assert list(out.columns[3:]) == [f'FEATURE_{c}_shift0' for c in columns] + [
+        f'FEATURE_{c}_shift{x}' for c in columns for x in (1, 2)
+    ]
+
+    # shift x is the close x bars earlier, same ticker
+    df = df.sort_values(['ticker', 'timestamp'], ignore_index=True)
+    for _, row in out.iterrows():
+        history = df[(df.ticker == row.ticker) & (df.timestamp <= row.timestamp)].close
+        for x in range(3):
+            expected = history.iloc[-1 - x] if len(history) > x else np.nan
+            np.testing.assert_allclose(
+                row[f'FEATURE_close_shift{x}'], expected, rtol=1e-6, equal_nan=True
+            )
+
+
+@pytest.mark.parametrize('split', ['2022-03-05', '2022-03-20', '2022-04-10'])
+def test_incremental_matches_full(split):
+    df = raw_data(missing=True)
+    # constant prices, missing indicator values are filled from state
+    df.loc[df.ticker == 'MSFT', 'close'] = 50.0
+
+    full = PanelIndicators(df)
+    expected = full.transform(lags=5)
+    expected = expected[expected.timestamp > split].reset_index(drop=True)
+
+    # first run, then state round trip through parquet
+    first = PanelIndicators(df[df.timestamp <= split])
+    first.transform(lags=5)
+    buffer = io.BytesIO()
+    first.state.to_parquet(buffer)
+    state = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+
+    # second run, new bars only. AMZN has none after 2022-04-10
+    df_new = PanelIndicators.new_bars(df, state)
+    assert df_new.timestamp.gt(split).all()
+    second = PanelIndicators(df_new, state)
+    out = second.transform(lags=5)
+
+    pd.testing.assert_frame_equal(out, expected, atol=2e-4)
+    state = PanelIndicators.merge_state(state, second.state)
+    pd.testing.assert_frame_equal(state, full.state, atol=1e-6, check_dtype=False)
+
+
+def test_incremental_needs_enough_history():
+    df = raw_data()
+    first = PanelIndicators(df[df.timestamp <= '2022-03-20'])
+    first.transform(lags=5)
+
+    second = PanelIndicators(PanelIndicators.new_bars(df, first.state), first.state)
+    with pytest.raises(OperationalException):
+        second.transform(lags=40)
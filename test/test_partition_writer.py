@@ -0,0 +1,47 @@
+"""
+test_partition_writer.py
+
+Implements PartitionWriter unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.partition_writer import PartitionWriter
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'timestamp', 'close']).assign(
+        timestamp=lambda df: pd.to_datetime(df.timestamp)
+    )
+
+
+def test_partition_writer(tmp_path):
+    # leftovers of a previous run
+    (tmp_path / 'yahoo_data_220228.parquet').write_bytes(b'')
+
+    writer = PartitionWriter(str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+    # two batches, both touching 2022-03-01
+    writer.append(frame([('AAPL', '2022-03-01', 1.0), ('AAPL', '2022-03-02', 2.0)]))
+    writer.append(frame([('MSFT', '2022-03-01', 3.0)]))
+
+    day = pd.Timestamp('2022-03-01')
+    assert writer.days() == [day, pd.Timestamp('2022-03-02')]
+    assert writer.tickers[day] == {'AAPL', 'MSFT'}
+    assert writer.rows[day] == 2
+    assert writer.paths[day] == os.path.join(tmp_path, 'yahoo_data_220301.parquet')
+
+    df = pd.read_parquet(writer.paths[day])
+    assert sorted(df.values.tolist()) == [['AAPL', day, 1.0], ['MSFT', day, 3.0]]
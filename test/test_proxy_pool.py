@@ -0,0 +1,134 @@
+"""
+test_proxy_pool.py
+
+Implements ProxyPool unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+import datetime as dt
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.proxy_pool import ProxyPool
+from module.yahoo import Yahoo
+from util.curl_url import curl_url, proxy_pool, rate_limiter, session_pool
+from test.fake_proxy import FakeProxy
+from test.fake_yahoo import FakeYahooServer
+
+PROXIES = ['http://p0', 'http://p1', 'http://p2']
+
+
+def test_empty_pool():
+    assert ProxyPool().acquire() is None
+
+
+def test_round_robin():
+    pool = ProxyPool(PROXIES)
+    assert [pool.acquire() for _ in range(4)] == PROXIES + PROXIES[:1]
+
+
+def test_cooldown():
+    pool = ProxyPool(PROXIES, cooldown=60)
+    pool.report('http://p1', True)
+
+    # throttled proxy is skipped, others keep going
+    assert {pool.acquire() for _ in range(4)} == {'http://p0', 'http://p2'}
+
+    # all cooling down: the one back first, no waiting
+    pool.report('http://p0', True)
+    pool.report('http://p0', True)
+    pool.report('http://p2', True)
+    assert pool.acquire() in ('http://p1', 'http://p2')
+
+
+def test_health():
+    pool = ProxyPool(PROXIES, strategy='health', cooldown=0)
+    for proxy, latency in zip(PROXIES, (0.3, 0.1, 0.2)):
+        pool.acquire()
+        pool.report(proxy, False, latency)
+
+    assert pool.acquire() == 'http://p1'
+
+    pool.report('http://p1', True)
+    assert pool.acquire() == 'http://p2'
+
+
+def test_rotate():
+    rotated = threading.Event()
+
+    def rotate(proxy):
+        assert proxy == 'http://p1'
+        rotated.set()
+
+    pool = ProxyPool(PROXIES, cooldown=60, rotate=rotate, rotate_interval=0.01)
+    pool.report('http://p1', True)
+
+    assert rotated.wait(1)
+    pool.stop()
+
+    # back in rotation
+    assert pool.stats()['http://p1']['rotations'] == 1
+    assert 'http://p1' in {pool.acquire() for _ in range(3)}
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_yahoo_through_proxies(engine):
+    """
+    Expect requests to move away from a banned proxy
+    """
+    start = dt.datetime(2022, 3, 1, tzinfo=dt.timezone.utc).timestamp()
+    end = dt.datetime(2022, 3, 3, tzinfo=dt.timezone.utc).timestamp()
+    tickers = [f'T{i}' for i in range(10)]
+
+    rate_limiter.configure(rate=100)
+    with FakeYahooServer() as server, FakeProxy() as healthy, FakeProxy(banned=True) as banned:
+        proxy_pool.configure([banned.url, healthy.url], cooldown=60)
+        try:
+            df = Yahoo(
+                tickers, start, end, engine=engine, concurrency=1, api_url=server.api_url
+            ).load_data()
+        finally:
+            proxy_pool.configure()
+
+    assert sorted(df.ticker.unique()) == tickers
+    assert healthy.requests == server.requests == 10
+    # banned proxy cools down for the whole crawl, once its first
+    # requests are throttled. at most every other one, as workers start
+    assert 1 <= banned.requests <= len(tickers) // 2
+
+
+def test_curl_url_acquires_after_rate_limiter(monkeypatch):
+    """
+    Expect proxies assigned and requests timed once rate limiter let them go
+    """
+    events = []
+    monkeypatch.setattr(rate_limiter, 'acquire', lambda: (time.sleep(0.2), events.append('rate')))
+    monkeypatch.setattr(proxy_pool, 'acquire', lambda: events.append('proxy') or PROXIES[0])
+    monkeypatch.setattr(
+        proxy_pool, 'report', lambda *args: events.append(('report', *args))
+    )
+    monkeypatch.setattr(
+        session_pool,
+        'get',
+        lambda **kwargs: SimpleNamespace(status_code=200, json=lambda: {}),
+    )
+
+    url, data, status = curl_url({'task': 'http://yahoo/T0', 'params': {}})
+
+    assert status == 200
+    assert events[:2] == ['rate', 'proxy']
+    _, proxy, throttled, latency = events[2]
+    assert proxy == PROXIES[0] and not throttled
+    assert latency < 0.2
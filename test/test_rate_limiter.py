@@ -0,0 +1,97 @@
+"""
+test_rate_limiter.py
+
+Implements RateLimiter and RetryQueue unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+from time import monotonic
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.rate_limiter import RateLimiter
+from module.retry_queue import RetryQueue
+
+
+def test_burst_then_wait():
+    limiter = RateLimiter(rate=10)
+
+    # bucket starts full: one second worth of tokens
+    assert all(limiter.reserve() == 0 for _ in range(10))
+    # then requests are spaced by 1/rate
+    assert 0.05 < limiter.reserve() <= 0.1
+    assert 0.15 < limiter.reserve() <= 0.2
+
+
+def test_acquire_rate():
+    limiter = RateLimiter(rate=50)
+    start = monotonic()
+
+    for _ in range(75):
+        limiter.acquire()
+
+    # 50 from the bucket, 25 at 50/sec
+    assert 0.4 < monotonic() - start < 1
+
+
+def test_additive_increase():
+    limiter = RateLimiter(rate=10, increase=1)
+
+    for _ in range(10):
+        limiter.on_success()
+
+    assert 10.9 < limiter.stats()['rate'] < 11
+
+
+def test_multiplicative_decrease_once_per_burst():
+    limiter = RateLimiter(rate=10, decrease=0.5, min_rate=2)
+
+    for _ in range(5):
+        limiter.on_throttle()
+
+    assert limiter.stats() == {'rate': 5, 'successes': 0, 'throttles': 5}
+
+
+def test_rate_boundaries():
+    limiter = RateLimiter(rate=10, min_rate=8, max_rate=10.5)
+
+    limiter.on_throttle()
+    assert limiter.stats()['rate'] == 8
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.stats()['rate'] == 10.5
+
+
+def test_retry_delay():
+    queue = RetryQueue(base_delay=1, max_delay=4)
+
+    assert 0.5 <= queue.delay(1) <= 1
+    assert 1 <= queue.delay(2) <= 2
+    assert 2 <= queue.delay(10) <= 4
+
+
+def test_retry_queue():
+    queue = RetryQueue(max_attempts=3, base_delay=0.01)
+
+    assert queue.push('a')
+    assert queue.push('b')
+    # tasks are popped once their own backoff expired
+    popped = queue.pop_ready()
+    popped += queue.pop_ready()
+    assert sorted(popped) == ['a', 'b']
+    assert len(queue) == 0
+    assert queue.pop_ready() == []
+
+    # third attempt is the last one
+    assert queue.push('a')
+    assert queue.pop_ready() == ['a']
+    assert not queue.push('a')
+    assert queue.dropped == ['a']
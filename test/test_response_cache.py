@@ -0,0 +1,101 @@
+"""
+test_response_cache.py
+
+Implements ResponseCache unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.response_cache import ResponseCache
+from util.curl_url import curl_url, response_cache
+from test.fake_yahoo import FakeYahooServer, chart_response
+
+URL = 'https://query2.finance.yahoo.com/v8/finance/chart/AAPL'
+PARAMS = dict(period1=1646092800, period2=1646265599, interval='1d', events='history')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(folder=str(tmp_path), enabled=True)
+
+
+def test_put_get(cache):
+    cache.put(URL, PARAMS, chart_response('AAPL'))
+
+    assert cache.get(URL, PARAMS) == chart_response('AAPL')
+    assert cache.get(URL, dict(PARAMS, period2=0)) is None
+    assert cache.get(URL.replace('AAPL', 'MSFT'), PARAMS) is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_key_ignores_other_params(cache):
+    cache.put(URL, PARAMS, chart_response('AAPL'))
+
+    assert cache.get(URL, dict(PARAMS, events='div')) is not None
+
+
+def test_ttl(cache):
+    cache.put(URL, PARAMS, chart_response('AAPL'))
+    cache.ttl = 0
+
+    assert cache.get(URL, PARAMS) is None
+
+
+def test_lru_eviction(cache):
+    for ticker in ('A', 'B'):
+        cache.put(f'{URL}{ticker}', PARAMS, chart_response(ticker))
+
+    # A is used, B is not. B is evicted first
+    cache.get(f'{URL}A', PARAMS)
+    cache.max_size = cache.stats()['size']
+    cache.put(f'{URL}C', PARAMS, chart_response('C'))
+
+    assert cache.get(f'{URL}A', PARAMS) is not None
+    assert cache.get(f'{URL}B', PARAMS) is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_index_existing_files(cache):
+    cache.put(URL, PARAMS, chart_response('AAPL'))
+
+    reopened = ResponseCache(folder=cache.folder, enabled=True)
+
+    assert reopened.stats()['files'] == 1
+    assert reopened.stats()['size'] == cache.stats()['size']
+
+
+def test_disabled(tmp_path):
+    cache = ResponseCache(folder=str(tmp_path))
+    cache.put(URL, PARAMS, chart_response('AAPL'))
+
+    assert cache.get(URL, PARAMS) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_curl_url_cache(tmp_path):
+    response_cache.configure(folder=str(tmp_path))
+
+    try:
+        with FakeYahooServer(unknown=['UNKNOWN']) as server:
+            for _ in range(2):
+                for ticker in ('AAPL', 'UNKNOWN'):
+                    curl_url({'task': f'{server.api_url}/{ticker}', 'params': PARAMS})
+
+        # AAPL is served once from cache. 404 are never cached
+        assert server.requests == 3
+        assert response_cache.stats()['hits'] == 1
+
+    finally:
+        response_cache.configure(enabled=False)
@@ -0,0 +1,122 @@
+"""
+test_run_manifest.py
+
+Implements RunManifest unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from load import partition_file, partitions, upload
+from module.exception import OperationalException
+from module.run_manifest import RunManifest
+from test.fake_s3 import FakeS3
+
+PARAMS = {'start': '220301', 'end': '220303', 'shard': 0, 'nshards': 1}
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'timestamp', 'close']).assign(
+        timestamp=lambda df: pd.to_datetime(df.timestamp)
+    )
+
+
+def test_resume():
+    s3 = FakeS3()
+    manifest = RunManifest(s3, params=PARAMS)
+    manifest.checkpoint(['AAPL', 'MSFT'], frame([('AAPL', '2022-03-01', 1.0)]))
+    # no data for these ones
+    manifest.checkpoint(['AMZN'])
+
+    day, tmp = partitions(frame([('AAPL', '2022-03-01', 1.0)]))[0]
+    manifest.mark_partitions([day])
+    upload({'task': (day, tmp), 'params': {'s3': s3, 'manifest': manifest}})
+
+    resumed = RunManifest(s3, manifest.run_id, PARAMS).load()
+
+    assert resumed.crawled == {'AAPL', 'MSFT', 'AMZN'}
+    assert resumed.partitions == ['2022-03-01']
+    assert resumed.uploaded == {partition_file(day)}
+    assert not resumed.complete
+    frames = list(resumed.frames())
+    assert len(frames) == 1
+    assert frames[0].values.tolist() == [['AAPL', day, 1.0]]
+
+
+def test_resume_other_params():
+    s3 = FakeS3()
+    manifest = RunManifest(s3, params=PARAMS)
+    manifest.save()
+
+    with pytest.raises(OperationalException):
+        RunManifest(s3, manifest.run_id, dict(PARAMS, end='220304')).load()
+
+    with pytest.raises(OperationalException):
+        RunManifest(s3, 'unknown', PARAMS).load()
+
+
+def test_finish():
+    s3 = FakeS3()
+    manifest = RunManifest(s3, params=PARAMS)
+    manifest.checkpoint(['AAPL'], frame([('AAPL', '2022-03-01', 1.0)]))
+    batches = list(manifest.batches)
+
+    manifest.finish()
+
+    assert not any(key in s3.objects for key in batches)
+    assert RunManifest(s3, manifest.run_id, PARAMS).load().complete
+
+
+def test_not_persisted():
+    s3 = FakeS3()
+    manifest = RunManifest(s3, params=PARAMS, persist=False)
+    manifest.checkpoint(['AAPL'], frame([('AAPL', '2022-03-01', 1.0)]))
+    manifest.mark_partitions([pd.Timestamp('2022-03-01')])
+    manifest.mark_uploaded('raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet')
+    manifest.finish()
+
+    # progress is tracked, nothing is written
+    assert manifest.crawled == {'AAPL'}
+    assert not list(manifest.frames())
+    assert not s3.objects
+
+
+def test_concurrent_saves():
+    s3 = FakeS3()
+    manifest = RunManifest(s3, params=PARAMS)
+    upload_file = s3.upload_file
+
+    def slow_upload(*args, **kwargs):
+        time.sleep(0.05)
+        return upload_file(*args, **kwargs)
+
+    s3.upload_file = slow_upload
+    keys = [f'raw_data/yahoo/2022/3/{day}/yahoo_data_2203{day:02d}.parquet' for day in range(1, 21)]
+    threads = [threading.Thread(target=manifest.mark_uploaded, args=(key,)) for key in keys]
+    for thread in threads:
+        thread.start()
+
+    # state stays available while the manifest is written
+    time.sleep(0.01)
+    assert manifest.lock.acquire(timeout=0.02)
+    manifest.lock.release()
+
+    for thread in threads:
+        thread.join()
+
+    # saves are coalesced, none is lost
+    assert s3.calls['upload_file'] < len(keys)
+    assert RunManifest(s3, manifest.run_id, PARAMS).load().uploaded == set(keys)
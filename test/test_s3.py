@@ -11,6 +11,7 @@ import os
 import sys
 import inspect
 import pytest
+from botocore.stub import Stubber
 
 currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 parentdir = os.path.dirname(currentdir)
@@ -40,3 +41,110 @@ def test_upload_file(s3_resource):
 
 #     print(response)
 #     assert True
+
+
+def test_list_folders():
+    s3 = S3('fake-bucket')
+    stubber = Stubber(s3.resource.meta.client)
+
+    # days of a month listed once under common prefix raw_data/yahoo/2021/12/
+    # 2021/12/10 is not asked for
+    stubber.add_response(
+        'list_objects_v2',
+        {
+            'Contents': [
+                {'Key': 'raw_data/yahoo/2021/12/1/yahoo_data_211201.parquet'},
+                {'Key': 'raw_data/yahoo/2021/12/10/yahoo_data_211210.parquet'},
+                {'Key': 'raw_data/yahoo/2021/12/31/yahoo_data_211231.parquet'},
+            ]
+        },
+        {'Bucket': 'fake-bucket', 'Prefix': 'raw_data/yahoo/2021/12/'},
+    )
+    # next year listed on its own, not the whole history
+    stubber.add_response(
+        'list_objects_v2',
+        {'Contents': [{'Key': 'raw_data/yahoo/2022/1/3/yahoo_data_220103.parquet'}]},
+        {'Bucket': 'fake-bucket', 'Prefix': 'raw_data/yahoo/2022/1/'},
+    )
+
+    with stubber:
+        listing = s3.list_folders(
+            [
+                'raw_data/yahoo/2021/12/1/',
+                'raw_data/yahoo/2021/12/31/',
+                'raw_data/yahoo/2022/1/3/',
+                'raw_data/yahoo/2022/1/4/',
+            ]
+        )
+
+    stubber.assert_no_pending_responses()
+    assert listing == {
+        'raw_data/yahoo/2021/12/1/': ['raw_data/yahoo/2021/12/1/yahoo_data_211201.parquet'],
+        'raw_data/yahoo/2021/12/31/': ['raw_data/yahoo/2021/12/31/yahoo_data_211231.parquet'],
+        'raw_data/yahoo/2022/1/3/': ['raw_data/yahoo/2022/1/3/yahoo_data_220103.parquet'],
+        'raw_data/yahoo/2022/1/4/': [],
+    }
+
+
+def test_delete_files():
+    s3 = S3('fake-bucket')
+    stubber = Stubber(s3.resource.meta.client)
+    keys = [
+        'raw_data/yahoo/2022/3/1/yahoo_data_220301.parquet',
+        'raw_data/yahoo/2022/3/2/yahoo_data_220302.parquet',
+    ]
+    stubber.add_response(
+        'delete_objects',
+        {'Errors': [{'Key': keys[1]}]},
+        {
+            'Bucket': 'fake-bucket',
+            'Delete': {'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+        },
+    )
+
+    with stubber:
+        failed = s3.delete_files(keys)
+
+    stubber.assert_no_pending_responses()
+    assert failed == [keys[1]]
+
+
+def test_managed_transfers(tmp_path, monkeypatch):
+    s3 = S3('fake-bucket', part_size=8 * 1024 ** 2, max_concurrency=4)
+    client = s3.resource.meta.client
+    calls = []
+
+    def upload_file(*args, **kwargs):
+        calls.append(('upload_file', args, kwargs))
+
+    def download_file(bucket, key, path, **kwargs):
+        calls.append(('download_file', (bucket, key, path), kwargs))
+        with open(path, 'wb') as f:
+            f.write(b'content')
+
+    monkeypatch.setattr(client, 'upload_file', upload_file)
+    monkeypatch.setattr(client, 'download_file', download_file)
+
+    path = tmp_path / 'partition.parquet'
+    path.write_bytes(b'content')
+    response = s3.upload_file('raw_data/partition.parquet', str(path), {'content-sha256': 'x'})
+    s3.download_file('raw_data/partition.parquet', str(tmp_path / 'copy.parquet'))
+
+    # local files go through multipart, multi threaded transfers
+    assert calls == [
+        (
+            'upload_file',
+            (str(path), 'fake-bucket', 'raw_data/partition.parquet'),
+            {'ExtraArgs': {'Metadata': {'content-sha256': 'x'}}, 'Config': s3.transfer_config},
+        ),
+        (
+            'download_file',
+            ('fake-bucket', 'raw_data/partition.parquet', str(tmp_path / 'copy.parquet')),
+            {'Config': s3.transfer_config},
+        ),
+    ]
+    assert s3.transfer_config.multipart_threshold == 8 * 1024 ** 2
+    assert s3.transfer_config.multipart_chunksize == 8 * 1024 ** 2
+    assert s3.transfer_config.max_concurrency == 4
+    assert s3.transfer_config.use_threads
+    assert response['ResponseMetadata']['HTTPStatusCode'] == 200
@@ -0,0 +1,71 @@
+"""
+test_session_pool.py
+
+Implements SessionPool unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.session_pool import SessionPool
+from test.fake_yahoo import FakeYahooServer
+
+
+@pytest.fixture
+def server():
+    with FakeYahooServer() as server:
+        yield server
+
+
+def test_connection_reuse(server):
+    pool = SessionPool()
+
+    for i in range(10):
+        assert pool.get(f'{server.api_url}/T{i}').status_code == 200
+
+    assert pool.stats() == {
+        'sessions': 1, 'requests': 10, 'connections': 1, 'reused': 9
+    }
+
+
+def test_one_session_per_thread(server):
+    pool = SessionPool()
+
+    def get(i):
+        return pool.get(f'{server.api_url}/T{i}').status_code
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(get, range(40)))
+
+    stats = pool.stats()
+    assert 1 <= stats['sessions'] <= 4
+    assert stats['requests'] == 40
+    assert stats['connections'] == stats['sessions']
+
+
+def test_read_timeout():
+    pool = SessionPool(read_timeout=0.1)
+
+    with FakeYahooServer(latency=0.5) as server:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            pool.get(f'{server.api_url}/AAPL')
+
+
+def test_close(server):
+    pool = SessionPool()
+    pool.get(f'{server.api_url}/AAPL')
+    pool.close()
+
+    assert pool.stats()['sessions'] == 0
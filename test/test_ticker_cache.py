@@ -0,0 +1,59 @@
+"""
+test_ticker_cache.py
+
+Implements TickerCache unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+from time import time
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.ticker_cache import TickerCache
+from test.fake_s3 import FakeS3
+
+SNAPSHOT = {
+    'ticker_map': 'ticker,bloomberg_ticker,yahoo\nAAPL,AAPL US,AAPL\n',
+    'etag': '"abc"',
+    'last_modified': None,
+    'universe': ['AAPL US'],
+    'fetched': time(),
+}
+
+
+def test_save_and_load(tmp_path):
+    s3 = FakeS3()
+    TickerCache(s3, folder=str(tmp_path / 'a')).save(SNAPSHOT)
+
+    # local copy
+    cache = TickerCache(s3, folder=str(tmp_path / 'a'))
+    assert cache.load() == SNAPSHOT
+    assert 'read_file' not in s3.calls
+
+    # bucket copy, written locally once read
+    cache = TickerCache(s3, folder=str(tmp_path / 'b'))
+    assert cache.load() == SNAPSHOT
+    assert cache.load() == SNAPSHOT
+    assert s3.calls['read_file'] == 1
+
+
+def test_load_nothing(tmp_path):
+    assert TickerCache(FakeS3(), folder=str(tmp_path)).load() is None
+
+
+def test_fresh(tmp_path):
+    cache = TickerCache(folder=str(tmp_path), ttl=60)
+    assert not cache.fresh()
+
+    cache.save(SNAPSHOT)
+    assert cache.fresh()
+
+    cache.save(dict(SNAPSHOT, fetched=time() - 120))
+    assert not cache.fresh()
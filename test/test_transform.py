@@ -0,0 +1,73 @@
+"""
+test_transform.py
+
+Implements transform unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+
+import numpy as np
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from transform import ticker_slices
+from module.transformer import Transformer
+
+
+def test_ticker_slices():
+    df = pd.DataFrame(
+        [
+            ('MSFT', '2022-03-02', 4.0),
+            ('AAPL', '2022-03-02', 2.0),
+            ('MSFT', '2022-03-01', 3.0),
+            ('AAPL', '2022-03-01', 1.0),
+            ('AMZN', '2022-03-01', 5.0),
+        ],
+        columns=['ticker', 'timestamp', 'close'],
+    ).assign(timestamp=lambda df: pd.to_datetime(df.timestamp))
+
+    slices = list(ticker_slices(df))
+
+    assert [ticker for ticker, _ in slices] == ['AAPL', 'AMZN', 'MSFT']
+    assert [tmp.close.tolist() for _, tmp in slices] == [[1.0, 2.0], [5.0], [3.0, 4.0]]
+    assert all(tmp.ticker.eq(ticker).all() for ticker, tmp in slices)
+
+
+def test_lagger_matches_shifter():
+    df = pd.DataFrame(
+        {
+            'ticker': 'AAPL',
+            'timestamp': pd.date_range('2022-03-01', periods=8),
+            'currency': 'USD',
+            'close': np.arange(8, dtype='float64'),
+            'volume': np.arange(8, dtype='float64') * 10,
+        }
+    )
+
+    expected = df.copy()
+    for column in ['close', 'volume']:
+        expected = Transformer.shifter(expected, column, 3)
+
+    lagged = Transformer.lagger(df, ['close', 'volume'], 3)
+
+    # same columns order too
+    pd.testing.assert_frame_equal(lagged, expected)
+    assert list(lagged.columns) == [
+        'ticker',
+        'timestamp',
+        'currency',
+        'FEATURE_close_shift0',
+        'FEATURE_volume_shift0',
+        'FEATURE_close_shift1',
+        'FEATURE_close_shift2',
+        'FEATURE_volume_shift1',
+        'FEATURE_volume_shift2',
+    ]
@@ -45,3 +45,18 @@ def test_validate_wrong_date_format():
 @pytest.mark.xfail(raises=AssertionError)
 def test_validate_date_order():
     validate_load_args(start='220103', end='220103')
+
+
+@pytest.mark.xfail(raises=AssertionError)
+def test_validate_negative_concurrency():
+    validate_load_args(concurrency=0)
+
+
+@pytest.mark.xfail(raises=AssertionError)
+def test_validate_shard_out_of_range():
+    validate_load_args(shard=4, nshards=4)
+
+
+@pytest.mark.xfail(raises=AssertionError)
+def test_validate_spark_batch_too_large():
+    validate_load_args(spark_batch=21)
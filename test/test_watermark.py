@@ -0,0 +1,85 @@
+"""
+test_watermark.py
+
+Implements Watermark unit tests
+"""
+
+__author__ = "Julien Lefebvre, Hugo Chauvary"
+__email__ = 'numerai_2021@protonmail.com'
+
+import os
+import sys
+import inspect
+import datetime as dt
+
+import pandas as pd
+
+currentdir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(f'{parentdir}/src/numerai_signals')
+
+from module.watermark import Watermark
+from test.fake_s3 import FakeS3
+
+START = dt.datetime(2022, 3, 1)
+END = dt.datetime(2022, 3, 8)
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['ticker', 'timestamp']).assign(
+        timestamp=lambda df: pd.to_datetime(df.timestamp)
+    )
+
+
+def test_load_empty():
+    assert Watermark(FakeS3()).load().marks == {}
+
+
+def test_ranges():
+    watermark = Watermark(FakeS3())
+    watermark.marks = {
+        'AAPL': dt.datetime(2022, 3, 3),
+        'MSFT': dt.datetime(2022, 3, 3),
+        'AMZN': dt.datetime(2022, 3, 7),
+        'OLD': dt.datetime(2021, 1, 1),
+    }
+
+    ranges = watermark.ranges(['AAPL', 'MSFT', 'AMZN', 'OLD', 'NEW'], START, END)
+
+    assert ranges == {
+        dt.datetime(2022, 3, 4): ['AAPL', 'MSFT'],
+        START: ['OLD', 'NEW'],
+    }
+
+
+def test_update_and_filter():
+    watermark = Watermark(FakeS3())
+    watermark.update(frame([('AAPL', '2022-03-02'), ('AAPL', '2022-03-03')]))
+
+    df = watermark.filter(frame([
+        ('AAPL', '2022-03-03'), ('AAPL', '2022-03-04'), ('MSFT', '2022-03-03')
+    ]))
+
+    assert watermark.marks == {'AAPL': dt.datetime(2022, 3, 3)}
+    assert df.values.tolist() == [
+        ['AAPL', pd.Timestamp('2022-03-04')], ['MSFT', pd.Timestamp('2022-03-03')]
+    ]
+
+
+def test_update_never_moves_backward():
+    watermark = Watermark(FakeS3())
+    watermark.marks = {'AAPL': dt.datetime(2022, 3, 3)}
+    watermark.update(frame([('AAPL', '2022-03-01')]))
+
+    assert watermark.marks == {'AAPL': dt.datetime(2022, 3, 3)}
+
+
+def test_save_and_load():
+    s3 = FakeS3()
+    watermark = Watermark(s3)
+    watermark.update(frame([
+        ('AAPL', '2022-03-03'), ('MSFT', '2022-03-03'), ('AMZN', '2022-03-02')
+    ]))
+    watermark.save()
+
+    assert Watermark(s3).load().marks == watermark.marks
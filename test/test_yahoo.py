@@ -12,6 +12,7 @@ import sys
 import inspect
 import datetime as dt
 
+import pandas as pd
 import pytest
 
 
@@ -20,8 +21,10 @@ parentdir = os.path.dirname(currentdir)
 sys.path.append(f'{parentdir}/src/numerai_signals')
 
 from module.yahoo import Yahoo
+from util.curl_url import rate_limiter
 # from module.exception import OperationalException
 from util.get_tickers import get_yahoo_tickers
+from test.fake_yahoo import FakeYahooServer
 
 
 @pytest.mark.xfail(raises=AssertionError)
@@ -61,3 +64,144 @@ def test_yahoo_valid_request():
     df = Yahoo(tickers, crawler_start_date, crawler_end_date).load_data()
 
     assert not df.empty
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_yahoo_engine_local_server(engine):
+    """
+    Expect both engines to return the same frame, throttled tickers included
+    """
+    crawler_start_date = dt.datetime.strptime('220301', '%y%m%d')
+    crawler_start_date = crawler_start_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    crawler_end_date = dt.datetime.strptime('220303', '%y%m%d')
+    crawler_end_date = crawler_end_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    rate_limiter.configure(rate=100)
+    with FakeYahooServer(throttle=1) as server:
+        df = Yahoo(
+            ['AAPL', 'MSFT', 'AMZN'],
+            crawler_start_date,
+            crawler_end_date,
+            engine=engine,
+            concurrency=2,
+            api_url=server.api_url,
+        ).load_data()
+
+    assert df.shape[0] == 6
+    assert sorted(df.ticker.unique()) == ['AAPL', 'AMZN', 'MSFT']
+    # each ticker throttled once, then served
+    assert server.requests == 6
+
+
+@pytest.mark.parametrize('engine', ['thread', 'async'])
+def test_yahoo_spark_fallback(engine):
+    """
+    Expect batched requests to cover complete symbols,
+    and the others to fall back to one request per ticker
+    """
+    crawler_start_date = dt.datetime.strptime('220301', '%y%m%d')
+    crawler_start_date = crawler_start_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    crawler_end_date = dt.datetime.strptime('220303', '%y%m%d')
+    crawler_end_date = crawler_end_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    tickers = [f'T{i}' for i in range(10)]
+
+    rate_limiter.configure(rate=100)
+    # a spark endpoint answering full series, but for T3
+    ohlcv = [ticker for ticker in tickers if ticker != 'T3']
+    with FakeYahooServer(throttle=1, spark_ohlcv=ohlcv) as spark:
+        df = Yahoo(
+            tickers,
+            crawler_start_date,
+            crawler_end_date,
+            engine=engine,
+            concurrency=2,
+            api_url=spark.api_url,
+            spark_batch=4,
+            spark_url=spark.spark_url,
+        ).load_data()
+
+    with FakeYahooServer() as server:
+        expected = Yahoo(
+            tickers,
+            crawler_start_date,
+            crawler_end_date,
+            engine=engine,
+            api_url=server.api_url,
+        ).load_data()
+
+    assert df.shape[0] == 20
+    pd.testing.assert_frame_equal(
+        df.sort_values(['ticker', 'timestamp']).reset_index(drop=True),
+        expected.sort_values(['ticker', 'timestamp']).reset_index(drop=True),
+    )
+    # 3 batches and 1 fallback, each throttled once
+    assert spark.spark_requests == 6
+    assert spark.requests == 8
+
+
+def test_yahoo_spark_close_only():
+    """
+    Expect spark to be given up after its first answer
+    when series carry close prices only, as yahoo does
+    """
+    crawler_start_date = dt.datetime(2022, 3, 1, tzinfo=dt.timezone.utc).timestamp()
+    crawler_end_date = dt.datetime(2022, 3, 3, tzinfo=dt.timezone.utc).timestamp()
+    tickers = [f'T{i}' for i in range(10)]
+
+    rate_limiter.configure(rate=100)
+    with FakeYahooServer() as server:
+        df = Yahoo(
+            tickers,
+            crawler_start_date,
+            crawler_end_date,
+            api_url=server.api_url,
+            spark_batch=4,
+            spark_url=server.spark_url,
+        ).load_data()
+
+    assert df.shape[0] == 20
+    # 1 spark probe, then 1 chart request per ticker
+    assert server.spark_requests == 1
+    assert server.requests == 11
+
+
+def test_yahoo_random_failures():
+    """
+    Expect randomly throttled or failed requests to be retried
+    """
+    crawler_start_date = dt.datetime.strptime('220301', '%y%m%d')
+    crawler_start_date = crawler_start_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    crawler_end_date = dt.datetime.strptime('220303', '%y%m%d')
+    crawler_end_date = crawler_end_date.replace(
+        tzinfo=dt.timezone.utc
+    ).timestamp()
+
+    tickers = [f'T{i}' for i in range(20)]
+
+    rate_limiter.configure(rate=100)
+    with FakeYahooServer(throttle_rate=0.1, error_rate=0.1, seed=1) as server:
+        df = Yahoo(
+            tickers,
+            crawler_start_date,
+            crawler_end_date,
+            api_url=server.api_url,
+            max_attempts=10,
+        ).load_data()
+
+    assert df.ticker.nunique() == 20
+    assert server.statuses[200] == 20
+    assert server.statuses.get(429, 0) + server.statuses.get(500, 0) > 0